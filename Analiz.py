@@ -0,0 +1,480 @@
+import random
+import sys
+import threading
+import time
+
+import Doska
+import Dvizhok
+import Ocenka
+from Dvizhok import MATE_SCORE, SearchStopped, format_score, score_from_table, score_to_table
+
+QUIET_LIMIT = 30  # Полуходов без взятий и ходов простых шашек до ничьей (по 15 ходов каждой стороны)
+
+# Коды клеток: пусто, белая шашка, белая дамка, чёрная шашка, чёрная дамка, рамка
+EMPTY, WHITE_MAN, WHITE_KING, BLACK_MAN, BLACK_KING, OFF = range(6)
+LETTERS = {WHITE_MAN: 'C', WHITE_KING: 'D', BLACK_MAN: 'C', BLACK_KING: 'D'}
+COLORS = {WHITE_MAN: 'W', WHITE_KING: 'W', BLACK_MAN: 'B', BLACK_KING: 'B'}
+CODES = {(LETTERS[code], COLORS[code]): code for code in LETTERS}
+
+LAYOUT = Doska.Layout(8, 8)
+ENEMY = {
+    WHITE_MAN: tuple(code in (BLACK_MAN, BLACK_KING) for code in range(6)),
+    BLACK_MAN: tuple(code in (WHITE_MAN, WHITE_KING) for code in range(6)),
+}
+FORWARD = {WHITE_MAN: LAYOUT.offsets([(-1, -1), (-1, 1)]), BLACK_MAN: LAYOUT.offsets([(1, -1), (1, 1)])}
+PROMOTION = {WHITE_MAN: (0, WHITE_KING), BLACK_MAN: (7, BLACK_KING)}
+
+_rng = random.Random(42)
+ZOBRIST = [[_rng.getrandbits(64) if code in LETTERS else 0 for _ in range(LAYOUT.size)] for code in range(6)]
+SIDE_KEY = _rng.getrandbits(64)
+
+
+def _square_scores():
+    """
+    Строит стоимость шашек по клеткам: материал плюс таблица клеток Ocenka (белые со знаком плюс).
+
+    Возвращает:
+        list: Оценка по коду шашки и индексу клетки.
+    """
+    weights = Ocenka.Weights(Dvizhok.CHECKERS_VALUES)
+    scores = [[0] * LAYOUT.size for _ in range(6)]
+    for code, letter in LETTERS.items():
+        color = COLORS[code]
+        table = weights.tables[color].get(letter)
+        for index in LAYOUT.squares:
+            row, col = LAYOUT.coords(index)
+            score = weights.values[letter] + (table[row * 8 + col] if table else 0)
+            scores[code][index] = score if color == 'W' else -score
+    return scores
+
+
+SQUARE_SCORES = _square_scores()
+
+
+class CheckersSearch:
+    """
+    Класс поиска лучшего хода в шашках (правила Shashechki: шашка ходит вперёд на одну клетку
+    и бьёт через одну клетку в любую сторону, дамка не ходит).
+
+    Позиция копируется в список клеток с рамкой (Doska.Layout), ходы делаются и отменяются
+    на месте с возвратом побитой шашки; ключ позиции (Зобрист) и оценка обновляются на каждом ходу.
+    Поиск - альфа-бета с итеративным углублением, хеш-таблицей, взятиями в начале списка ходов,
+    ходами-убийцами и форсированным просмотром взятий на листьях.
+
+    Повторение позиции и QUIET_LIMIT полуходов без взятий и ходов простых шашек дают ничью.
+    При нынешних правилах Shashechki любой ход необратим, поэтому ничьи появятся только
+    вместе с ходами дамок.
+
+    Атрибуты:
+        color (str): Сторона, которой принадлежит ход.
+        cells (list): Коды клеток по индексу Doska.Layout.
+        side (int): Шашка стороны, которой принадлежит ход (WHITE_MAN или BLACK_MAN).
+        key (int): Ключ текущей позиции.
+        score (int): Оценка текущей позиции за белых.
+        table (dict): Хеш-таблица позиций.
+        table_size (int): Максимальное число записей в хеш-таблице.
+        nodes (int): Число просмотренных узлов.
+        stop_event (threading.Event): Флаг остановки поиска.
+    """
+    def __init__(self, board, color, table=None, table_size=1 << 18, stop_event=None, info=None):
+        """
+        Конструктор: копирует позицию доски.
+
+        Аргументы:
+            board (Board): Доска Shashechki (или любая доска с шашками 'C' и дамками 'D').
+            color (str): Сторона, которой принадлежит ход.
+            table (dict): Общая хеш-таблица (создаётся новая, если не задана).
+            table_size (int): Максимальное число записей в хеш-таблице.
+            stop_event (threading.Event): Флаг остановки поиска.
+            info (callable): Функция вывода строк info.
+        """
+        self.color = color
+        self.cells = [OFF] * LAYOUT.size
+        self.key = 0
+        self.score = 0
+        for row, line in enumerate(board.grid):
+            for col, piece in enumerate(line):
+                index = LAYOUT.index(row, col)
+                code = EMPTY if piece is None else CODES[piece.name, piece.color]
+                self.cells[index] = code
+                self.key ^= ZOBRIST[code][index]
+                self.score += SQUARE_SCORES[code][index]
+        self.side = WHITE_MAN if color == 'W' else BLACK_MAN
+        if self.side == BLACK_MAN:
+            self.key ^= SIDE_KEY
+        occupied = [index for index in LAYOUT.squares if self.cells[index] != EMPTY]
+        self.squares = LAYOUT.parity[1] if all(LAYOUT.shades[index] == 1 for index in occupied) else LAYOUT.squares
+        self.quiet = 0
+        self.path = []
+        self.undo = []
+        self.killers = [[None, None] for _ in range(256)]
+        self.table = table if table is not None else {}
+        self.table_size = table_size
+        self.stop_event = stop_event or threading.Event()
+        self.info = info
+        self.nodes = 0
+        self.deadline = None
+        self.max_nodes = None
+        self.start_time = 0.0
+
+    def hashfull(self):
+        """
+        Возвращает заполненность хеш-таблицы в промилле.
+
+        Возвращает:
+            int: Заполненность от 0 до 1000.
+        """
+        return len(self.table) * 1000 // self.table_size
+
+    def generate(self, side):
+        """
+        Генерирует ходы стороны: сначала взятия, затем тихие ходы.
+
+        Аргументы:
+            side (int): WHITE_MAN или BLACK_MAN.
+
+        Возвращает:
+            list: Ходы (откуда, куда, клетка побитой шашки или 0).
+        """
+        cells = self.cells
+        enemy = ENEMY[side]
+        forward = FORWARD[side]
+        captures = []
+        quiet = []
+        for index in self.squares:
+            if cells[index] != side:
+                continue
+            for step in LAYOUT.diagonal:
+                over = index + step
+                if enemy[cells[over]] and cells[over + step] == EMPTY:
+                    captures.append((index, over + step, over))
+            for step in forward:
+                if cells[index + step] == EMPTY:
+                    quiet.append((index, index + step, 0))
+        return captures + quiet
+
+    def make(self, move):
+        """
+        Делает ход на месте (с превращением в дамку).
+
+        Аргументы:
+            move (tuple): Ход (откуда, куда, клетка побитой шашки или 0).
+        """
+        start, end, over = move
+        cells = self.cells
+        piece = cells[start]
+        captured = cells[over] if over else EMPTY
+        promotion_row, king = PROMOTION[piece]
+        placed = king if LAYOUT.rows[end] == promotion_row else piece
+        self.undo.append((move, piece, captured, self.key, self.score, self.quiet))
+        self.path.append(self.key)
+        cells[start] = EMPTY
+        cells[end] = placed
+        key = self.key ^ ZOBRIST[piece][start] ^ ZOBRIST[placed][end] ^ SIDE_KEY
+        score = self.score - SQUARE_SCORES[piece][start] + SQUARE_SCORES[placed][end]
+        if over:
+            cells[over] = EMPTY
+            key ^= ZOBRIST[captured][over]
+            score -= SQUARE_SCORES[captured][over]
+        self.key = key
+        self.score = score
+        # Ходы простых шашек и взятия необратимы; счётчик растёт только от ходов дамок
+        self.quiet = 0 if over or piece in (WHITE_MAN, BLACK_MAN) else self.quiet + 1
+        self.side = BLACK_MAN if self.side == WHITE_MAN else WHITE_MAN
+
+    def unmake(self):
+        """
+        Отменяет последний ход, возвращая побитую шашку.
+        """
+        (start, end, over), piece, captured, self.key, self.score, self.quiet = self.undo.pop()
+        self.path.pop()
+        cells = self.cells
+        cells[end] = EMPTY
+        cells[start] = piece
+        if over:
+            cells[over] = captured
+        self.side = BLACK_MAN if self.side == WHITE_MAN else WHITE_MAN
+
+    def is_draw(self):
+        """
+        Проверяет ничью: QUIET_LIMIT полуходов без необратимых ходов или повторение позиции.
+
+        Возвращает:
+            bool: True, если позиция ничейная.
+        """
+        if self.quiet >= QUIET_LIMIT:
+            return True
+        # Повторение возможно только среди позиций после последнего необратимого хода
+        path = self.path
+        for back in range(2, self.quiet + 1, 2):
+            if path[-back] == self.key:
+                return True
+        return False
+
+    def evaluate(self):
+        """
+        Возвращает оценку позиции за сторону, которой принадлежит ход.
+        """
+        return self.score if self.side == WHITE_MAN else -self.score
+
+    def check_limits(self):
+        """
+        Проверяет флаг остановки и лимиты времени и узлов.
+        """
+        if self.stop_event.is_set():
+            raise SearchStopped
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchStopped
+        if self.max_nodes is not None and self.nodes >= self.max_nodes:
+            raise SearchStopped
+
+    def quiescence(self, alpha, beta, ply):
+        """
+        Просматривает только взятия, пока они есть (сторона может и не бить).
+
+        Аргументы:
+            alpha (int): Нижняя граница.
+            beta (int): Верхняя граница.
+            ply (int): Расстояние от корня.
+
+        Возвращает:
+            int: Оценка позиции для стороны, которой принадлежит ход.
+        """
+        self.nodes += 1
+        if not self.nodes & 1023:
+            self.check_limits()
+        moves = self.generate(self.side)
+        if not moves:
+            return -MATE_SCORE + ply
+        best = self.evaluate()
+        if best >= beta:
+            return best
+        if best > alpha:
+            alpha = best
+        for move in moves:
+            if not move[2]:
+                break
+            self.make(move)
+            try:
+                score = -self.quiescence(-beta, -alpha, ply + 1)
+            finally:
+                self.unmake()
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return best
+
+    def order_moves(self, moves, best, ply):
+        """
+        Упорядочивает ходы: ход из хеш-таблицы, взятия, ходы-убийцы, остальные.
+
+        Аргументы:
+            moves (list): Ходы из generate (взятия уже в начале).
+            best (tuple): Лучший ход из хеш-таблицы или None.
+            ply (int): Расстояние от корня.
+
+        Возвращает:
+            list: Упорядоченный список ходов.
+        """
+        killers = self.killers[ply]
+        first = [move for move in (best, killers[0], killers[1]) if move is not None and move in moves]
+        if not first:
+            return moves
+        captures = [move for move in moves if move[2] and move not in first]
+        quiet = [move for move in moves if not move[2] and move not in first]
+        head = first[:1] if first[0] == best else []
+        return head + captures + [move for move in first if move not in head] + quiet
+
+    def negamax(self, depth, alpha, beta, ply):
+        """
+        Рекурсивный альфа-бета поиск.
+
+        Аргументы:
+            depth (int): Оставшаяся глубина.
+            alpha (int): Нижняя граница.
+            beta (int): Верхняя граница.
+            ply (int): Расстояние от корня.
+
+        Возвращает:
+            int: Оценка позиции для стороны, которой принадлежит ход.
+        """
+        if ply and self.is_draw():
+            return 0
+        if depth <= 0:
+            return self.quiescence(alpha, beta, ply)
+        self.nodes += 1
+        if not self.nodes & 1023:
+            self.check_limits()
+
+        key = self.key
+        entry = self.table.get(key)
+        best_move = None
+        if entry is not None:
+            entry_depth, entry_score, entry_flag, best_move = entry
+            if entry_depth >= depth and ply > 0:
+                entry_score = score_from_table(entry_score, ply)
+                if entry_flag == 0:
+                    return entry_score
+                if entry_flag < 0 and entry_score <= alpha:
+                    return entry_score
+                if entry_flag > 0 and entry_score >= beta:
+                    return entry_score
+
+        moves = self.generate(self.side)
+        if not moves:
+            return -MATE_SCORE + ply
+        original_alpha = alpha
+        best_score = -MATE_SCORE - 1
+        for move in self.order_moves(moves, best_move, ply):
+            self.make(move)
+            try:
+                score = -self.negamax(depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                self.unmake()
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                if not move[2] and ply < len(self.killers):
+                    killers = self.killers[ply]
+                    if killers[0] != move:
+                        killers[1] = killers[0]
+                        killers[0] = move
+                break
+
+        flag = 0
+        if best_score <= original_alpha:
+            flag = -1
+        elif best_score >= beta:
+            flag = 1
+        if len(self.table) >= self.table_size:
+            self.table.clear()
+        self.table[key] = (depth, score_to_table(best_score, ply), flag, best_move)
+        return best_score
+
+    def principal_variation(self, length):
+        """
+        Восстанавливает главную линию по хеш-таблице.
+
+        Аргументы:
+            length (int): Максимальная длина линии.
+
+        Возвращает:
+            list: Список ходов (откуда, куда, клетка побитой шашки или 0).
+        """
+        line = []
+        for _ in range(length):
+            entry = self.table.get(self.key)
+            if entry is None or entry[3] is None or entry[3] not in self.generate(self.side):
+                break
+            line.append(entry[3])
+            self.make(entry[3])
+        for _ in line:
+            self.unmake()
+        return line
+
+    @staticmethod
+    def board_move(move):
+        """
+        Переводит ход поиска в координаты доски.
+
+        Аргументы:
+            move (tuple): Ход (откуда, куда, клетка побитой шашки или 0).
+
+        Возвращает:
+            tuple: Ход ((строка, столбец), (строка, столбец)).
+        """
+        return LAYOUT.coords(move[0]), LAYOUT.coords(move[1])
+
+    @staticmethod
+    def format_move(move):
+        """
+        Переводит ход поиска в строку вида 'e3d4'.
+
+        Аргументы:
+            move (tuple): Ход поиска.
+
+        Возвращает:
+            str: Ход в текстовом виде.
+        """
+        return LAYOUT.name(move[0]) + LAYOUT.name(move[1])
+
+    def run(self, depth=None, movetime=None, nodes=None):
+        """
+        Выполняет поиск с итеративным углублением.
+
+        Аргументы:
+            depth (int): Максимальная глубина (None - без ограничения).
+            movetime (int): Лимит времени в миллисекундах.
+            nodes (int): Лимит числа узлов.
+
+        Возвращает:
+            tuple: Лучший ход ((строка, столбец), (строка, столбец)) или None и его оценка.
+        """
+        self.start_time = time.perf_counter()
+        self.deadline = self.start_time + movetime / 1000 if movetime else None
+        self.max_nodes = nodes
+        self.nodes = 0
+        moves = self.generate(self.side)
+        best = (moves[0] if moves else None, 0)
+        max_depth = depth if depth else 64
+        for current in range(1, max_depth + 1):
+            try:
+                score = self.negamax(current, -MATE_SCORE - 1, MATE_SCORE + 1, 0)
+            except SearchStopped:
+                break
+            pv = self.principal_variation(current)
+            if pv:
+                best = (pv[0], score)
+            if self.info:
+                elapsed = max(time.perf_counter() - self.start_time, 1e-6)
+                self.info(f"info depth {current} score {format_score(score)} nodes {self.nodes} "
+                          f"nps {int(self.nodes / elapsed)} hashfull {self.hashfull()} "
+                          f"time {int(elapsed * 1000)} pv {' '.join(self.format_move(move) for move in pv)}")
+            if abs(score) >= MATE_SCORE - 64 or not moves:
+                break
+        move, score = best
+        return (self.board_move(move) if move else None), score
+
+
+def main():
+    """
+    Точка входа: анализирует позицию шашек (начальную, из Pozicii или после заданных ходов).
+    """
+    import argparse
+    import Pozicii
+    import Shashechki
+    parser = argparse.ArgumentParser(description="Анализ позиции в шашках")
+    parser.add_argument('moves', nargs='*', help="ходы от исходной позиции (e3d4 d6c5 ...)")
+    parser.add_argument('--position', help="позиция в формате Pozicii.py (например, '8/... w')")
+    parser.add_argument('--movetime', type=int, default=1000, help="время на анализ в миллисекундах")
+    parser.add_argument('--depth', type=int)
+    parser.add_argument('--nodes', type=int)
+    args = parser.parse_args()
+
+    board = Shashechki.Board()
+    color = 'W'
+    if args.position:
+        board, color, _ = Pozicii.load(args.position, Shashechki, board)
+    parser_game = Shashechki.Game()
+    for move in args.moves:
+        start, end = parser_game.parse_input(move)
+        if start is None or not board.move_piece(start, end):
+            print(f"Недопустимый ход: {move}")
+            return 1
+        color = 'B' if color == 'W' else 'W'
+    search = CheckersSearch(board, color, info=print)
+    move, score = search.run(depth=args.depth, movetime=args.movetime if not args.depth else None, nodes=args.nodes)
+    if move is None:
+        print("Ходов нет")
+    else:
+        (sr, sc), (er, ec) = move
+        print(f"Лучший ход: {'abcdefgh'[sc]}{8 - sr}{'abcdefgh'[ec]}{8 - er}, оценка: {format_score(score)}")
+
+if __name__ == "__main__":
+    sys.exit(main())
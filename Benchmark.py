@@ -0,0 +1,734 @@
+import argparse
+import atexit
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import pickle
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import ChessOsnova
+import Dop156
+import Doska
+import Dvizhok
+import Hody
+import Kniga
+import Obmen
+import Ocenka
+import Shashechki
+import Upakovka
+
+SEED = 156
+
+
+def midgame_board(variant_name, plies=20, seed=SEED):
+    """
+    Строит позицию середины игры случайными ходами с фиксированным зерном.
+
+    Аргументы:
+        variant_name (str): Название варианта ('chess', 'fairy' или 'checkers').
+        plies (int): Число полуходов.
+        seed (int): Зерно генератора.
+
+    Возвращает:
+        Board: Доска с позицией.
+    """
+    variant = Dvizhok.VARIANTS[variant_name]
+    rng = random.Random(seed)
+    board = variant.new_board()
+    color = 'W'
+    for _ in range(plies):
+        grid = board.grid
+        moves = [move for move in variant.generate_moves(board, color)
+                 if grid[move[1][0]][move[1][1]] is None or grid[move[1][0]][move[1][1]].name != 'K']
+        if not moves:
+            break
+        board.move_piece(*rng.choice(moves))
+        color = Dvizhok.opponent(color)
+    board.move_history.clear()
+    return board
+
+
+def draughts_board(size, plies=20, seed=SEED):
+    """
+    Строит позицию международных шашек случайными ходами с фиксированным зерном.
+
+    Аргументы:
+        size (int): Размер доски.
+        plies (int): Число полуходов.
+        seed (int): Зерно генератора.
+
+    Возвращает:
+        DraughtsBoard: Доска с позицией.
+    """
+    rng = random.Random(seed)
+    board = Shashechki.DraughtsBoard(size)
+    color = 'W'
+    for _ in range(plies):
+        moves = board.generate_moves(color)
+        if not moves:
+            break
+        board.make_move(rng.choice(moves))
+        color = Dvizhok.opponent(color)
+    board.move_history.clear()
+    return board
+
+
+def crowded_kings_board():
+    """
+    Строит плотную позицию 10×10 с тремя белыми дамками и 16 чёрными шашками (лучшее взятие - 10 шашек).
+
+    Возвращает:
+        DraughtsBoard: Доска с позицией.
+    """
+    board = Shashechki.DraughtsBoard(10, setup=False)
+    for square in (0, 28, 38):
+        board.cells[square] = Shashechki.WHITE_KING
+    for square in (7, 9, 10, 11, 12, 13, 18, 19, 21, 22, 30, 31, 33, 37, 39, 40):
+        board.cells[square] = Shashechki.BLACK_MAN
+    return board
+
+
+class Case:
+    """
+    Класс, описывающий один замер.
+
+    Атрибуты:
+        name (str): Название замера.
+        setup (callable): Функция подготовки, возвращающая функцию одной итерации.
+        ops (int): Число операций в одной итерации (время пересчитывается на операцию).
+    """
+    def __init__(self, name, setup, ops=1):
+        """
+        Конструктор для инициализации замера.
+
+        Аргументы:
+            name (str): Название замера.
+            setup (callable): Функция подготовки.
+            ops (int): Число операций в одной итерации.
+        """
+        self.name = name
+        self.setup = setup
+        self.ops = ops
+
+    def measure(self, repeat, warmup, min_time):
+        """
+        Выполняет замер: прогрев, затем repeat повторов.
+
+        Каждый повтор крутит итерацию столько раз, чтобы занять не менее min_time секунд.
+
+        Аргументы:
+            repeat (int): Число повторов.
+            warmup (int): Число прогревочных итераций.
+            min_time (float): Минимальная длительность одного повтора в секундах.
+
+        Возвращает:
+            dict: Медиана и 95-й перцентиль времени одной операции в наносекундах.
+        """
+        run = self.setup()
+        for _ in range(warmup):
+            run()
+        loops = 1
+        while True:
+            started = time.perf_counter()
+            for _ in range(loops):
+                run()
+            if time.perf_counter() - started >= min_time:
+                break
+            loops *= 2
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter_ns()
+            for _ in range(loops):
+                run()
+            samples.append((time.perf_counter_ns() - started) / (loops * self.ops))
+        samples.sort()
+        return {
+            'median_ns': samples[len(samples) // 2],
+            'p95_ns': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+            'repeat': repeat,
+            'loops': loops,
+        }
+
+
+class StartupCase(Case):
+    """
+    Класс, описывающий замер запуска: импорт модулей и первое обращение к ним в новом процессе.
+
+    Наследует атрибуты и методы от класса Case.
+
+    Атрибуты:
+        code (str): Код, время выполнения которого замеряется в новом процессе.
+    """
+    def __init__(self, name, code):
+        """
+        Конструктор для инициализации замера запуска.
+
+        Аргументы:
+            name (str): Название замера.
+            code (str): Код для выполнения (например, 'import Dvizhok').
+        """
+        super().__init__(name, None)
+        self.code = code
+
+    def measure(self, repeat, warmup, min_time):
+        """
+        Запускает warmup + repeat новых процессов; время считается внутри процесса
+        от начала импорта до конца кода, без запуска самого интерпретатора.
+
+        Аргументы:
+            repeat (int): Число повторов.
+            warmup (int): Число прогревочных запусков.
+            min_time (float): Не используется (каждый запуск - отдельный процесс).
+
+        Возвращает:
+            dict: Медиана и 95-й перцентиль времени в наносекундах.
+        """
+        script = f"import time\nstarted = time.perf_counter_ns()\n{self.code}\nprint(time.perf_counter_ns() - started)"
+        directory = os.path.dirname(os.path.abspath(__file__))
+        samples = []
+        for index in range(warmup + repeat):
+            result = subprocess.run([sys.executable, '-c', script], cwd=directory,
+                                    capture_output=True, text=True, check=True)
+            if index >= warmup:
+                samples.append(int(result.stdout.split()[-1]))
+        samples.sort()
+        return {
+            'median_ns': samples[len(samples) // 2],
+            'p95_ns': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+            'repeat': repeat,
+            'loops': 1,
+        }
+
+
+def _piece_validation(module, piece_name, board_factory):
+    """
+    Готовит замер is_valid_move одной фигуры по всем клеткам доски.
+
+    Аргументы:
+        module (module): Модуль игры.
+        piece_name (str): Название класса фигуры.
+        board_factory (callable): Функция, создающая доску.
+
+    Возвращает:
+        callable: Функция подготовки замера.
+    """
+    def setup():
+        board = board_factory()
+        piece = getattr(module, piece_name)('W')
+        start = (4, 3)
+        board.grid[start[0]][start[1]] = piece
+        grid = board.grid
+        targets = [(r, c) for r in range(8) for c in range(8) if (r, c) != start]
+
+        def run():
+            for end in targets:
+                piece.is_valid_move(start, end, grid)
+        return run
+    return setup
+
+
+def _get_valid_moves(board_factory):
+    """
+    Готовит замер Dop156.Board.get_valid_moves для всех фигур белых.
+
+    Аргументы:
+        board_factory (callable): Функция, создающая доску.
+
+    Возвращает:
+        callable: Функция подготовки замера.
+    """
+    def setup():
+        board = board_factory()
+        squares = [(r, c) for r in range(8) for c in range(8)
+                   if board.grid[r][c] is not None and board.grid[r][c].color == 'W']
+
+        def run():
+            for square in squares:
+                board.get_valid_moves(square)
+        return run
+    return setup
+
+
+def _move_undo(variant_name, board_factory):
+    """
+    Готовит замер цикла move_piece + undo_move по всем ходам белых.
+
+    Аргументы:
+        variant_name (str): Название варианта.
+        board_factory (callable): Функция, создающая доску.
+
+    Возвращает:
+        callable: Функция подготовки замера.
+    """
+    def setup():
+        variant = Dvizhok.VARIANTS[variant_name]
+        board = board_factory()
+        moves = variant.generate_moves(board, 'W')
+
+        def run():
+            for start, end in moves:
+                board.move_piece(start, end)
+                board.undo_move()
+        return run
+    return setup
+
+
+def _generation(generate, board_factory, reset_cache=False):
+    """
+    Готовит замер генерации всех ходов белых.
+
+    Аргументы:
+        generate (callable): Функция генерации (доска, цвет) -> список ходов.
+        board_factory (callable): Функция, создающая доску.
+        reset_cache (bool): Сбрасывать списки ходов доски (Dop156.MoveCache) перед каждой генерацией,
+            чтобы замерять полную генерацию, а не повторное чтение списков.
+
+    Возвращает:
+        callable: Функция подготовки замера.
+    """
+    def setup():
+        board = board_factory()
+        cache = board.move_cache if reset_cache else None
+
+        def run():
+            if cache is not None:
+                cache.reset()
+            generate(board, 'W')
+        return run
+    return setup
+
+
+def _ply_generation(cached):
+    """
+    Готовит замер генерации ходов после каждого полухода: ход, ходы соперника, отмена, свои ходы.
+
+    Аргументы:
+        cached (bool): Пересчитывать только затронутые ходом фигуры (Dop156.MoveCache);
+            иначе списки ходов сбрасываются перед каждой генерацией.
+
+    Возвращает:
+        callable: Функция подготовки замера.
+    """
+    def setup():
+        variant = Dvizhok.VARIANTS['fairy']
+        board = midgame_board('fairy')
+        cache = board.move_cache
+        moves = variant.generate_moves(board, 'W')[::7][:8]
+
+        def run():
+            for move in moves:
+                board.move_piece(*move)
+                if not cached:
+                    cache.reset()
+                variant.generate_moves(board, 'B')
+                board.undo_move()
+                if not cached:
+                    cache.reset()
+                variant.generate_moves(board, 'W')
+        return run
+    return setup
+
+
+def _checkers_search(tuned, depth=5):
+    """
+    Готовит замер поиска в шашках на фиксированную глубину из позиции середины игры.
+
+    Аргументы:
+        tuned (bool): Поиск для шашек (Analiz.CheckersSearch) вместо общего Dvizhok.Search.
+        depth (int): Глубина поиска.
+
+    Возвращает:
+        callable: Функция подготовки замера.
+    """
+    def setup():
+        variant = Dvizhok.VARIANTS['checkers']
+        board = midgame_board('checkers')
+        if tuned:
+            return lambda: variant.new_search(board, 'W').run(depth=depth)
+        return lambda: Dvizhok.Search(variant, board, 'W').run(depth=depth)
+    return setup
+
+
+def _packing(variant_name, pack):
+    """
+    Готовит замер упаковки позиции середины игры (Upakovka).
+
+    Аргументы:
+        variant_name (str): Название варианта.
+        pack (callable): Функция упаковки (доска, сторона) -> bytes.
+
+    Возвращает:
+        callable: Функция подготовки замера.
+    """
+    def setup():
+        board = midgame_board(variant_name)
+        return lambda: pack(board, 'B')
+    return setup
+
+
+def _evaluation(variant_name, incremental):
+    """
+    Готовит замер Variant.evaluate на позиции середины игры.
+
+    Аргументы:
+        variant_name (str): Название варианта.
+        incremental (bool): С подключённой оценкой Ocenka (иначе - просмотр всей доски).
+
+    Возвращает:
+        callable: Функция подготовки замера.
+    """
+    def setup():
+        variant = Dvizhok.VARIANTS[variant_name]
+        board = midgame_board(variant_name)
+        if incremental:
+            Ocenka.attach(board, variant.weights)
+        else:
+            board.evaluation = None
+
+        def run():
+            variant.evaluate(board, 'W')
+        return run
+    return setup
+
+
+def _book_probe(records):
+    """
+    Готовит замер поиска в книге дебютов из records случайных записей.
+
+    Аргументы:
+        records (int): Число записей книги.
+
+    Возвращает:
+        callable: Функция подготовки замера.
+    """
+    def setup():
+        rng = random.Random(SEED)
+        keys = sorted(rng.getrandbits(64) for _ in range(records))
+        directory = tempfile.TemporaryDirectory()
+        path = os.path.join(directory.name, 'book.bin')
+        with open(path, 'wb') as output:
+            output.write(Kniga.HEADER.pack(Kniga.MAGIC, records))
+            output.write(b''.join(Kniga.RECORD.pack(key, 0, 1, 1) for key in keys))
+        book = Kniga.Book(path)
+
+        def release():
+            book.close()
+            directory.cleanup()
+        atexit.register(release)
+        probes = [keys[index] for index in range(0, records, records // 100)]
+
+        def run():
+            for key in probes:
+                book.probe_key(key)
+        return run
+    return setup
+
+
+def _transfer(variant_name, shared):
+    """
+    Готовит замер передачи позиции рабочему процессу: pickle доски туда и обратно
+    или запись в кольцо общей памяти и доска-представление над ячейкой.
+
+    Аргументы:
+        variant_name (str): Название варианта.
+        shared (bool): Передавать через Obmen.PositionRing.
+
+    Возвращает:
+        callable: Функция подготовки замера.
+    """
+    def setup():
+        board = midgame_board(variant_name)
+        board.evaluation = None
+        module = Dvizhok.VARIANTS[variant_name].module
+        if not shared:
+            return lambda: pickle.loads(pickle.dumps((board, 'W')))
+        ring = Obmen.PositionRing(1)
+        view = ring.view(0, module)
+
+        def release():
+            view.grid = None
+            ring.close()
+        atexit.register(release)
+
+        def run():
+            ring.write(0, board, 'W')
+            ring.view(0, module, view)
+        return run
+    return setup
+
+
+def _checkers_generation(board_factory):
+    """
+    Готовит замер Checker.get_possible_moves для всех шашек на доске.
+
+    Аргументы:
+        board_factory (callable): Функция, создающая доску.
+
+    Возвращает:
+        callable: Функция подготовки замера.
+    """
+    def setup():
+        board = board_factory()
+        grid = board.grid
+        pieces = [((r, c), grid[r][c]) for r in range(8) for c in range(8) if grid[r][c] is not None]
+
+        def run():
+            for square, piece in pieces:
+                piece.get_possible_moves(square, grid)
+        return run
+    return setup
+
+
+def _parse_input(module):
+    """
+    Готовит замер Game.parse_input на наборе корректных и ошибочных ходов.
+
+    Аргументы:
+        module (module): Модуль игры.
+
+    Возвращает:
+        callable: Функция подготовки замера.
+    """
+    def setup():
+        game = module.Game()
+        rng = random.Random(SEED)
+        files = 'abcdefgh'
+        moves = [f"{rng.choice(files)}{rng.randint(1, 8)}{rng.choice(files)}{rng.randint(1, 8)}" for _ in range(90)]
+        moves += ['e7e5', 'z9z9', 'e2', 'e2e4e6', 'i1a1', 'a0a1', 'e2e4', 'undo', 'a1h8', 'h8a1']
+
+        def run():
+            for move in moves:
+                game.parse_input(move)
+        return run
+    return setup
+
+
+def _decoding(as_buffer):
+    """
+    Готовит замер разбора строк ходов (Hody): 100 строк по 40 записей, из них 1% ошибочных.
+
+    Аргументы:
+        as_buffer (bool): Разбирать весь буфер байтов (decode_buffer), иначе - строки по одной (decode_line).
+
+    Возвращает:
+        callable: Функция подготовки замера.
+    """
+    def setup():
+        rng = random.Random(SEED)
+        names = Hody.SQUARE_NAMES
+        lines = []
+        for _ in range(100):
+            words = [rng.choice(names) + rng.choice(('', '-')) + rng.choice(names) for _ in range(40)]
+            if rng.random() < 0.4:
+                words[rng.randrange(40)] = rng.choice(('z9z9', 'e2', 'e2e4e6', '1-0'))
+            lines.append(' '.join(words))
+        buffer = '\n'.join(lines).encode()
+
+        def run_buffer():
+            Hody.decode_buffer(buffer, [])
+
+        def run_lines():
+            rejects = []
+            for number, line in enumerate(lines):
+                Hody.decode_line(line, rejects, number)
+        return run_buffer if as_buffer else run_lines
+    return setup
+
+
+def _display(board_factory, highlight=False):
+    """
+    Готовит замер Board.display (вывод перенаправляется в память).
+
+    Аргументы:
+        board_factory (callable): Функция, создающая доску.
+        highlight (bool): Передавать ли список подсвечиваемых клеток (Dop156).
+
+    Возвращает:
+        callable: Функция подготовки замера.
+    """
+    def setup():
+        board = board_factory()
+        sink = io.StringIO()
+        args = (12, [(5, 0), (4, 0), (5, 2)]) if highlight else (12,)
+
+        def run():
+            sink.seek(0)
+            sink.truncate()
+            with contextlib.redirect_stdout(sink):
+                board.display(*args)
+        return run
+    return setup
+
+
+def cases():
+    """
+    Возвращает набор замеров.
+
+    Возвращает:
+        list: Объекты Case.
+    """
+    suite = []
+    for name in ('Pawn', 'Rook', 'Knight', 'Bishop', 'Queen', 'King'):
+        suite.append(Case(f"is_valid_move/chess/{name}",
+                          _piece_validation(ChessOsnova, name, lambda: midgame_board('chess')), ops=63))
+    for name in ('Spider', 'Wizard', 'Minotaur'):
+        suite.append(Case(f"is_valid_move/fairy/{name}",
+                          _piece_validation(Dop156, name, lambda: midgame_board('fairy')), ops=63))
+    suite.append(Case("is_valid_move/checkers/Checker",
+                      _piece_validation(Shashechki, 'Checker', lambda: midgame_board('checkers')), ops=63))
+    suite.append(Case("get_valid_moves/fairy/opening", _get_valid_moves(Dop156.Board)))
+    suite.append(Case("get_valid_moves/fairy/midgame", _get_valid_moves(lambda: midgame_board('fairy'))))
+    for variant_name in ('chess', 'fairy', 'checkers'):
+        suite.append(Case(f"move_undo/{variant_name}/midgame",
+                          _move_undo(variant_name, lambda name=variant_name: midgame_board(name))))
+    # Время на один сгенерированный ход: доска с рамкой не должна дорожать с размером доски
+    fairy = Dvizhok.VARIANTS['fairy']
+    fairy_moves = len(fairy.generate_moves(Dop156.Board(), 'W'))
+    suite.append(Case("generate/fairy/grid/8x8", _generation(fairy.generate_moves, Dop156.Board, reset_cache=True),
+                      ops=fairy_moves))
+    suite.append(Case("generate/fairy/grid/8x8/cached", _generation(fairy.generate_moves, Dop156.Board),
+                      ops=fairy_moves))
+    for size in (8, 10, 12):
+        suite.append(Case(f"generate/fairy/mailbox/{size}x{size}",
+                          _generation(Doska.MailboxBoard.generate_moves, lambda size=size: Doska.MailboxBoard(size, size)),
+                          ops=len(Doska.MailboxBoard(size, size).generate_moves('W'))))
+    # Международные шашки: время на один ход должно быть одинаковым на 8×8 и 10×10
+    draughts = Shashechki.DraughtsBoard.generate_moves
+    for size in (8, 10):
+        for stage, plies in (('opening', 0), ('midgame', 30)):
+            board_factory = lambda size=size, plies=plies: draughts_board(size, plies)
+            suite.append(Case(f"generate/draughts/{size}x{size}/{stage}", _generation(draughts, board_factory),
+                              ops=len(board_factory().generate_moves('W'))))
+    suite.append(Case("generate/draughts/10x10/kings", _generation(draughts, crowded_kings_board),
+                      ops=len(crowded_kings_board().generate_moves('W'))))
+    suite.append(Case("generate/fairy/ply/full", _ply_generation(False), ops=16))
+    suite.append(Case("generate/fairy/ply/cached", _ply_generation(True), ops=16))
+    for variant_name in ('chess', 'fairy', 'checkers'):
+        suite.append(Case(f"evaluate/{variant_name}/scan", _evaluation(variant_name, False)))
+        suite.append(Case(f"evaluate/{variant_name}/incremental", _evaluation(variant_name, True)))
+    suite.append(Case("book/probe_key/100k", _book_probe(100000), ops=100))
+    for variant_name in ('fairy', 'checkers'):
+        suite.append(Case(f"transfer/{variant_name}/pickle", _transfer(variant_name, False)))
+        suite.append(Case(f"transfer/{variant_name}/shared", _transfer(variant_name, True)))
+    suite.append(Case("search/checkers/depth5/generic", _checkers_search(False)))
+    suite.append(Case("search/checkers/depth5/tuned", _checkers_search(True)))
+    suite.append(Case("pack/fairy/nibble", _packing('fairy', Upakovka.pack)))
+    suite.append(Case("pack/checkers/nibble", _packing('checkers', Upakovka.pack)))
+    suite.append(Case("pack/checkers/index", _packing('checkers', Upakovka.pack_checkers)))
+    suite.append(Case("get_possible_moves/checkers/opening", _checkers_generation(Shashechki.Board)))
+    suite.append(Case("get_possible_moves/checkers/midgame",
+                      _checkers_generation(lambda: midgame_board('checkers'))))
+    for module in (ChessOsnova, Dop156, Shashechki):
+        suite.append(Case(f"parse_input/{module.__name__}", _parse_input(module), ops=100))
+    suite.append(Case("decode/line", _decoding(False), ops=4000))
+    suite.append(Case("decode/buffer", _decoding(True), ops=4000))
+    suite.append(Case("display/chess", _display(ChessOsnova.Board)))
+    suite.append(Case("display/fairy/highlight", _display(Dop156.Board, highlight=True)))
+    suite.append(Case("display/checkers", _display(Shashechki.Board)))
+    for name in ('Yadro', 'ChessOsnova', 'Dop156', 'Shashechki', 'Dvizhok', 'Rozygrysh', 'Turnir'):
+        suite.append(StartupCase(f"startup/import/{name}", f"import {name}"))
+    suite.append(StartupCase("startup/Dvizhok/fairy", "import Dvizhok\nDvizhok.VARIANTS['fairy'].new_board()"))
+    if importlib.util.find_spec('numpy') is not None:
+        suite.append(StartupCase("startup/import/Tenzory", "import Tenzory"))
+    return suite
+
+
+def run_suite(selected, repeat=15, warmup=3, min_time=0.02, progress=None):
+    """
+    Выполняет замеры.
+
+    Аргументы:
+        selected (list): Замеры для выполнения.
+        repeat (int): Число повторов каждого замера.
+        warmup (int): Число прогревочных итераций.
+        min_time (float): Минимальная длительность одного повтора в секундах.
+        progress (callable): Функция вывода строки результата.
+
+    Возвращает:
+        dict: Результаты с метаданными окружения.
+    """
+    results = {}
+    for case in selected:
+        results[case.name] = case.measure(repeat, warmup, min_time)
+        if progress:
+            progress(f"{case.name:<42}{results[case.name]['median_ns']:>14.1f}{results[case.name]['p95_ns']:>14.1f}")
+    return {
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'seed': SEED,
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """
+    Сравнивает результаты с базовыми.
+
+    Аргументы:
+        current (dict): Текущие результаты run_suite.
+        baseline (dict): Базовые результаты.
+        threshold (float): Допустимое относительное замедление медианы (0.1 - 10%).
+
+    Возвращает:
+        tuple: Строки отчёта и список замедлившихся замеров.
+    """
+    lines = []
+    regressions = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            lines.append(f"{name:<42}{'нет базы':>14}")
+            continue
+        change = result['median_ns'] / base['median_ns'] - 1
+        mark = ''
+        if change > threshold:
+            mark = '  ЗАМЕДЛЕНИЕ'
+            regressions.append(name)
+        lines.append(f"{name:<42}{base['median_ns']:>14.1f}{result['median_ns']:>14.1f}{change * 100:>+10.1f}%{mark}")
+    return lines, regressions
+
+
+def main():
+    """
+    Точка входа: выполняет замеры, сохраняет базу или сравнивает с ней.
+
+    Возвращает:
+        int: Код выхода (1, если найдено замедление сверх порога).
+    """
+    parser = argparse.ArgumentParser(description="Микро-замеры производительности")
+    parser.add_argument('--filter', default='', help="выполнять только замеры, содержащие строку")
+    parser.add_argument('--repeat', type=int, default=15)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--min-time', type=float, default=0.02, help="минимальная длительность повтора, с")
+    parser.add_argument('--save', help="сохранить результаты как базу (JSON)")
+    parser.add_argument('--compare', help="сравнить с базой (JSON)")
+    parser.add_argument('--threshold', type=float, default=0.10, help="допустимое замедление медианы (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    selected = [case for case in cases() if args.filter in case.name]
+    print(f"{'Замер':<42}{'Медиана, нс':>14}{'p95, нс':>14}")
+    current = run_suite(selected, args.repeat, args.warmup, args.min_time, progress=print)
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as output:
+            json.dump(current, output, ensure_ascii=False, indent=1)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as base_file:
+            baseline = json.load(base_file)
+        lines, regressions = compare(current, baseline, args.threshold)
+        print()
+        print(f"{'Замер':<42}{'База, нс':>14}{'Сейчас, нс':>14}{'Изм.':>11}")
+        print("\n".join(lines))
+        if regressions:
+            print(f"Замедление более {args.threshold * 100:.0f}%: {', '.join(regressions)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
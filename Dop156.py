@@ -1,84 +1,38 @@
-import string
-class Unit:
-    """
-    Базовый класс для шахматных фигур.
+import sys
 
-    Атрибуты:
-        SYMBOLS (dict): Словарь, сопоставляющий символы фигур с их Unicode-представлениями.
-        color (str): Цвет фигуры ('W' для белых, 'B' для чёрных).
-        name (str): Название фигуры (например, 'P' для пешки).
-        symbol (str): Символ фигуры, зависящий от её цвета.
-    """
-    SYMBOLS = {'P': '♙', 'R': '♖', 'N': '♘', 'B': '♗', 'Q': '♕', 'K': '♔', 'S': '♜', 'W': '♞', 'M': '♝'}
+import Yadro
+from Yadro import FILES, Pawn, Rook, Knight, Bishop, Queen, King
 
-    def __init__(self, color, name):
-        """
-        Конструктор для инициализации фигуры.
-
-        Аргументы:
-            color (str): Цвет фигуры ('W' или 'B').
-            name (str): Название фигуры (например, 'P' для пешки).
-        """
-        self.color = color
-        self.name = name
-        self.symbol = self.SYMBOLS[name] if color == 'W' else self.SYMBOLS[name].lower()
-
-    def is_valid_move(self, start, end, board):
-        """
-        Проверяет, является ли ход корректным для фигуры.
-
-        Аргументы:
-            start (tuple): Начальная позиция фигуры (строка, столбец).
-            end (tuple): Конечная позиция фигуры (строка, столбец).
-            board (list): Шахматная доска (двумерный список).
 
-        Возвращает:
-            bool: True, если ход корректен, иначе False.
-        """
-        return False  
+class Unit(Yadro.Unit):
+    """
+    Базовый класс для фигур игры с новыми фигурами.
 
-    def is_path_clear(self, start, end, board):
-        """
-        Проверяет, свободен ли путь между начальной и конечной позициями.
+    Наследует атрибуты и методы от класса Yadro.Unit.
 
-        Аргументы:
-            start (tuple): Начальная позиция (строка, столбец).
-            end (tuple): Конечная позиция (строка, столбец).
-            board (list): Шахматная доска (двумерный список).
+    Атрибуты:
+        SYMBOLS (dict): Unicode-представления шахматных и новых фигур.
+    """
+    SYMBOLS = {**Yadro.Unit.SYMBOLS, 'S': '♜', 'W': '♞', 'M': '♝'}
 
-        Возвращает:
-            bool: True, если путь свободен, иначе False.
-        """
-        start_row, start_col = start
-        end_row, end_col = end
-        row_step = 1 if end_row > start_row else -1 if end_row < start_row else 0
-        col_step = 1 if end_col > start_col else -1 if end_col < start_col else 0
-        row, col = start_row + row_step, start_col + col_step
-        while (row, col) != (end_row, end_col):
-            if board[row][col] is not None:
-                return False
-            row += row_step
-            col += col_step
-        return True
-
-class Pawn(Unit):
+class Spider(Unit):
     """
-    Класс, представляющий пешку.
+    Класс, представляющий паука (новая фигура).
 
     Наследует атрибуты и методы от класса Unit.
     """
     def __init__(self, color):
         """
-        Конструктор для инициализации пешки.
+        Конструктор для инициализации паука.
 
         Аргументы:
-            color (str): Цвет пешки ('W' или 'B').
+            color (str): Цвет паука ('W' или 'B').
         """
-        super().__init__(color, 'P')
+        super().__init__(color, 'S')
 
     def is_valid_move(self, start, end, board):
         """
-        Проверяет корректность хода для пешки.
+        Проверяет корректность хода для паука.
 
         Аргументы:
             start (tuple): Начальная позиция (строка, столбец).
@@ -88,35 +42,26 @@ class Pawn(Unit):
         Возвращает:
             bool: True, если ход корректен, иначе False.
         """
-        direction = -1 if self.color == 'W' else 1
-        start_row, start_col = start
-        end_row, end_col = end
-        if start_col == end_col and end_row == start_row + direction and board[end_row][end_col] is None:
-            return True
-        if start_col == end_col and start_row == (6 if self.color == 'W' else 1) and end_row == start_row + 2 * direction and board[end_row][end_col] is None and board[start_row + direction][end_col] is None:
-            return True
-        if abs(start_col - end_col) == 1 and end_row == start_row + direction:
-            return board[end_row][end_col] is not None and board[end_row][end_col].color != self.color
-        return False
-
-class Rook(Unit):
+        return abs(start[0] - end[0]) <= 2 and abs(start[1] - end[1]) <= 2  # Двигается в радиусе 2 клеток
+
+class Wizard(Unit):
     """
-    Класс, представляющий ладью.
+    Класс, представляющий волшебника (новая фигура).
 
     Наследует атрибуты и методы от класса Unit.
     """
     def __init__(self, color):
         """
-        Конструктор для инициализации ладьи.
+        Конструктор для инициализации волшебника.
 
         Аргументы:
-            color (str): Цвет ладьи ('W' или 'B').
+            color (str): Цвет волшебника ('W' или 'B').
         """
-        super().__init__(color, 'R')
+        super().__init__(color, 'W')
 
     def is_valid_move(self, start, end, board):
         """
-        Проверяет корректность хода для ладьи.
+        Проверяет корректность хода для волшебника.
 
         Аргументы:
             start (tuple): Начальная позиция (строка, столбец).
@@ -126,28 +71,26 @@ class Rook(Unit):
         Возвращает:
             bool: True, если ход корректен, иначе False.
         """
-        if (start[0] == end[0] or start[1] == end[1]) and self.is_path_clear(start, end, board):
-            return board[end[0]][end[1]] is None or board[end[0]][end[1]].color != self.color
-        return False
+        return (start[0] + start[1]) % 2 == (end[0] + end[1]) % 2  # Может перемещаться только по клеткам одного цвета
 
-class Knight(Unit):
+class Minotaur(Unit):
     """
-    Класс, представляющий коня.
+    Класс, представляющий минотавра (новая фигура).
 
     Наследует атрибуты и методы от класса Unit.
     """
     def __init__(self, color):
         """
-        Конструктор для инициализации коня.
+        Конструктор для инициализации минотавра.
 
         Аргументы:
-            color (str): Цвет коня ('W' или 'B').
+            color (str): Цвет минотавра ('W' или 'B').
         """
-        super().__init__(color, 'N')
+        super().__init__(color, 'M')
 
     def is_valid_move(self, start, end, board):
         """
-        Проверяет корректность хода для коня.
+        Проверяет корректность хода для минотавра.
 
         Аргументы:
             start (tuple): Начальная позиция (строка, столбец).
@@ -157,316 +100,444 @@ class Knight(Unit):
         Возвращает:
             bool: True, если ход корректен, иначе False.
         """
-        row_diff, col_diff = abs(start[0] - end[0]), abs(start[1] - end[1])
-        return (row_diff, col_diff) in [(2, 1), (1, 2)] and (board[end[0]][end[1]] is None or board[end[0]][end[1]].color != self.color)
-
-class Bishop(Unit):
-    """
-    Класс, представляющий слона.
+        return start[0] == end[0] or start[1] == end[1] or abs(start[0] - end[0]) == abs(start[1] - end[1])  # Как ферзь, но через 1 клетку
 
-    Наследует атрибуты и методы от класса Unit.
-    """
-    def __init__(self, color):
-        """
-        Конструктор для инициализации слона.
+KNIGHT_STEPS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
+KING_STEPS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+_dependency_masks = {}
 
-        Аргументы:
-            color (str): Цвет слона ('W' или 'B').
-        """
-        super().__init__(color, 'B')
 
-    def is_valid_move(self, start, end, board):
-        """
-        Проверяет корректность хода для слона.
+def dependency_mask(name, color, row, col):
+    """
+    Возвращает клетки, от содержимого которых зависят ходы фигуры (битовая маска, бит row * 8 + col).
 
-        Аргументы:
-            start (tuple): Начальная позиция (строка, столбец).
-            end (tuple): Конечная позиция (строка, столбец).
-            board (list): Шахматная доска (двумерный список).
+    Ладья, слон и ферзь зависят от всех клеток своих линий, конь и король - от клеток,
+    куда они ходят, пешка - от клеток перед собой и по диагонали вперёд, паук, волшебник
+    и минотавр - только от своей клетки. Фигура неизвестного вида зависит от всей доски.
 
-        Возвращает:
-            bool: True, если ход корректен, иначе False.
-        """
-        if abs(start[0] - end[0]) == abs(start[1] - end[1]) and self.is_path_clear(start, end, board):
-            return board[end[0]][end[1]] is None or board[end[0]][end[1]].color != self.color
-        return False
+    Аргументы:
+        name (str): Название фигуры.
+        color (str): Цвет фигуры.
+        row (int): Строка фигуры.
+        col (int): Столбец фигуры.
 
-class Queen(Unit):
+    Возвращает:
+        int: Маска клеток (клетка самой фигуры входит в маску).
     """
-    Класс, представляющий ферзя.
+    key = (name, color, row, col)
+    mask = _dependency_masks.get(key)
+    if mask is not None:
+        return mask
+    squares = [(row, col)]
+    if name in ('R', 'Q'):
+        squares += [(row, c) for c in range(8)] + [(r, col) for r in range(8)]
+    if name in ('B', 'Q'):
+        squares += [(r, c) for r in range(8) for c in range(8) if abs(r - row) == abs(c - col)]
+    if name in ('N', 'K'):
+        steps = KNIGHT_STEPS if name == 'N' else KING_STEPS
+        squares += [(row + dr, col + dc) for dr, dc in steps]
+    if name == 'P':
+        direction = -1 if color == 'W' else 1
+        squares += [(row + direction, col + dc) for dc in (-1, 0, 1)]
+        if row == (6 if color == 'W' else 1):
+            squares.append((row + 2 * direction, col))
+    if name not in ('P', 'R', 'N', 'B', 'Q', 'K', 'S', 'W', 'M'):
+        squares = [(r, c) for r in range(8) for c in range(8)]
+    mask = 0
+    for r, c in squares:
+        if 0 <= r < 8 and 0 <= c < 8:
+            mask |= 1 << (r * 8 + c)
+    _dependency_masks[key] = mask
+    return mask
+
+
+class MoveCache:
+    """
+    Класс, хранящий списки ходов каждой фигуры доски.
 
-    Наследует атрибуты и методы от класса Unit.
+    Доска отмечает клетки, изменённые ходом или его отменой; при следующем запросе
+    пересчитываются только фигуры, ходы которых зависят от этих клеток (dependency_mask):
+    сама походившая фигура, побитая фигура и фигуры, чьи линии проходят через клетки хода.
+
+    Атрибуты:
+        board (Board): Доска.
+        targets (dict): Клетки, куда может пойти фигура, по номеру её клетки (row * 8 + col).
+        moves_from (dict): Ходы фигуры (начало, конец) без хода на свою клетку по номеру её клетки.
+        masks (dict): Маска зависимостей по номеру клетки фигуры.
+        dirty (int): Маска клеток, изменённых после последнего запроса.
+        recomputed (int): Число пересчитанных списков (для статистики).
     """
-    def __init__(self, color):
+    def __init__(self, board):
         """
-        Конструктор для инициализации ферзя.
+        Конструктор для инициализации хранилища.
 
         Аргументы:
-            color (str): Цвет ферзя ('W' или 'B').
+            board (Board): Доска.
         """
-        super().__init__(color, 'Q')
+        self.board = board
+        self.targets = {}
+        self.moves_from = {}
+        self.masks = {}
+        self.dirty = 0
+        self.recomputed = 0
 
-    def is_valid_move(self, start, end, board):
+    def moved(self, start, end):
         """
-        Проверяет корректность хода для ферзя.
+        Отмечает клетки, изменённые ходом или его отменой.
 
         Аргументы:
-            start (tuple): Начальная позиция (строка, столбец).
-            end (tuple): Конечная позиция (строка, столбец).
-            board (list): Шахматная доска (двумерный список).
+            start (tuple): Начальная клетка.
+            end (tuple): Конечная клетка.
+        """
+        self.dirty |= (1 << (start[0] * 8 + start[1])) | (1 << (end[0] * 8 + end[1]))
 
-        Возвращает:
-            bool: True, если ход корректен, иначе False.
+    def reset(self):
+        """
+        Сбрасывает все списки (после расстановки позиции в обход move_piece).
         """
-        if (start[0] == end[0] or start[1] == end[1] or abs(start[0] - end[0]) == abs(start[1] - end[1])) and self.is_path_clear(start, end, board):
-            return board[end[0]][end[1]] is None or board[end[0]][end[1]].color != self.color
-        return False
+        self.targets.clear()
+        self.moves_from.clear()
+        self.masks.clear()
+        self.dirty = 0
 
-class King(Unit):
-    """
-    Класс, представляющий короля.
+    def _sync(self):
+        """
+        Удаляет списки фигур, зависящих от изменённых клеток.
+        """
+        dirty = self.dirty
+        masks = self.masks
+        for index in [index for index, mask in masks.items() if mask & dirty]:
+            del masks[index]
+            del self.targets[index]
+            del self.moves_from[index]
+        self.dirty = 0
 
-    Наследует атрибуты и методы от класса Unit.
-    """
-    def __init__(self, color):
+    def _compute(self, index, piece):
         """
-        Конструктор для инициализации короля.
+        Строит списки ходов фигуры.
 
         Аргументы:
-            color (str): Цвет короля ('W' или 'B').
+            index (int): Номер клетки фигуры.
+            piece (Unit): Фигура.
         """
-        super().__init__(color, 'K')
+        grid = self.board.grid
+        start = divmod(index, 8)
+        targets = [(r, c) for r in range(8) for c in range(8) if piece.is_valid_move(start, (r, c), grid)]
+        self.targets[index] = targets
+        self.moves_from[index] = [(start, end) for end in targets if end != start]
+        self.masks[index] = dependency_mask(piece.name, piece.color, start[0], start[1])
+        self.recomputed += 1
 
-    def is_valid_move(self, start, end, board):
+    def moves(self, position):
         """
-        Проверяет корректность хода для короля.
+        Возвращает клетки, куда может пойти фигура (список общий - его нельзя изменять).
 
         Аргументы:
-            start (tuple): Начальная позиция (строка, столбец).
-            end (tuple): Конечная позиция (строка, столбец).
-            board (list): Шахматная доска (двумерный список).
+            position (tuple): Позиция фигуры (строка, столбец).
 
         Возвращает:
-            bool: True, если ход корректен, иначе False.
+            list: Список клеток (как Board.get_valid_moves).
         """
-        if max(abs(start[0] - end[0]), abs(start[1] - end[1])) == 1:
-            return board[end[0]][end[1]] is None or board[end[0]][end[1]].color != self.color
-        return False
+        if self.dirty:
+            self._sync()
+        index = position[0] * 8 + position[1]
+        if index not in self.targets:
+            piece = self.board.grid[position[0]][position[1]]
+            if piece is None:
+                return []
+            self._compute(index, piece)
+        return self.targets[index]
 
-class Spider(Unit):
+    def side_moves(self, color):
+        """
+        Возвращает все ходы стороны (клетка самой фигуры не считается ходом).
+
+        Аргументы:
+            color (str): Цвет стороны ('W' или 'B').
+
+        Возвращает:
+            list: Список ходов ((строка, столбец), (строка, столбец)) в порядке клеток доски.
+        """
+        if self.dirty:
+            self._sync()
+        grid = self.board.grid
+        moves_from = self.moves_from
+        moves = []
+        index = 0
+        for row in grid:
+            for piece in row:
+                if piece is not None and piece.color == color:
+                    if index not in moves_from:
+                        self._compute(index, piece)
+                    moves.extend(moves_from[index])
+                index += 1
+        return moves
+
+class Board(Yadro.Board):
     """
-    Класс, представляющий паука (новая фигура).
+    Класс, представляющий шахматную доску с новыми фигурами.
 
-    Наследует атрибуты и методы от класса Unit.
+    Наследует атрибуты и методы от класса Yadro.Board.
+
+    Атрибуты:
+        move_cache (MoveCache): Списки ходов фигур, пересчитываемые только для затронутых ходом фигур.
     """
-    def __init__(self, color):
+    def __init__(self, setup=True):
         """
-        Конструктор для инициализации паука.
+        Конструктор для инициализации доски и расстановки фигур.
 
         Аргументы:
-            color (str): Цвет паука ('W' или 'B').
+            setup (bool): Расставить начальную позицию (иначе доска пуста).
         """
-        super().__init__(color, 'S')
+        super().__init__(setup)
+        self.move_cache = MoveCache(self)
 
-    def is_valid_move(self, start, end, board):
+    def setup_pieces(self):
         """
-        Проверяет корректность хода для паука.
+        Расставляет фигуры на доске в начальной позиции.
+        """
+        super().setup_pieces()
+        self.grid[0][2] = Spider('B') 
+        self.grid[7][2] = Spider('W')
+        self.grid[0][5] = Wizard('B')
+        self.grid[7][5] = Wizard('W')
+        self.grid[3][3] = Minotaur('B')
+        self.grid[4][4] = Minotaur('W')
+
+    def get_valid_moves(self, position):
+        """
+        Возвращает список доступных ходов для фигуры в указанной позиции.
 
         Аргументы:
-            start (tuple): Начальная позиция (строка, столбец).
-            end (tuple): Конечная позиция (строка, столбец).
-            board (list): Шахматная доска (двумерный список).
+            position (tuple): Позиция фигуры (строка, столбец).
 
         Возвращает:
-            bool: True, если ход корректен, иначе False.
+            list: Список доступных ходов.
         """
-        return abs(start[0] - end[0]) <= 2 and abs(start[1] - end[1]) <= 2  # Двигается в радиусе 2 клеток
-
-class Wizard(Unit):
-    """
-    Класс, представляющий волшебника (новая фигура).
+        return list(self.move_cache.moves(position))
 
-    Наследует атрибуты и методы от класса Unit.
-    """
-    def __init__(self, color):
+    def pack(self):
         """
-        Конструктор для инициализации волшебника.
+        Упаковывает позицию в кортеж из 64 клеток (фигуры не копируются).
 
-        Аргументы:
-            color (str): Цвет волшебника ('W' или 'B').
+        Возвращает:
+            tuple: Фигуры или None по клеткам, строка за строкой.
         """
-        super().__init__(color, 'W')
+        return tuple(piece for row in self.grid for piece in row)
 
-    def is_valid_move(self, start, end, board):
+    def unpack(self, packed):
         """
-        Проверяет корректность хода для волшебника.
+        Расставляет позицию, упакованную методом pack (история ходов не меняется).
 
         Аргументы:
-            start (tuple): Начальная позиция (строка, столбец).
-            end (tuple): Конечная позиция (строка, столбец).
-            board (list): Шахматная доска (двумерный список).
-
-        Возвращает:
-            bool: True, если ход корректен, иначе False.
+            packed (tuple): Упакованная позиция.
         """
-        return (start[0] + start[1]) % 2 == (end[0] + end[1]) % 2  # Может перемещаться только по клеткам одного цвета
+        for i in range(8):
+            self.grid[i][:] = packed[i * 8:i * 8 + 8]
+        self.move_cache.reset()
 
-class Minotaur(Unit):
+class MoveNode:
     """
-    Класс, представляющий минотавра (новая фигура).
+    Узел дерева вариантов: позиция после одного хода.
 
-    Наследует атрибуты и методы от класса Unit.
+    Атрибуты:
+        parent (MoveNode): Предыдущий узел (None для начальной позиции).
+        entry (tuple): Запись хода (начало, конец, взятая фигура) как в move_history.
+        ply (int): Число полуходов от начальной позиции.
+        children (list): Продолжения в порядке их появления.
+        selected (MoveNode): Продолжение, выбранное последним (по нему идут redo и goto).
+        checkpoint (tuple): Упакованная позиция (Board.pack) или None.
     """
-    def __init__(self, color):
+    def __init__(self, parent, entry, checkpoint=None):
         """
-        Конструктор для инициализации минотавра.
+        Конструктор для инициализации узла.
 
         Аргументы:
-            color (str): Цвет минотавра ('W' или 'B').
+            parent (MoveNode): Предыдущий узел.
+            entry (tuple): Запись хода.
+            checkpoint (tuple): Упакованная позиция.
         """
-        super().__init__(color, 'M')
+        self.parent = parent
+        self.entry = entry
+        self.ply = parent.ply + 1 if parent else 0
+        self.children = []
+        self.selected = None
+        self.checkpoint = checkpoint
 
-    def is_valid_move(self, start, end, board):
+    def notation(self):
         """
-        Проверяет корректность хода для минотавра.
-
-        Аргументы:
-            start (tuple): Начальная позиция (строка, столбец).
-            end (tuple): Конечная позиция (строка, столбец).
-            board (list): Шахматная доска (двумерный список).
+        Возвращает ход узла в виде строки.
 
         Возвращает:
-            bool: True, если ход корректен, иначе False.
+            str: Ход (например, 'e2e4').
         """
-        return start[0] == end[0] or start[1] == end[1] or abs(start[0] - end[0]) == abs(start[1] - end[1])  # Как ферзь, но через 1 клетку
+        start, end = self.entry[0], self.entry[1]
+        return (f"{FILES[start[1]]}{8 - start[0]}"
+                f"{FILES[end[1]]}{8 - end[0]}")
 
-class Board:
+class VariationTree:
     """
-    Класс, представляющий шахматную доску.
+    Класс, хранящий все сыгранные варианты партии в виде дерева.
+
+    Ход после отката не стирает старое продолжение, а добавляет соседний вариант.
+    Каждые CHECKPOINT_INTERVAL полуходов в узле сохраняется упакованная позиция,
+    поэтому переход в любой узел требует не более CHECKPOINT_INTERVAL повторов ходов.
+    Доска при этом остаётся обычной: move_history всегда равна пути к текущему узлу.
 
     Атрибуты:
-        grid (list): Двумерный список, представляющий шахматную доску.
-        move_history (list): История ходов.
+        CHECKPOINT_INTERVAL (int): Интервал сохранения позиций в полуходах.
+        board (Board): Доска партии.
+        root (MoveNode): Начальная позиция.
+        current (MoveNode): Текущая позиция.
     """
-    def __init__(self):
-        """
-        Конструктор для инициализации доски и расстановки фигур.
-        """
-        self.grid = [[None] * 8 for _ in range(8)]
-        self.move_history = []
-        self.setup_pieces()
+    CHECKPOINT_INTERVAL = 8
 
-    def setup_pieces(self):
+    def __init__(self, board):
         """
-        Расставляет фигуры на доске в начальной позиции.
+        Конструктор: строит дерево из одного варианта по текущей истории доски.
+
+        Аргументы:
+            board (Board): Доска партии.
         """
-        piece_order = [Rook, Knight, Bishop, Queen, King, Bishop, Knight, Rook]
-        for i in range(8):
-            self.grid[1][i] = Pawn('B')
-            self.grid[6][i] = Pawn('W')
-        for i, piece in enumerate(piece_order):
-            self.grid[0][i] = piece('B')
-            self.grid[7][i] = piece('W')
-        self.grid[0][2] = Spider('B') 
-        self.grid[7][2] = Spider('W')
-        self.grid[0][5] = Wizard('B')
-        self.grid[7][5] = Wizard('W')
-        self.grid[3][3] = Minotaur('B')
-        self.grid[4][4] = Minotaur('W')
+        self.board = board
+        entries = list(board.move_history)
+        for _ in entries:
+            board.undo_move()
+        self.root = MoveNode(None, None, board.pack())
+        self.current = self.root
+        for entry in entries:
+            self._apply(entry)
+            self.record()
 
-    def display(self, move_count, highlight_moves=None):
+    def _apply(self, entry):
         """
-        Отображает текущее состояние доски.
+        Повторяет записанный ход без проверки.
 
         Аргументы:
-            move_count (int): Номер текущего хода.
-            highlight_moves (list): Список позиций для подсветки доступных ходов.
+            entry (tuple): Запись хода.
         """
-        print(f"Ход: {move_count}")
-        print("  " + " ".join(string.ascii_lowercase[:8]))
-        print("  - - - - - - - - ")
-        for i in range(8):
-            row_display = f"{8 - i}|"
-            for j in range(8):
-                if highlight_moves and (i, j) in highlight_moves:
-                    row_display += "* "  # Подсветка доступных ходов
-                else:
-                    piece = self.grid[i][j]
-                    row_display += (piece.symbol if piece else '. ') + ''  
-            print(row_display + f"|{8 - i}")
-        print("  - - - - - - - - ")
-        print("  " + " ".join(string.ascii_lowercase[:8]))
+        start, end = entry[0], entry[1]
+        grid = self.board.grid
+        piece = grid[start[0]][start[1]]
+        grid[end[0]][end[1]] = piece
+        grid[start[0]][start[1]] = None
+        self.board.move_history.append(entry)
+        self.board.move_cache.moved(start, end)
+        if self.board.evaluation is not None:
+            self.board.evaluation.moved(piece, start, end, entry[2], end)
 
-    def move_piece(self, start, end):
+    def record(self):
         """
-        Перемещает фигуру на доске, если ход корректен.
+        Добавляет в дерево последний ход доски (вызывается после успешного move_piece).
+
+        Возвращает:
+            MoveNode: Новый текущий узел.
+        """
+        entry = self.board.move_history[-1]
+        for child in self.current.children:
+            if child.entry[0] == entry[0] and child.entry[1] == entry[1]:
+                node = child
+                break
+        else:
+            node = MoveNode(self.current, entry)
+            if node.ply % self.CHECKPOINT_INTERVAL == 0:
+                node.checkpoint = self.board.pack()
+            self.current.children.append(node)
+        self.current.selected = node
+        self.current = node
+        return node
+
+    def line_node(self, ply):
+        """
+        Находит узел выбранного варианта на заданном полуходе.
 
         Аргументы:
-            start (tuple): Начальная позиция (строка, столбец).
-            end (tuple): Конечная позиция (строка, столбец).
+            ply (int): Номер полухода.
 
         Возвращает:
-            bool: True, если ход выполнен успешно, иначе False.
+            MoveNode: Узел или None, если вариант короче.
         """
-        piece = self.grid[start[0]][start[1]]
-        if piece and piece.is_valid_move(start, end, self.grid):
-            self.move_history.append((start, end, self.grid[end[0]][end[1]])) 
-            self.grid[end[0]][end[1]] = piece
-            self.grid[start[0]][start[1]] = None
-            return True
-        return False
+        node = self.current
+        while node is not None and node.ply > ply:
+            node = node.parent
+        while node is not None and node.ply < ply:
+            node = node.selected
+        return node
 
-    def undo_move(self):
+    def common_ancestor(self, first, second):
         """
-        Отменяет последний ход.
+        Находит ближайший общий предшествующий узел.
+
+        Аргументы:
+            first (MoveNode): Первый узел.
+            second (MoveNode): Второй узел.
 
         Возвращает:
-            bool: True, если отмена выполнена успешно, иначе False.
+            MoveNode: Общий узел.
         """
-        if self.move_history:
-            last_move = self.move_history.pop()
-            start, end, captured = last_move
-            self.grid[start[0]][start[1]] = self.grid[end[0]][end[1]]
-            self.grid[end[0]][end[1]] = captured
-            return True
-        return False
+        while first.ply > second.ply:
+            first = first.parent
+        while second.ply > first.ply:
+            second = second.parent
+        while first is not second:
+            first, second = first.parent, second.parent
+        return first
 
-    def get_valid_moves(self, position):
+    def goto(self, target):
         """
-        Возвращает список доступных ходов для фигуры в указанной позиции.
+        Переходит в узел дерева: расставляет ближайшую сохранённую позицию
+        на пути к узлу и повторяет оставшиеся ходы.
 
         Аргументы:
-            position (tuple): Позиция фигуры (строка, столбец).
-
-        Возвращает:
-            list: Список доступных ходов.
-        """
-        piece = self.grid[position[0]][position[1]]
-        if not piece:
-            return []
-        valid_moves = []
-        for r in range(8):
-            for c in range(8):
-                if piece.is_valid_move(position, (r, c), self.grid):
-                    valid_moves.append((r, c))
-        return valid_moves
-
-class Game:
+            target (MoveNode): Узел этого дерева.
+        """
+        board = self.board
+        if target.parent is self.current:
+            self._apply(target.entry)
+        elif target is self.current.parent:
+            board.undo_move()
+        elif target is not self.current:
+            replay = []
+            node = target
+            while node.checkpoint is None:
+                replay.append(node)
+                node = node.parent
+            board.unpack(node.checkpoint)
+            if board.evaluation is not None:
+                board.evaluation.refresh()
+            entries = []
+            while node.parent is not None:
+                entries.append(node.entry)
+                node = node.parent
+            entries.reverse()
+            board.move_history[:] = entries
+            for node in reversed(replay):
+                self._apply(node.entry)
+        node = target
+        while node.parent is not None:
+            node.parent.selected = node
+            node = node.parent
+        self.current = target
+
+class Game(Yadro.Game):
     """
-    Класс, управляющий шахматной игрой.
+    Класс, управляющий шахматной игрой с новыми фигурами.
+
+    Наследует атрибуты и методы от класса Yadro.Game.
 
     Атрибуты:
-        board (Board): Объект доски.
-        current_turn (str): Текущий ход ('W' для белых, 'B' для чёрных).
-        move_count (int): Счётчик ходов.
+        tree (VariationTree): Дерево сыгранных вариантов.
+        book (Book): Книга дебютов (Kniga.Book) для подсказок или None.
     """
+    board_class = Board
+
     def __init__(self):
         """
         Конструктор для инициализации игры.
         """
-        self.board = Board()
-        self.current_turn = 'W'
-        self.move_count = 0
+        super().__init__()
+        self.tree = VariationTree(self.board)
+        self.book = None
 
     def parse_input(self, move):
         """
@@ -480,14 +551,74 @@ class Game:
         """
         if move == "undo":
             return "undo", None
-        if len(move) != 4 or move[0] not in string.ascii_lowercase[:8] or move[2] not in string.ascii_lowercase[:8]:
-            return None, None
+        return super().parse_input(move)
+
+    def navigate(self, target):
+        """
+        Переходит в узел дерева вариантов и записывает переход в журнал
+        как откаты до общего узла и ходы от него.
+
+        Аргументы:
+            target (MoveNode): Узел дерева.
+        """
+        tree = self.tree
+        ancestor = tree.common_ancestor(tree.current, target)
+        undone = tree.current.ply - ancestor.ply
+        replayed = []
+        node = target
+        while node is not ancestor:
+            replayed.append(node)
+            node = node.parent
+        shift = target.ply - tree.current.ply
+        tree.goto(target)
+        self.move_count += shift
+        if shift % 2:
+            self.current_turn = 'B' if self.current_turn == 'W' else 'W'
+        if self.journal:
+            for _ in range(undone):
+                self.journal.record_undo(self.game_id)
+            for node in reversed(replayed):
+                self.journal.record_move(self.game_id, node.notation())
+
+    def run_command(self, command):
+        """
+        Выполняет команду перемещения по дереву вариантов.
+
+        Команды: 'undo [N]' - откат на N полуходов, 'redo' - ход вперёд по выбранному
+        варианту, 'goto N' - переход к полуходу N выбранного варианта, 'lines' - список
+        продолжений, 'line K' - переход к продолжению K.
+
+        Аргументы:
+            command (list): Слова команды.
+        """
+        tree = self.tree
+        name = command[0]
         try:
-            start = (8 - int(move[1]), string.ascii_lowercase.index(move[0]))
-            end = (8 - int(move[3]), string.ascii_lowercase.index(move[2]))
-            return start, end
+            number = int(command[1]) if len(command) > 1 else None
         except ValueError:
-            return None, None
+            print("Неверный номер!")
+            return
+        target = None
+        if name == 'undo':
+            target = tree.line_node(tree.current.ply - (number or 1))
+        elif name == 'redo':
+            target = tree.current.selected
+        elif name == 'goto' and number is not None:
+            target = tree.line_node(number)
+        elif name == 'line' and number is not None:
+            if 1 <= number <= len(tree.current.children):
+                target = tree.current.children[number - 1]
+        elif name == 'lines':
+            if not tree.current.children:
+                print("Продолжений нет.")
+            for index, child in enumerate(tree.current.children, 1):
+                mark = '*' if child is tree.current.selected else ' '
+                print(f"{mark}{index}. {child.notation()}")
+            return
+        if target is None:
+            print("Переход невозможен!")
+            return
+        self.navigate(target)
 
     def play(self):
         """
@@ -495,25 +626,34 @@ class Game:
         """
         while True:
             self.board.display(self.move_count)
-            move = input(f"Ход {'белых' if self.current_turn == 'W' else 'чёрных'} (например, e2-e4 или 'undo'): ")
-            move = move.replace("-", "")
-            if move == "undo":
-                if self.board.undo_move():
-                    self.move_count -= 1
-                    self.current_turn = 'B' if self.current_turn == 'W' else 'W'
-                else:
-                    print("Откат невозможен!")
+            if self.book is not None:
+                hint = self.book.hint('fairy', self.board, self.current_turn)
+                if hint:
+                    print(hint)
+            move = input(f"Ход {'белых' if self.current_turn == 'W' else 'чёрных'} "
+                         f"(например, e2-e4, 'undo [N]', 'redo', 'goto N', 'lines', 'line K'): ")
+            command = move.split()
+            if command and command[0] in ('undo', 'redo', 'goto', 'lines', 'line'):
+                self.run_command(command)
                 continue
             start, end = self.parse_input(move)
             if start and end:
                 valid_moves = self.board.get_valid_moves(start)
                 self.board.display(self.move_count, valid_moves)  # Подсветка ходов
                 if self.board.move_piece(start, end):
+                    self.tree.record()
                     self.move_count += 1
                     self.current_turn = 'B' if self.current_turn == 'W' else 'W'
+                    if self.journal:
+                        self.journal.record_move(self.game_id, move)
                 else:
                     print("Неверный ход, попробуйте снова.")
 
 if __name__ == "__main__":
-    game = Game()
+    import Kniga
+    import Profiler
+    import Zhurnal
+    Profiler.profile_from_argv(sys.argv, [sys.modules[__name__]])
+    game = Zhurnal.game_from_argv(sys.argv, Game)
+    game.book = Kniga.book_from_argv(sys.argv)
     game.play()
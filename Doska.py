@@ -0,0 +1,484 @@
+import importlib
+import sys
+
+import Pozicii
+
+FILES = 'abcdefghijklmnopqrstuvwxyz'
+
+
+class Offboard:
+    """
+    Класс клетки за краем доски (одна на все доски).
+
+    Атрибуты:
+        color (str): Цвет, не совпадающий ни с белыми, ни с чёрными.
+        symbol (str): Символ для отображения.
+    """
+    color = 'X'
+    symbol = '#'
+
+    def __repr__(self):
+        """
+        Возвращает строковое представление клетки.
+        """
+        return 'OFFBOARD'
+
+
+OFFBOARD = Offboard()
+
+
+class Layout:
+    """
+    Класс, описывающий доску width×height, окружённую рамкой из клеток OFFBOARD.
+
+    Клетки нумеруются подряд вместе с рамкой: index = (row + padding) * stride + col + padding.
+    Рамка толщиной 2 клетки останавливает любой ход коня, паука или прыжок шашки,
+    поэтому генерации ходов не нужны проверки границ.
+
+    Атрибуты:
+        width (int): Число вертикалей.
+        height (int): Число горизонталей.
+        padding (int): Толщина рамки.
+        stride (int): Длина строки вместе с рамкой.
+        size (int): Число клеток вместе с рамкой.
+        squares (list): Индексы клеток доски по строкам.
+        rows (list): Строка доски по индексу (-1 для рамки).
+        shades (list): Цвет клетки ((строка + столбец) % 2) по индексу (-1 для рамки).
+        parity (list): Индексы клеток доски по цвету клетки ((строка + столбец) % 2).
+        orthogonal (tuple): Смещения по вертикали и горизонтали.
+        diagonal (tuple): Смещения по диагоналям.
+        knight (tuple): Смещения хода коня.
+        king (tuple): Смещения хода короля.
+        spider (tuple): Смещения в радиусе 2 клеток.
+    """
+    def __init__(self, width=8, height=8, padding=2):
+        """
+        Конструктор: вычисляет индексы и смещения для доски заданного размера.
+
+        Аргументы:
+            width (int): Число вертикалей (не больше 26).
+            height (int): Число горизонталей.
+            padding (int): Толщина рамки (не меньше 2).
+        """
+        if not 1 <= width <= len(FILES) or height < 1 or padding < 2:
+            raise ValueError(f"Недопустимый размер доски {width}×{height} (рамка {padding})")
+        self.width = width
+        self.height = height
+        self.padding = padding
+        self.stride = width + 2 * padding
+        self.size = self.stride * (height + 2 * padding)
+        self.squares = [self.index(row, col) for row in range(height) for col in range(width)]
+        self.rows = [-1] * self.size
+        self.shades = [-1] * self.size
+        self.parity = ([], [])
+        for row in range(height):
+            for col in range(width):
+                self.rows[self.index(row, col)] = row
+                self.shades[self.index(row, col)] = (row + col) % 2
+                self.parity[(row + col) % 2].append(self.index(row, col))
+        self.orthogonal = self.offsets([(-1, 0), (1, 0), (0, -1), (0, 1)])
+        self.diagonal = self.offsets([(-1, -1), (-1, 1), (1, -1), (1, 1)])
+        self.knight = self.offsets([(dr, dc) for dr in (-2, -1, 1, 2) for dc in (-2, -1, 1, 2) if abs(dr) != abs(dc)])
+        self.king = self.orthogonal + self.diagonal
+        self.spider = self.offsets([(dr, dc) for dr in range(-2, 3) for dc in range(-2, 3) if dr or dc])
+
+    def index(self, row, col):
+        """
+        Возвращает индекс клетки.
+
+        Аргументы:
+            row (int): Строка (0 - верхняя).
+            col (int): Столбец (0 - вертикаль 'a').
+
+        Возвращает:
+            int: Индекс клетки.
+        """
+        return (row + self.padding) * self.stride + col + self.padding
+
+    def coords(self, index):
+        """
+        Возвращает строку и столбец клетки.
+
+        Аргументы:
+            index (int): Индекс клетки.
+
+        Возвращает:
+            tuple: (строка, столбец).
+        """
+        row, col = divmod(index, self.stride)
+        return row - self.padding, col - self.padding
+
+    def offsets(self, steps):
+        """
+        Переводит шаги (строки, столбцы) в смещения индекса.
+
+        Аргументы:
+            steps (list): Шаги (dr, dc).
+
+        Возвращает:
+            tuple: Смещения.
+        """
+        return tuple(dr * self.stride + dc for dr, dc in steps)
+
+    def name(self, index):
+        """
+        Возвращает обозначение клетки.
+
+        Аргументы:
+            index (int): Индекс клетки.
+
+        Возвращает:
+            str: Клетка (например, 'e2'; на доске 10×10 - 'j10').
+        """
+        row, col = self.coords(index)
+        return f"{FILES[col]}{self.height - row}"
+
+
+class MailboxBoard:
+    """
+    Класс доски произвольного размера в виде одного списка клеток с рамкой.
+
+    Фигуры берутся из модуля игры (Dop156 или Shashechki) и ходят по его правилам;
+    ходы генерируются по заранее вычисленным смещениям без проверок границ.
+
+    Атрибуты:
+        BACK_RANKS (dict): Последняя горизонталь новых шахмат по ширине доски.
+        layout (Layout): Геометрия доски.
+        module (module): Модуль игры.
+        pieces (dict): Общие фигуры модуля по букве (Pozicii.piece_set).
+        cells (list): Фигура, None или OFFBOARD по индексу клетки.
+        move_history (list): История ходов (начало, конец, фигура, взятая фигура, клетка взятия).
+    """
+    BACK_RANKS = {8: 'RNSQKWNR', 10: 'RNSBQKBWNR', 12: 'RNSBMQKMBWNR'}
+
+    def __init__(self, width=8, height=8, module=None, setup=True):
+        """
+        Конструктор для инициализации доски.
+
+        Аргументы:
+            width (int): Число вертикалей.
+            height (int): Число горизонталей.
+            module (module): Модуль игры (по умолчанию Dop156).
+            setup (bool): Расставить начальную позицию.
+        """
+        self.layout = Layout(width, height)
+        self.module = module if module is not None else importlib.import_module('Dop156')
+        self.pieces = Pozicii.piece_set(self.module).pieces
+        self.cells = [OFFBOARD] * self.layout.size
+        for index in self.layout.squares:
+            self.cells[index] = None
+        self.move_history = []
+        self._generators = {
+            'P': self._pawn, 'N': self._knight, 'K': self._king,
+            'R': self._rook, 'B': self._bishop, 'Q': self._queen,
+            'S': self._spider, 'W': self._wizard, 'M': self._minotaur,
+            'C': self._checker, 'D': self._none,
+        }
+        if setup:
+            self.setup_pieces()
+
+    @classmethod
+    def from_grid(cls, grid, module):
+        """
+        Создаёт доску по двумерному списку (например, Board.grid модуля игры).
+
+        Аргументы:
+            grid (list): Двумерный список фигур.
+            module (module): Модуль игры.
+
+        Возвращает:
+            MailboxBoard: Доска с той же позицией.
+        """
+        board = cls(len(grid[0]), len(grid), module, setup=False)
+        for row, line in enumerate(grid):
+            for col, piece in enumerate(line):
+                board.cells[board.layout.index(row, col)] = piece
+        return board
+
+    def to_grid(self):
+        """
+        Возвращает позицию в виде двумерного списка.
+
+        Возвращает:
+            list: Двумерный список фигур.
+        """
+        layout = self.layout
+        return [[self.cells[layout.index(row, col)] for col in range(layout.width)] for row in range(layout.height)]
+
+    def setup_pieces(self):
+        """
+        Расставляет начальную позицию: шашки на тёмных клетках или новые шахматы
+        (BACK_RANKS, пешки на второй горизонтали, минотавры в центре).
+        """
+        layout = self.layout
+        pieces = self.pieces
+        if 'c' in pieces:
+            rows = (layout.height - 2) // 2
+            for row in range(layout.height):
+                for col in range(layout.width):
+                    if (row + col) % 2 == 1 and (row < rows or row >= layout.height - rows):
+                        self.cells[layout.index(row, col)] = pieces['c' if row < rows else 'C']
+            return
+        back_rank = self.BACK_RANKS.get(layout.width)
+        if back_rank is None:
+            raise ValueError(f"Нет начальной расстановки для ширины {layout.width}")
+        for col, name in enumerate(back_rank):
+            self.cells[layout.index(0, col)] = pieces[name.lower()]
+            self.cells[layout.index(1, col)] = pieces['p']
+            self.cells[layout.index(layout.height - 2, col)] = pieces['P']
+            self.cells[layout.index(layout.height - 1, col)] = pieces[name]
+        middle_row, middle_col = layout.height // 2, layout.width // 2
+        self.cells[layout.index(middle_row - 1, middle_col - 1)] = pieces['m']
+        self.cells[layout.index(middle_row, middle_col)] = pieces['M']
+
+    def display(self, move_count):
+        """
+        Отображает текущее состояние доски.
+
+        Аргументы:
+            move_count (int): Номер текущего хода.
+        """
+        layout = self.layout
+        files = "   " + " ".join(FILES[:layout.width])
+        print(f"Ход: {move_count}")
+        print(files)
+        for row in range(layout.height):
+            line = ''
+            for col in range(layout.width):
+                piece = self.cells[layout.index(row, col)]
+                line += (piece.symbol if piece else '.') + ' '
+            print(f"{layout.height - row:>2}|{line}|{layout.height - row}")
+        print(files)
+
+    def _steps(self, square, color, offsets):
+        """
+        Ходы на одну клетку по смещениям: на пустую клетку или со взятием.
+        """
+        cells = self.cells
+        targets = []
+        for offset in offsets:
+            target = cells[square + offset]
+            if target is None or (target is not OFFBOARD and target.color != color):
+                targets.append(square + offset)
+        return targets
+
+    def _slides(self, square, color, offsets):
+        """
+        Ходы по лучам до первой занятой клетки (её можно побить, если фигура чужая).
+        """
+        cells = self.cells
+        targets = []
+        for offset in offsets:
+            end = square + offset
+            target = cells[end]
+            while target is None:
+                targets.append(end)
+                end += offset
+                target = cells[end]
+            if target is not OFFBOARD and target.color != color:
+                targets.append(end)
+        return targets
+
+    def _pawn(self, square, color):
+        """
+        Ходы пешки: вперёд на 1 (или на 2 со второй горизонтали) и взятие по диагонали.
+        """
+        cells = self.cells
+        forward = -self.layout.stride if color == 'W' else self.layout.stride
+        targets = []
+        if cells[square + forward] is None:
+            targets.append(square + forward)
+            start_row = self.layout.height - 2 if color == 'W' else 1
+            if self.layout.rows[square] == start_row and cells[square + 2 * forward] is None:
+                targets.append(square + 2 * forward)
+        for end in (square + forward - 1, square + forward + 1):
+            target = cells[end]
+            if target is not None and target is not OFFBOARD and target.color != color:
+                targets.append(end)
+        return targets
+
+    def _knight(self, square, color):
+        """
+        Ходы коня.
+        """
+        return self._steps(square, color, self.layout.knight)
+
+    def _king(self, square, color):
+        """
+        Ходы короля.
+        """
+        return self._steps(square, color, self.layout.king)
+
+    def _rook(self, square, color):
+        """
+        Ходы ладьи.
+        """
+        return self._slides(square, color, self.layout.orthogonal)
+
+    def _bishop(self, square, color):
+        """
+        Ходы слона.
+        """
+        return self._slides(square, color, self.layout.diagonal)
+
+    def _queen(self, square, color):
+        """
+        Ходы ферзя.
+        """
+        return self._slides(square, color, self.layout.king)
+
+    def _spider(self, square, color):
+        """
+        Ходы паука: любая клетка в радиусе 2 (фигуры и их цвет не учитываются).
+        """
+        cells = self.cells
+        return [square + offset for offset in self.layout.spider if cells[square + offset] is not OFFBOARD]
+
+    def _wizard(self, square, color):
+        """
+        Ходы волшебника: любая другая клетка того же цвета.
+        """
+        return [end for end in self.layout.parity[self.layout.shades[square]] if end != square]
+
+    def _minotaur(self, square, color):
+        """
+        Ходы минотавра: любая клетка на линиях ферзя, без учёта фигур на пути.
+        """
+        cells = self.cells
+        targets = []
+        for offset in self.layout.king:
+            end = square + offset
+            while cells[end] is not OFFBOARD:
+                targets.append(end)
+                end += offset
+        return targets
+
+    def _checker(self, square, color):
+        """
+        Ходы шашки: вперёд по диагонали на пустую клетку или прыжок через чужую шашку.
+        """
+        cells = self.cells
+        stride = self.layout.stride
+        forward = -stride if color == 'W' else stride
+        targets = [square + forward + side for side in (-1, 1) if cells[square + forward + side] is None]
+        for offset in self.layout.diagonal:
+            jumped = cells[square + offset]
+            if (jumped is not None and jumped is not OFFBOARD and jumped.color != color
+                    and cells[square + 2 * offset] is None):
+                targets.append(square + 2 * offset)
+        return targets
+
+    def _none(self, square, color):
+        """
+        Фигура без ходов (дамка в Shashechki не ходит).
+        """
+        return []
+
+    def targets(self, square):
+        """
+        Возвращает клетки, на которые может пойти фигура.
+
+        Аргументы:
+            square (int): Индекс клетки фигуры.
+
+        Возвращает:
+            list: Индексы клеток.
+        """
+        piece = self.cells[square]
+        if piece is None or piece is OFFBOARD:
+            return []
+        return self._generators[piece.name](square, piece.color)
+
+    def generate_moves(self, color):
+        """
+        Возвращает все ходы стороны.
+
+        Аргументы:
+            color (str): Цвет стороны ('W' или 'B').
+
+        Возвращает:
+            list: Ходы (индекс начала, индекс конца).
+        """
+        cells = self.cells
+        generators = self._generators
+        moves = []
+        for square in self.layout.squares:
+            piece = cells[square]
+            if piece is not None and piece.color == color:
+                for end in generators[piece.name](square, color):
+                    moves.append((square, end))
+        return moves
+
+    def make_move(self, start, end):
+        """
+        Выполняет ход без проверки (взятие через прыжок и превращение шашки в дамку учитываются).
+
+        Аргументы:
+            start (int): Индекс начальной клетки.
+            end (int): Индекс конечной клетки.
+        """
+        cells = self.cells
+        piece = cells[start]
+        captured_at = end
+        if piece.name == 'C' and abs(end - start) > self.layout.stride + 1:
+            captured_at = (start + end) // 2
+        captured = cells[captured_at]
+        self.move_history.append((start, end, piece, captured, captured_at))
+        cells[captured_at] = None
+        cells[start] = None
+        if piece.name == 'C' and self.layout.rows[end] == (0 if piece.color == 'W' else self.layout.height - 1):
+            piece = self.pieces['D' if piece.color == 'W' else 'd']
+        cells[end] = piece
+
+    def move_piece(self, start, end):
+        """
+        Перемещает фигуру, если ход корректен.
+
+        Аргументы:
+            start (tuple): Начальная позиция (строка, столбец).
+            end (tuple): Конечная позиция (строка, столбец).
+
+        Возвращает:
+            bool: True, если ход выполнен успешно, иначе False.
+        """
+        layout = self.layout
+        for row, col in (start, end):
+            if not (0 <= row < layout.height and 0 <= col < layout.width):
+                return False  # Индекс клетки вне доски попал бы в рамку или на другую горизонталь
+        start_index, end_index = layout.index(*start), layout.index(*end)
+        if end_index not in self.targets(start_index):
+            return False
+        self.make_move(start_index, end_index)
+        return True
+
+    def undo_move(self):
+        """
+        Отменяет последний ход.
+
+        Возвращает:
+            bool: True, если отмена выполнена успешно, иначе False.
+        """
+        if not self.move_history:
+            return False
+        start, end, piece, captured, captured_at = self.move_history.pop()
+        self.cells[end] = None
+        self.cells[captured_at] = captured
+        self.cells[start] = piece
+        return True
+
+
+def main():
+    """
+    Точка входа: выводит начальную позицию и число ходов белых для доски заданного размера.
+    """
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    height = int(sys.argv[2]) if len(sys.argv) > 2 else width
+    module = importlib.import_module(sys.argv[3]) if len(sys.argv) > 3 else None
+    board = MailboxBoard(width, height, module)
+    board.display(0)
+    moves = board.generate_moves('W')
+    print(f"Ходов белых: {len(moves)}")
+    print(" ".join(board.layout.name(start) + board.layout.name(end) for start, end in moves[:20]))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,895 @@
+import importlib
+import sys
+import threading
+import time
+
+import Hody
+import Ocenka
+import Pozicii
+
+MATE_SCORE = 100000
+PIECE_VALUES = {'P': 100, 'N': 300, 'B': 300, 'R': 500, 'Q': 900, 'K': 0, 'S': 350, 'W': 400, 'M': 700}
+CHECKERS_VALUES = {'C': 100, 'D': 300}
+
+
+class Variant:
+    """
+    Класс, описывающий вариант игры для движка.
+
+    Атрибуты:
+        name (str): Название варианта ('chess', 'fairy' или 'checkers').
+        module (module): Модуль с классами Board и Game варианта.
+        values (dict): Стоимость фигур по их названию.
+        weights (Weights): Веса оценки, подключаемой к доскам варианта (Ocenka).
+    """
+    def __init__(self, name, module, values=None):
+        """
+        Конструктор для инициализации варианта.
+
+        Аргументы:
+            name (str): Название варианта.
+            module (module): Модуль с классами Board и Game.
+            values (dict): Стоимость фигур (по умолчанию PIECE_VALUES).
+        """
+        self.name = name
+        self.module = module
+        self.values = values if values is not None else PIECE_VALUES
+        self.weights = Ocenka.Weights(self.values, defaults=False)
+
+    def new_board(self):
+        """
+        Создаёт доску в начальной позиции с подключённой оценкой.
+
+        Возвращает:
+            Board: Новая доска.
+        """
+        board = self.module.Board()
+        Ocenka.attach(board, self.weights)
+        return board
+
+    def parse_move(self, move):
+        """
+        Переводит ход вида 'e2e4' в координаты по таблице ходов Hody.
+
+        Аргументы:
+            move (str): Ход (например, 'e2e4' или 'e2-e4').
+
+        Возвращает:
+            tuple: Начальная и конечная позиции или (None, None).
+        """
+        move = Hody.decode(move)
+        return move if move is not None else (None, None)
+
+    def generate_moves(self, board, color):
+        """
+        Возвращает все ходы стороны, разрешённые правилами фигур.
+
+        Доска со списками ходов фигур (Dop156.MoveCache) отдаёт их, пересчитывая
+        только фигуры, затронутые ходами после прошлого запроса.
+
+        Аргументы:
+            board (Board): Доска.
+            color (str): Цвет стороны ('W' или 'B').
+
+        Возвращает:
+            list: Список ходов ((строка, столбец), (строка, столбец)).
+        """
+        cache = getattr(board, 'move_cache', None)
+        if cache is not None:
+            return cache.side_moves(color)
+        grid = board.grid
+        moves = []
+        for r in range(8):
+            for c in range(8):
+                piece = grid[r][c]
+                if piece is None or piece.color != color:
+                    continue
+                start = (r, c)
+                for er in range(8):
+                    for ec in range(8):
+                        if (er != r or ec != c) and piece.is_valid_move(start, (er, ec), grid):
+                            moves.append((start, (er, ec)))
+        return moves
+
+    def new_search(self, board, color, table=None, stop_event=None, info=None):
+        """
+        Создаёт поиск лучшего хода для позиции.
+
+        Аргументы:
+            board (Board): Доска.
+            color (str): Сторона, которой принадлежит ход.
+            table (dict): Общая хеш-таблица (создаётся новая, если не задана).
+            stop_event (threading.Event): Флаг остановки поиска.
+            info (callable): Функция вывода строк info.
+
+        Возвращает:
+            Search: Поиск с методом run(depth, movetime, nodes).
+        """
+        return Search(self, board, color, table, stop_event=stop_event, info=info)
+
+    def make_move(self, board, move):
+        """
+        Выполняет ход на доске.
+
+        Аргументы:
+            board (Board): Доска.
+            move (tuple): Ход (начало, конец).
+
+        Возвращает:
+            bool: True, если ход выполнен.
+        """
+        return board.move_piece(move[0], move[1])
+
+    def unmake_move(self, board):
+        """
+        Отменяет последний ход на доске.
+
+        Аргументы:
+            board (Board): Доска.
+        """
+        board.undo_move()
+
+    def is_lost(self, board, color):
+        """
+        Проверяет, проиграла ли сторона (король побит).
+
+        Аргументы:
+            board (Board): Доска.
+            color (str): Цвет стороны.
+
+        Возвращает:
+            bool: True, если короля стороны нет на доске.
+        """
+        for row in board.grid:
+            for piece in row:
+                if piece is not None and piece.name == 'K' and piece.color == color:
+                    return False
+        return True
+
+    def no_moves_score(self, ply):
+        """
+        Возвращает оценку позиции, в которой у стороны нет ходов.
+
+        Аргументы:
+            ply (int): Расстояние от корня поиска.
+
+        Возвращает:
+            int: Оценка (в шахматах - ничья).
+        """
+        return 0
+
+    def evaluate(self, board, color):
+        """
+        Оценивает позицию с точки зрения стороны: берёт оценку, подключённую к доске,
+        а для доски без неё считает материал по всей доске.
+
+        Аргументы:
+            board (Board): Доска.
+            color (str): Цвет стороны.
+
+        Возвращает:
+            int: Оценка в сотых долях пешки.
+        """
+        evaluation = board.evaluation
+        if evaluation is not None:
+            return evaluation.score(color)
+        score = 0
+        values = self.values
+        for row in board.grid:
+            for piece in row:
+                if piece is not None:
+                    value = values.get(piece.name, 0)
+                    score += value if piece.color == color else -value
+        return score
+
+    def position_key(self, board, color):
+        """
+        Возвращает ключ позиции для хеш-таблицы.
+
+        Аргументы:
+            board (Board): Доска.
+            color (str): Сторона, которой принадлежит ход.
+
+        Возвращает:
+            str: Ключ позиции.
+        """
+        return color + ''.join(piece.color + piece.name if piece else '..' for row in board.grid for piece in row)
+
+    def captured_piece(self, board, move):
+        """
+        Возвращает фигуру, которая будет побита ходом.
+
+        Аргументы:
+            board (Board): Доска.
+            move (tuple): Ход (начало, конец).
+
+        Возвращает:
+            Unit: Побитая фигура или None.
+        """
+        return board.grid[move[1][0]][move[1][1]]
+
+    def format_move(self, move):
+        """
+        Переводит ход в строку вида 'e2e4'.
+
+        Аргументы:
+            move (tuple): Ход (начало, конец).
+
+        Возвращает:
+            str: Ход в текстовом виде.
+        """
+        (sr, sc), (er, ec) = move
+        return f"{'abcdefgh'[sc]}{8 - sr}{'abcdefgh'[ec]}{8 - er}"
+
+
+class CheckersVariant(Variant):
+    """
+    Класс, описывающий шашки для движка.
+
+    Наследует атрибуты и методы от класса Variant.
+    """
+    DIRECTIONS = [(-1, -1), (-1, 1), (1, -1), (1, 1), (-2, -2), (-2, 2), (2, -2), (2, 2)]
+
+    def __init__(self, name='checkers', module=None, values=None):
+        """
+        Конструктор для инициализации варианта шашек.
+
+        Аргументы:
+            name (str): Название варианта.
+            module (module): Модуль с классами Board и Game (по умолчанию Shashechki).
+            values (dict): Стоимость шашек (по умолчанию CHECKERS_VALUES).
+        """
+        if module is None:
+            module = importlib.import_module('Shashechki')
+        super().__init__(name, module, values if values is not None else CHECKERS_VALUES)
+
+    def generate_moves(self, board, color):
+        """
+        Возвращает все ходы стороны: шаги и взятия по диагоналям.
+
+        Аргументы:
+            board (Board): Доска.
+            color (str): Цвет стороны ('W' или 'B').
+
+        Возвращает:
+            list: Список ходов ((строка, столбец), (строка, столбец)).
+        """
+        grid = board.grid
+        moves = []
+        for r in range(8):
+            for c in range(8):
+                piece = grid[r][c]
+                if piece is None or piece.color != color:
+                    continue
+                start = (r, c)
+                for drow, dcol in self.DIRECTIONS:
+                    end = (r + drow, c + dcol)
+                    if 0 <= end[0] < 8 and 0 <= end[1] < 8 and piece.is_valid_move(start, end, grid):
+                        moves.append((start, end))
+        return moves
+
+    def new_search(self, board, color, table=None, stop_event=None, info=None):
+        """
+        Создаёт поиск, настроенный на шашки (Analiz.CheckersSearch).
+
+        Аргументы:
+            board (Board): Доска.
+            color (str): Сторона, которой принадлежит ход.
+            table (dict): Общая хеш-таблица.
+            stop_event (threading.Event): Флаг остановки поиска.
+            info (callable): Функция вывода строк info.
+
+        Возвращает:
+            CheckersSearch: Поиск с методом run(depth, movetime, nodes).
+        """
+        import Analiz
+        return Analiz.CheckersSearch(board, color, table, stop_event=stop_event, info=info)
+
+    def captured_piece(self, board, move):
+        """
+        Возвращает шашку, которая будет побита ходом (через неё прыгают).
+
+        Аргументы:
+            board (Board): Доска.
+            move (tuple): Ход (начало, конец).
+
+        Возвращает:
+            Unit: Побитая шашка или None.
+        """
+        (sr, sc), (er, ec) = move
+        if abs(sr - er) != 2:
+            return None
+        return board.grid[(sr + er) // 2][(sc + ec) // 2]
+
+    def is_lost(self, board, color):
+        """
+        В шашках поражение определяется отсутствием ходов.
+
+        Аргументы:
+            board (Board): Доска.
+            color (str): Цвет стороны.
+
+        Возвращает:
+            bool: Всегда False.
+        """
+        return False
+
+    def no_moves_score(self, ply):
+        """
+        Сторона без ходов в шашках проигрывает.
+
+        Аргументы:
+            ply (int): Расстояние от корня поиска.
+
+        Возвращает:
+            int: Оценка проигрыша.
+        """
+        return -MATE_SCORE + ply
+
+
+class VariantRegistry:
+    """
+    Класс, хранящий варианты игры по названию.
+
+    Модуль варианта импортируется, а объект варианта создаётся при первом обращении,
+    поэтому процесс, которому нужен один вариант, не загружает остальные.
+
+    Атрибуты:
+        entries (dict): Название модуля и класс варианта по названию варианта.
+        loaded (dict): Уже созданные варианты.
+    """
+    def __init__(self):
+        """
+        Конструктор для инициализации пустого реестра.
+        """
+        self.entries = {}
+        self.loaded = {}
+
+    def register(self, name, module_name, variant_class=None):
+        """
+        Добавляет вариант в реестр (модуль при этом не импортируется).
+
+        Аргументы:
+            name (str): Название варианта.
+            module_name (str): Название модуля с классами Board и Game.
+            variant_class (type): Класс варианта (по умолчанию Variant).
+        """
+        self.entries[name] = (module_name, variant_class or Variant)
+        self.loaded.pop(name, None)
+
+    def __getitem__(self, name):
+        """
+        Возвращает вариант, создавая его при первом обращении.
+
+        Аргументы:
+            name (str): Название варианта.
+
+        Возвращает:
+            Variant: Вариант игры.
+        """
+        variant = self.loaded.get(name)
+        if variant is None:
+            module_name, variant_class = self.entries[name]
+            variant = self.loaded[name] = variant_class(name, importlib.import_module(module_name))
+        return variant
+
+    def __contains__(self, name):
+        """
+        Проверяет, зарегистрирован ли вариант (без его загрузки).
+        """
+        return name in self.entries
+
+    def __iter__(self):
+        """
+        Перебирает названия вариантов в порядке регистрации.
+        """
+        return iter(self.entries)
+
+    def __len__(self):
+        """
+        Возвращает число зарегистрированных вариантов.
+        """
+        return len(self.entries)
+
+
+VARIANTS = VariantRegistry()
+VARIANTS.register('chess', 'ChessOsnova')
+VARIANTS.register('fairy', 'Dop156')
+VARIANTS.register('checkers', 'Shashechki', CheckersVariant)
+
+
+def opponent(color):
+    """
+    Возвращает цвет соперника.
+
+    Аргументы:
+        color (str): Цвет стороны ('W' или 'B').
+
+    Возвращает:
+        str: Цвет соперника.
+    """
+    return 'B' if color == 'W' else 'W'
+
+
+def format_score(score):
+    """
+    Переводит оценку в запись протокола ('cp N' или 'mate N').
+
+    Аргументы:
+        score (int): Оценка позиции.
+
+    Возвращает:
+        str: Оценка в формате протокола.
+    """
+    if abs(score) >= MATE_SCORE - 64:
+        plies = MATE_SCORE - abs(score)
+        return f"mate {(plies + 1) // 2 if score > 0 else -(plies // 2)}"
+    return f"cp {score}"
+
+
+def score_to_table(score, ply):
+    """
+    Переводит оценку для записи в хеш-таблицу: оценка мата считается от узла, а не от корня.
+
+    Хеш-таблица общая для всех поисков (команд go), а позиция встречается на разных расстояниях
+    от корня, поэтому в таблице мат хранится как число полуходов от самой позиции.
+
+    Аргументы:
+        score (int): Оценка (мат - число полуходов от корня).
+        ply (int): Расстояние узла от корня.
+
+    Возвращает:
+        int: Оценка для хеш-таблицы.
+    """
+    if score >= MATE_SCORE - 64:
+        return score + ply
+    if score <= -MATE_SCORE + 64:
+        return score - ply
+    return score
+
+
+def score_from_table(score, ply):
+    """
+    Переводит оценку из хеш-таблицы обратно в расстояние от корня (обратно score_to_table).
+
+    Аргументы:
+        score (int): Оценка из хеш-таблицы.
+        ply (int): Расстояние узла от корня.
+
+    Возвращает:
+        int: Оценка для поиска.
+    """
+    if score >= MATE_SCORE - 64:
+        return score - ply
+    if score <= -MATE_SCORE + 64:
+        return score + ply
+    return score
+
+
+class SearchStopped(Exception):
+    """
+    Исключение, прерывающее поиск по команде stop или по лимиту.
+    """
+
+
+class Search:
+    """
+    Класс, выполняющий поиск лучшего хода (альфа-бета с итеративным углублением).
+
+    Атрибуты:
+        variant (Variant): Вариант игры.
+        board (Board): Доска, на которой выполняется поиск.
+        color (str): Сторона, которой принадлежит ход.
+        table (dict): Хеш-таблица позиций.
+        table_size (int): Максимальное число записей в хеш-таблице.
+        nodes (int): Число просмотренных узлов.
+        stop_event (threading.Event): Флаг остановки поиска.
+    """
+    def __init__(self, variant, board, color, table=None, table_size=1 << 18, stop_event=None, info=None):
+        """
+        Конструктор для инициализации поиска.
+
+        Аргументы:
+            variant (Variant): Вариант игры.
+            board (Board): Доска.
+            color (str): Сторона, которой принадлежит ход.
+            table (dict): Общая хеш-таблица (создаётся новая, если не задана).
+            table_size (int): Максимальное число записей в хеш-таблице.
+            stop_event (threading.Event): Флаг остановки поиска.
+            info (callable): Функция вывода строк info.
+        """
+        self.variant = variant
+        self.board = board
+        self.color = color
+        self.table = table if table is not None else {}
+        self.table_size = table_size
+        self.stop_event = stop_event or threading.Event()
+        self.info = info
+        self.nodes = 0
+        self.deadline = None
+        self.max_nodes = None
+        self.start_time = 0.0
+
+    def hashfull(self):
+        """
+        Возвращает заполненность хеш-таблицы в промилле.
+
+        Возвращает:
+            int: Заполненность от 0 до 1000.
+        """
+        return len(self.table) * 1000 // self.table_size
+
+    def order_moves(self, moves, best):
+        """
+        Упорядочивает ходы: сначала ход из хеш-таблицы, затем взятия.
+
+        Аргументы:
+            moves (list): Список ходов.
+            best (tuple): Лучший ход из хеш-таблицы или None.
+
+        Возвращает:
+            list: Упорядоченный список ходов.
+        """
+        board = self.board
+        variant = self.variant
+        values = variant.values
+
+        def key(move):
+            if move == best:
+                return -MATE_SCORE
+            target = variant.captured_piece(board, move)
+            if target is None:
+                return 0
+            if target.name == 'K':
+                return -MATE_SCORE + 1
+            return -values.get(target.name, 0)
+        return sorted(moves, key=key)
+
+    def check_limits(self):
+        """
+        Проверяет флаг остановки и лимиты времени и узлов.
+        """
+        if self.stop_event.is_set():
+            raise SearchStopped
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchStopped
+        if self.max_nodes is not None and self.nodes >= self.max_nodes:
+            raise SearchStopped
+
+    def negamax(self, depth, alpha, beta, color, ply):
+        """
+        Рекурсивный альфа-бета поиск.
+
+        Аргументы:
+            depth (int): Оставшаяся глубина.
+            alpha (int): Нижняя граница.
+            beta (int): Верхняя граница.
+            color (str): Сторона, которой принадлежит ход.
+            ply (int): Расстояние от корня.
+
+        Возвращает:
+            int: Оценка позиции для стороны color.
+        """
+        self.nodes += 1
+        self.check_limits()
+        variant = self.variant
+        board = self.board
+        if variant.is_lost(board, color):
+            return -MATE_SCORE + ply
+        if depth <= 0:
+            return variant.evaluate(board, color)
+
+        key = variant.position_key(board, color)
+        entry = self.table.get(key)
+        best_move = None
+        if entry is not None:
+            entry_depth, entry_score, entry_flag, best_move = entry
+            if entry_depth >= depth and ply > 0:
+                entry_score = score_from_table(entry_score, ply)
+                if entry_flag == 0:
+                    return entry_score
+                if entry_flag < 0 and entry_score <= alpha:
+                    return entry_score
+                if entry_flag > 0 and entry_score >= beta:
+                    return entry_score
+
+        moves = variant.generate_moves(board, color)
+        if not moves:
+            return variant.no_moves_score(ply)
+        original_alpha = alpha
+        best_score = -MATE_SCORE - 1
+        for move in self.order_moves(moves, best_move):
+            if not variant.make_move(board, move):
+                continue
+            try:
+                score = -self.negamax(depth - 1, -beta, -alpha, opponent(color), ply + 1)
+            finally:
+                variant.unmake_move(board)
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+
+        flag = 0
+        if best_score <= original_alpha:
+            flag = -1
+        elif best_score >= beta:
+            flag = 1
+        if len(self.table) >= self.table_size:
+            self.table.clear()
+        self.table[key] = (depth, score_to_table(best_score, ply), flag, best_move)
+        return best_score
+
+    def principal_variation(self, length):
+        """
+        Восстанавливает главную линию по хеш-таблице.
+
+        Аргументы:
+            length (int): Максимальная длина линии.
+
+        Возвращает:
+            list: Список ходов.
+        """
+        variant = self.variant
+        board = self.board
+        color = self.color
+        line = []
+        for _ in range(length):
+            entry = self.table.get(variant.position_key(board, color))
+            if entry is None or entry[3] is None or not variant.make_move(board, entry[3]):
+                break
+            line.append(entry[3])
+            color = opponent(color)
+        for _ in line:
+            variant.unmake_move(board)
+        return line
+
+    def run(self, depth=None, movetime=None, nodes=None):
+        """
+        Выполняет поиск с итеративным углублением.
+
+        Аргументы:
+            depth (int): Максимальная глубина (None - без ограничения).
+            movetime (int): Лимит времени в миллисекундах.
+            nodes (int): Лимит числа узлов.
+
+        Возвращает:
+            tuple: Лучший ход и его оценка.
+        """
+        self.start_time = time.perf_counter()
+        self.deadline = self.start_time + movetime / 1000 if movetime else None
+        self.max_nodes = nodes
+        self.nodes = 0
+        moves = self.variant.generate_moves(self.board, self.color)
+        best = (moves[0] if moves else None, 0)
+        max_depth = depth if depth else 64
+        for current in range(1, max_depth + 1):
+            try:
+                score = self.negamax(current, -MATE_SCORE - 1, MATE_SCORE + 1, self.color, 0)
+            except SearchStopped:
+                break
+            pv = self.principal_variation(current)
+            if pv:
+                best = (pv[0], score)
+            if self.info:
+                elapsed = max(time.perf_counter() - self.start_time, 1e-6)
+                self.info(f"info depth {current} score {format_score(score)} nodes {self.nodes} "
+                          f"nps {int(self.nodes / elapsed)} hashfull {self.hashfull()} "
+                          f"time {int(elapsed * 1000)} pv {' '.join(self.variant.format_move(m) for m in pv)}")
+            if abs(score) >= MATE_SCORE - 64:
+                break
+        return best
+
+
+class Engine:
+    """
+    Класс, реализующий UCI-подобный протокол движка через stdin/stdout.
+
+    Атрибуты:
+        variant (Variant): Текущий вариант игры.
+        board (Board): Текущая позиция.
+        color (str): Сторона, которой принадлежит ход.
+        table (dict): Хеш-таблица, сохраняемая между поисками.
+        book (Book): Книга дебютов (Kniga.Book), которая проверяется до поиска, или None.
+        thread (threading.Thread): Поток поиска.
+        stop_event (threading.Event): Флаг остановки поиска.
+    """
+    def __init__(self, variant='chess', output=None):
+        """
+        Конструктор для инициализации движка.
+
+        Аргументы:
+            variant (str): Название варианта ('chess', 'fairy' или 'checkers').
+            output (file): Поток для вывода ответов (по умолчанию stdout).
+        """
+        self.output = output or sys.stdout
+        self.lock = threading.Lock()
+        self.variant = VARIANTS[variant]
+        self.table = {}
+        self.book = None
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.new_game()
+
+    def send(self, line):
+        """
+        Выводит строку ответа.
+
+        Аргументы:
+            line (str): Строка ответа.
+        """
+        with self.lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def new_game(self):
+        """
+        Сбрасывает позицию и хеш-таблицу.
+        """
+        self.stop()
+        self.board = self.variant.new_board()
+        self.color = 'W'
+        self.table.clear()
+
+    def set_book(self, path):
+        """
+        Открывает книгу дебютов (Kniga.py); '<empty>' отключает книгу.
+
+        Аргументы:
+            path (str): Путь к файлу книги.
+        """
+        import Kniga
+        self.stop()
+        if self.book is not None:
+            self.book.close()
+            self.book = None
+        if path and path != '<empty>':
+            try:
+                self.book = Kniga.Book(path)
+            except (OSError, ValueError) as error:
+                self.send(f"info string bad book: {error}")
+
+    def set_position(self, tokens):
+        """
+        Устанавливает позицию по команде position.
+
+        Аргументы:
+            tokens (list): Аргументы команды (например, ['startpos', 'moves', 'e2e4'] или ['fen', ..., 'moves', ...]).
+        """
+        self.stop()
+        self.board = self.variant.new_board()
+        self.color = 'W'
+        if tokens and tokens[0] == 'fen':
+            end = tokens.index('moves') if 'moves' in tokens else len(tokens)
+            try:
+                self.board, self.color, _ = Pozicii.load(' '.join(tokens[1:end]), self.variant.module, self.board)
+            except ValueError as error:
+                self.send(f"info string bad fen: {error}")
+                return
+        if 'moves' in tokens:
+            for move in tokens[tokens.index('moves') + 1:]:
+                start, end = self.variant.parse_move(move)
+                if start is None or not self.board.move_piece(start, end):
+                    self.send(f"info string illegal move {move}")
+                    return
+                self.color = opponent(self.color)
+
+    def go(self, tokens):
+        """
+        Запускает поиск в отдельном потоке по команде go.
+
+        Аргументы:
+            tokens (list): Аргументы команды (depth N, movetime N, nodes N, infinite).
+        """
+        self.stop()
+        limits = {}
+        for name in ('depth', 'movetime', 'nodes'):
+            if name in tokens:
+                try:
+                    limits[name] = int(tokens[tokens.index(name) + 1])
+                except (IndexError, ValueError):
+                    self.send(f"info string bad {name}")
+                    return
+        if self.book is not None and 'infinite' not in tokens:
+            moves = self.book.probe(self.variant.name, self.board, self.color)
+            if moves:
+                move, weight, count = moves[0]
+                self.send(f"info string book {self.variant.format_move(move)} weight {weight} count {count}")
+                self.send(f"bestmove {self.variant.format_move(move)}")
+                return
+        self.stop_event = threading.Event()
+        search = self.variant.new_search(self.board, self.color, self.table,
+                                         stop_event=self.stop_event, info=self.send)
+        self.thread = threading.Thread(target=self._search, args=(search, limits), daemon=True)
+        self.thread.start()
+
+    def _search(self, search, limits):
+        """
+        Тело потока поиска: ищет ход и выводит bestmove.
+
+        Аргументы:
+            search (Search): Объект поиска.
+            limits (dict): Лимиты поиска.
+        """
+        move, _ = search.run(**limits)
+        self.send(f"bestmove {self.variant.format_move(move) if move else '0000'}")
+
+    def stop(self):
+        """
+        Останавливает поиск и дожидается завершения потока.
+        """
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+
+    def handle(self, line):
+        """
+        Обрабатывает одну команду протокола.
+
+        Аргументы:
+            line (str): Строка команды.
+
+        Возвращает:
+            bool: False, если получена команда quit, иначе True.
+        """
+        tokens = line.split()
+        if not tokens:
+            return True
+        command = tokens[0]
+        if command == 'uci':
+            self.send("id name Chess.kir")
+            self.send("option name Variant type combo default chess " + " ".join(f"var {name}" for name in VARIANTS))
+            self.send("option name Book type string default <empty>")
+            self.send("uciok")
+        elif command == 'isready':
+            self.send("readyok")
+        elif command == 'ucinewgame':
+            self.new_game()
+        elif command == 'setoption' and len(tokens) >= 5 and tokens[2].lower() == 'variant':
+            if tokens[4] in VARIANTS:
+                self.stop()
+                self.variant = VARIANTS[tokens[4]]
+                self.new_game()
+            else:
+                self.send(f"info string unknown variant {tokens[4]}")
+        elif command == 'setoption' and len(tokens) >= 5 and tokens[2].lower() == 'book':
+            self.set_book(' '.join(tokens[4:]))
+        elif command == 'position':
+            self.set_position(tokens[1:])
+        elif command == 'go':
+            self.go(tokens[1:])
+        elif command == 'stop':
+            self.stop()
+        elif command == 'quit':
+            self.stop()
+            return False
+        else:
+            self.send(f"info string unknown command {command}")
+        return True
+
+    def loop(self, stream=None):
+        """
+        Основной цикл чтения команд.
+
+        Аргументы:
+            stream (file): Поток команд (по умолчанию stdin).
+        """
+        for line in stream or sys.stdin:
+            if not self.handle(line):
+                break
+        self.stop()
+
+if __name__ == "__main__":
+    import Profiler
+    Profiler.profile_from_argv(sys.argv)
+    books = [arg for arg in sys.argv if arg.startswith('--book=')]
+    for flag in books:
+        sys.argv.remove(flag)
+    engine = Engine(sys.argv[1] if len(sys.argv) > 1 else 'chess')
+    if books:
+        engine.set_book(books[-1].partition('=')[2])
+    engine.loop()
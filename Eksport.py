@@ -0,0 +1,316 @@
+import argparse
+import bisect
+import json
+import multiprocessing
+import os
+
+import numpy as np
+
+import Dvizhok
+import Hody
+import Tenzory
+
+VARIANT_IDS = {'chess': 0, 'fairy': 1, 'checkers': 2}
+RESULTS = {'1-0': 1, '0-1': -1, '1/2': 0, '1/2-1/2': 0}
+
+# Одна запись - одна позиция партии; размер записи фиксирован
+RECORD = np.dtype([
+    ('position', np.int8, (8, 8)),  # коды фигур Tenzory.CODES
+    ('side', np.int8),              # 1 - ход белых, -1 - ход чёрных
+    ('legal', np.uint8, (64, 8)),   # маска допустимых ходов (откуда, куда), упакованная в биты
+    ('move', np.int16),             # сыгранный ход: откуда * 64 + куда
+    ('result', np.int8),            # результат партии для белых: 1, 0, -1
+    ('variant', np.int8),           # VARIANT_IDS
+])
+
+
+def read_games(paths, worker=0, workers=1):
+    """
+    Построчно читает партии из файлов.
+
+    Поддерживаются строки вида 'chess 1-0 e2e4 e7e5 ...' и файлы результатов Turnir.py (Hody.read_games);
+    партии без результата пропускаются. Каждый процесс берёт строки с номером line % workers == worker.
+
+    Аргументы:
+        paths (list): Пути к файлам партий.
+        worker (int): Номер процесса.
+        workers (int): Число процессов.
+
+    Возвращает:
+        generator: Кортежи (вариант, результат, ходы (откуда, куда) или None на месте некорректных записей).
+    """
+    for variant_name, result, moves in Hody.read_games(paths, VARIANT_IDS, worker=worker, workers=workers):
+        if result is not None:
+            yield variant_name, result, moves
+
+
+def replay(games, rejects=None):
+    """
+    Переигрывает партии через Board.move_piece и выдаёт позиции перед каждым допустимым ходом
+    (ход проверяется до выдачи, партия обрывается на первом недопустимом ходе).
+
+    Аргументы:
+        games (iterable): Кортежи (вариант, результат, список ходов) из read_games.
+        rejects (list): Список, в который записывается число отвергнутых ходов (необязательно).
+
+    Возвращает:
+        generator: Кортежи (доска, сторона, откуда, куда, результат, вариант).
+    """
+    for variant_name, result, moves in games:
+        variant = Dvizhok.VARIANTS[variant_name]
+        board = variant.new_board()
+        color = 'W'
+        for move in moves:
+            start, end = move if move is not None else (None, None)
+            piece = board.grid[start[0]][start[1]] if start is not None else None
+            # Ход проверяется до выдачи позиции: отвергнутый ход не должен попасть в шард
+            if piece is None or piece.color != color or not piece.is_valid_move(start, end, board.grid):
+                if rejects is not None:
+                    rejects[0] += 1
+                break
+            yield board, color, start, end, RESULTS[result], VARIANT_IDS[variant_name]
+            board.move_piece(start, end)
+            color = Dvizhok.opponent(color)
+
+
+class ShardWriter:
+    """
+    Класс, записывающий записи в шарды .npy фиксированного размера.
+
+    Память ограничена одним буфером на shard_size записей.
+
+    Атрибуты:
+        directory (str): Каталог шардов.
+        prefix (str): Префикс имён файлов шардов.
+        shard_size (int): Число записей в шарде.
+        shards (list): Записанные шарды (имя файла, число записей).
+    """
+    def __init__(self, directory, prefix, shard_size=65536):
+        """
+        Конструктор для инициализации записи шардов.
+
+        Аргументы:
+            directory (str): Каталог шардов.
+            prefix (str): Префикс имён файлов шардов.
+            shard_size (int): Число записей в шарде.
+        """
+        self.directory = directory
+        self.prefix = prefix
+        self.shard_size = shard_size
+        self.buffer = np.zeros(shard_size, dtype=RECORD)
+        self.count = 0
+        self.shards = []
+        os.makedirs(directory, exist_ok=True)
+
+    def add(self, board, color, start, end, result, variant_id):
+        """
+        Добавляет позицию в буфер; заполненный буфер записывается на диск.
+
+        Аргументы:
+            board (Board): Доска перед ходом.
+            color (str): Сторона, которой принадлежит ход.
+            start (tuple): Начальная клетка хода.
+            end (tuple): Конечная клетка хода.
+            result (int): Результат партии для белых.
+            variant_id (int): Номер варианта.
+        """
+        buffer, count = self.buffer, self.count
+        Tenzory.encode_boards([board], buffer['position'][count:count + 1])
+        buffer['side'][count] = 1 if color == 'W' else -1
+        buffer['move'][count] = (start[0] * 8 + start[1]) * 64 + end[0] * 8 + end[1]
+        buffer['result'][count] = result
+        buffer['variant'][count] = variant_id
+        self.count += 1
+        if self.count == self.shard_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Вычисляет маски допустимых ходов для буфера и записывает шард.
+        """
+        if not self.count:
+            return
+        records = self.buffer[:self.count]
+        for begin in range(0, self.count, 1024):
+            chunk = records[begin:begin + 1024]
+            masks = Tenzory.legal_masks(chunk['position'])
+            masks &= (np.sign(chunk['position'].reshape(-1, 64)) == chunk['side'][:, None])[:, :, None]
+            chunk['legal'] = np.packbits(masks, axis=-1)
+        name = f"{self.prefix}-{len(self.shards):05d}.npy"
+        temporary = os.path.join(self.directory, name + '.tmp')
+        with open(temporary, 'wb') as shard:
+            np.save(shard, records)
+        os.replace(temporary, os.path.join(self.directory, name))
+        self.shards.append((name, self.count))
+        self.count = 0
+
+
+def export(paths, directory, shard_size=65536, worker=0, workers=1):
+    """
+    Экспортирует долю партий одного процесса в шарды.
+
+    Аргументы:
+        paths (list): Пути к файлам партий.
+        directory (str): Каталог шардов.
+        shard_size (int): Число записей в шарде.
+        worker (int): Номер процесса.
+        workers (int): Число процессов.
+
+    Возвращает:
+        tuple: Список шардов (имя файла, число записей) и число отвергнутых ходов.
+    """
+    writer = ShardWriter(directory, f"w{worker:03d}", shard_size)
+    rejects = [0]
+    for record in replay(read_games(paths, worker, workers), rejects):
+        writer.add(*record)
+    writer.flush()
+    return writer.shards, rejects[0]
+
+
+def _export_worker(task):
+    """
+    Тело процесса экспорта.
+
+    Аргументы:
+        task (tuple): Аргументы функции export.
+
+    Возвращает:
+        tuple: Результат export.
+    """
+    return export(*task)
+
+
+def export_parallel(paths, directory, shard_size=65536, workers=None):
+    """
+    Экспортирует партии в шарды несколькими процессами и записывает индекс.
+
+    Аргументы:
+        paths (list): Пути к файлам партий.
+        directory (str): Каталог шардов.
+        shard_size (int): Число записей в шарде.
+        workers (int): Число процессов (по умолчанию - число ядер).
+
+    Возвращает:
+        dict: Содержимое индекса.
+    """
+    workers = workers or os.cpu_count()
+    tasks = [(list(paths), directory, shard_size, worker, workers) for worker in range(workers)]
+    if workers == 1:
+        parts = [_export_worker(tasks[0])]
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            parts = pool.map(_export_worker, tasks)
+    shards = [{'file': name, 'count': count} for part, _ in parts for name, count in part]
+    index = {
+        'dtype': RECORD.descr,
+        'samples': sum(shard['count'] for shard in shards),
+        'rejects': sum(rejects for _, rejects in parts),
+        'shards': shards,
+    }
+    temporary = os.path.join(directory, 'index.json.tmp')
+    with open(temporary, 'w', encoding='utf-8') as index_file:
+        json.dump(index, index_file, indent=1)
+    os.replace(temporary, os.path.join(directory, 'index.json'))
+    return index
+
+
+class Dataset:
+    """
+    Класс для произвольного доступа к записям шардов через отображение файлов в память.
+
+    Атрибуты:
+        directory (str): Каталог шардов.
+        shards (list): Описание шардов из индекса.
+        offsets (list): Номер первой записи каждого шарда.
+    """
+    def __init__(self, directory):
+        """
+        Конструктор: читает индекс каталога шардов.
+
+        Аргументы:
+            directory (str): Каталог шардов.
+        """
+        self.directory = directory
+        with open(os.path.join(directory, 'index.json'), encoding='utf-8') as index_file:
+            self.shards = json.load(index_file)['shards']
+        self.offsets = []
+        total = 0
+        for shard in self.shards:
+            self.offsets.append(total)
+            total += shard['count']
+        self.length = total
+        self._arrays = {}
+
+    def __len__(self):
+        """
+        Возвращает число записей.
+
+        Возвращает:
+            int: Число записей.
+        """
+        return self.length
+
+    def shard(self, number):
+        """
+        Возвращает шард, отображённый в память (открывается при первом обращении).
+
+        Аргументы:
+            number (int): Номер шарда.
+
+        Возвращает:
+            numpy.ndarray: Записи шарда.
+        """
+        array = self._arrays.get(number)
+        if array is None:
+            path = os.path.join(self.directory, self.shards[number]['file'])
+            array = self._arrays[number] = np.load(path, mmap_mode='r')
+        return array
+
+    def __getitem__(self, index):
+        """
+        Возвращает запись по сквозному номеру.
+
+        Аргументы:
+            index (int): Номер записи.
+
+        Возвращает:
+            numpy.void: Запись RECORD.
+        """
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError(index)
+        number = bisect.bisect_right(self.offsets, index) - 1
+        return self.shard(number)[index - self.offsets[number]]
+
+
+def planes(positions):
+    """
+    Раскладывает коды фигур в плоскости: по одной на каждый код фигуры и цвет.
+
+    Аргументы:
+        positions (numpy.ndarray): Массив N×8×8 кодов фигур.
+
+    Возвращает:
+        numpy.ndarray: Массив N×22×8×8 uint8 (сначала белые фигуры, затем чёрные).
+    """
+    codes = np.arange(1, len(Tenzory.CODES) + 1, dtype=np.int8)
+    codes = np.concatenate([codes, -codes])
+    return (positions[:, None] == codes[None, :, None, None]).astype(np.uint8)
+
+
+def main():
+    """
+    Точка входа: экспортирует файлы партий в каталог шардов.
+    """
+    parser = argparse.ArgumentParser(description="Экспорт партий в шарды .npy для обучения")
+    parser.add_argument('games', nargs='+', help="файлы партий ('chess 1-0 e2e4 ...' или результаты Turnir.py)")
+    parser.add_argument('--out', required=True, help="каталог шардов")
+    parser.add_argument('--shard-size', type=int, default=65536)
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args()
+    index = export_parallel(args.games, args.out, args.shard_size, args.workers)
+    print(f"Записей: {index['samples']}, шардов: {len(index['shards'])}, отвергнуто ходов: {index['rejects']}")
+
+if __name__ == "__main__":
+    main()
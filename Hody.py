@@ -0,0 +1,200 @@
+import itertools
+import sys
+
+FILES = 'abcdefgh'  # Буквы вертикалей
+
+# Клетки (строка, столбец) и их названия
+SQUARES = tuple((row, col) for row in range(8) for col in range(8))
+SQUARE_NAMES = tuple(f"{FILES[col]}{8 - row}" for row, col in SQUARES)
+RESULTS = ('1-0', '0-1', '1/2', '1/2-1/2')  # Записи результата партии
+
+# Таблицы строятся при первом разборе, чтобы не замедлять запуск игр
+_moves = None        # Ходы (откуда, куда) по номеру start * 64 + end
+_tokens = None       # Запись хода ('e2e4' и 'e2-e4') -> ход
+_byte_tokens = None  # То же для записей в байтах
+
+
+def move_table():
+    """
+    Возвращает таблицу всех 4096 ходов: ход с номером start * 64 + end (как Kniga.encode_move) -
+    один общий кортеж (откуда, куда), поэтому разобранные ходы не создают новых объектов.
+
+    Возвращает:
+        tuple: Кортежи (откуда, куда).
+    """
+    global _moves
+    if _moves is None:
+        _moves = tuple(itertools.product(SQUARES, SQUARES))
+    return _moves
+
+
+def tokens():
+    """
+    Возвращает таблицу записей ходов: 'e2e4' и 'e2-e4' для всех 4096 пар клеток.
+
+    Возвращает:
+        dict: Запись хода -> кортеж (откуда, куда) из move_table().
+    """
+    global _tokens
+    if _tokens is None:
+        table = {}
+        moves_by_code = move_table()
+        for start, start_name in enumerate(SQUARE_NAMES):
+            for end, end_name in enumerate(SQUARE_NAMES):
+                move = moves_by_code[start * 64 + end]
+                table[start_name + end_name] = move
+                table[start_name + '-' + end_name] = move
+        _tokens = table
+    return _tokens
+
+
+def byte_tokens():
+    """
+    Возвращает таблицу записей ходов в байтах (b'e2e4', b'e2-e4').
+
+    Возвращает:
+        dict: Запись хода в байтах -> кортеж (откуда, куда) из move_table().
+    """
+    global _byte_tokens
+    if _byte_tokens is None:
+        _byte_tokens = {text.encode('ascii'): move for text, move in tokens().items()}
+    return _byte_tokens
+
+
+def decode(move):
+    """
+    Разбирает один ход.
+
+    Аргументы:
+        move (str): Ход ('e2e4', 'e2-e4' или ход шашки 'e3d4').
+
+    Возвращает:
+        tuple: Ход (откуда, куда) или None, если запись некорректна.
+    """
+    return tokens().get(move)
+
+
+def _decode_words(words, table, rejects=None, line_number=0):
+    """
+    Разбирает уже разделённые записи ходов.
+
+    Отвергнутая запись остаётся в списке как None, поэтому ход с номером i - всегда i-я запись
+    строки: воспроизведение партии останавливается на первом None и не сдвигает ходы после него.
+
+    Аргументы:
+        words (list): Записи ходов (str или bytes, как ключи table).
+        table (dict): Таблица tokens() или byte_tokens().
+        rejects (list): Список, в который добавляются отвергнутые записи (номер строки, номер хода, запись);
+            None - отвергнутые записи не собираются.
+        line_number (int): Номер строки для отчёта об отвергнутых записях.
+
+    Возвращает:
+        list: Ходы (откуда, куда) или None на месте отвергнутых записей.
+    """
+    moves = list(map(table.get, words))
+    if rejects is not None and None in moves:
+        rejects.extend((line_number, index, word) for index, (word, move) in enumerate(zip(words, moves))
+                       if move is None)
+    return moves
+
+
+def decode_line(line, rejects=None, line_number=0):
+    """
+    Разбирает строку ходов, разделённых пробелами, за один проход.
+
+    Аргументы:
+        line (str | bytes): Строка ходов.
+        rejects (list): Список для отвергнутых записей (номер строки, номер хода, запись).
+        line_number (int): Номер строки для отчёта об отвергнутых записях.
+
+    Возвращает:
+        list: Ходы (откуда, куда) по одному на запись, None на месте отвергнутых (см. _decode_words).
+    """
+    table = byte_tokens() if isinstance(line, (bytes, bytearray)) else tokens()
+    return _decode_words(line.split(), table, rejects, line_number)
+
+
+def decode_buffer(buffer, rejects=None):
+    """
+    Разбирает буфер строк ходов (содержимое файла, bytes или mmap) за один проход.
+
+    Аргументы:
+        buffer (bytes | bytearray | memoryview | mmap): Строки ходов.
+        rejects (list): Список для отвергнутых записей (номер строки с нуля, номер хода, запись в байтах).
+
+    Возвращает:
+        list: Для каждой строки - список ходов, None на месте отвергнутых записей (см. _decode_words).
+    """
+    table = byte_tokens()
+    return [_decode_words(line.split(), table, rejects, line_number)
+            for line_number, line in enumerate(bytes(buffer).splitlines())]
+
+
+def read_games(paths, variants, default_variant=None, worker=0, workers=1):
+    """
+    Построчно читает партии: файлы результатов Turnir.py (поля через табуляцию), строки
+    'fairy 1-0 e2e4 e7e5 ...' или только ходы 'e2e4 e7e5 ...'. Строки с '#' в начале пропускаются.
+
+    Аргументы:
+        paths (list): Пути к файлам партий.
+        variants (container): Известные названия вариантов; партии других вариантов пропускаются.
+        default_variant (str): Вариант для строк, содержащих только ходы (None - такие строки пропускаются).
+        worker (int): Номер процесса: он берёт строки с номером line % workers == worker.
+        workers (int): Число процессов.
+
+    Возвращает:
+        generator: Кортежи (вариант, результат из RESULTS или None, ходы): ходы разобраны по таблице
+            tokens() - кортежи (откуда, куда), None на месте некорректных записей (см. _decode_words).
+    """
+    table = tokens()
+    number = 0
+    for path in paths:
+        with open(path, encoding='utf-8') as games:
+            for line in games:
+                number += 1
+                if (number - 1) % workers != worker or line.startswith('#'):
+                    continue
+                fields = line.rstrip('\n').split('\t')
+                if len(fields) >= 7:
+                    variant_name, result, words = fields[1], fields[3], fields[6].split()
+                else:
+                    words = line.split()
+                    if not words:
+                        continue
+                    if len(words) >= 2 and words[0] in variants and words[1] in RESULTS:
+                        variant_name, result, words = words[0], words[1], words[2:]
+                    elif default_variant is not None:
+                        variant_name, result = default_variant, None
+                    else:
+                        continue
+                if variant_name in variants:
+                    yield variant_name, result if result in RESULTS else None, _decode_words(words, table)
+
+
+def main():
+    """
+    Точка входа: разбирает файлы ходов и выводит число ходов, отвергнутые записи и скорость разбора.
+    """
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Разбор записей ходов")
+    parser.add_argument('files', nargs='+', help="файлы со строками ходов ('e2e4 e7-e5 ...')")
+    parser.add_argument('--show', type=int, default=10, help="сколько отвергнутых записей вывести")
+    args = parser.parse_args()
+
+    byte_tokens()  # Таблица строится один раз и не входит во время разбора
+    for path in args.files:
+        with open(path, 'rb') as games:
+            buffer = games.read()
+        rejects = []
+        started = time.perf_counter()
+        lines = decode_buffer(buffer, rejects)
+        elapsed = time.perf_counter() - started
+        count = sum(len(moves) for moves in lines) - len(rejects)
+        print(f"{path}: строк {len(lines)}, ходов {count}, отвергнуто {len(rejects)}, "
+              f"время {elapsed:.3f} с ({elapsed * 1e9 / max(count + len(rejects), 1):.0f} нс на запись)")
+        for line_number, index, word in rejects[:args.show]:
+            print(f"  строка {line_number + 1}, запись {index + 1}: {word.decode('utf-8', 'replace')}")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,327 @@
+import argparse
+import bisect
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import time
+
+import Dvizhok
+import Hody
+
+MAGIC = b'KIRBOOK2'
+HEADER = struct.Struct('<8sQ')     # сигнатура, число записей
+RECORD = struct.Struct('<QHxxIQ')  # ключ позиции, ход (откуда * 64 + куда), вес, число партий
+WORDS = RECORD.size // 8           # 64-битных слов в записи (ключ - первое слово)
+RESULTS = {'1-0': 'W', '0-1': 'B', '1/2': None, '1/2-1/2': None}
+
+
+def position_hash(variant, board, color):
+    """
+    Возвращает 64-битный ключ позиции (одинаковый во всех процессах, в отличие от hash()).
+
+    Аргументы:
+        variant (Variant): Вариант игры.
+        board (Board): Доска.
+        color (str): Сторона, которой принадлежит ход.
+
+    Возвращает:
+        int: Ключ позиции.
+    """
+    text = variant.name + variant.position_key(board, color)
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), 'little')
+
+
+def encode_move(move):
+    """
+    Упаковывает ход в число.
+
+    Аргументы:
+        move (tuple): Ход ((строка, столбец), (строка, столбец)).
+
+    Возвращает:
+        int: (откуда * 64 + куда), где клетка = строка * 8 + столбец.
+    """
+    (sr, sc), (er, ec) = move
+    return (sr * 8 + sc) * 64 + er * 8 + ec
+
+
+def decode_move(code):
+    """
+    Распаковывает ход, упакованный encode_move.
+
+    Аргументы:
+        code (int): Упакованный ход.
+
+    Возвращает:
+        tuple: Ход ((строка, столбец), (строка, столбец)).
+    """
+    start, end = divmod(code, 64)
+    return divmod(start, 8), divmod(end, 8)
+
+
+def read_corpus(paths, default_variant='chess'):
+    """
+    Построчно читает партии: файлы результатов Turnir.py, строки 'fairy 1-0 e2e4 e7e5 ...'
+    или просто ходы 'e2e4 e7e5 ...' (вариант по умолчанию, результат неизвестен).
+
+    Аргументы:
+        paths (list): Пути к файлам партий.
+        default_variant (str): Вариант для строк без названия варианта.
+
+    Возвращает:
+        generator: Кортежи (вариант, победитель 'W'/'B' или None, известен ли результат,
+            ходы (откуда, куда) или None на месте некорректных записей).
+    """
+    for variant_name, result, moves in Hody.read_games(paths, Dvizhok.VARIANTS, default_variant):
+        yield variant_name, RESULTS.get(result), result is not None, moves
+
+
+def compile_book(games, path, max_plies=20):
+    """
+    Собирает книгу дебютов: переигрывает первые max_plies ходов каждой партии и записывает
+    отсортированные по ключу записи фиксированного размера.
+
+    Вес хода - очки стороны, сделавшей ход (победа 2, ничья 1, поражение 0; без результата 1),
+    хранится 32-битным числом и ограничен 0xFFFFFFFF. Партия обрывается на первом ходе, который
+    недопустим или сделан фигурой не той стороны (как в Book.probe и Eksport.replay).
+
+    Аргументы:
+        games (iterable): Партии из read_corpus.
+        path (str): Путь к файлу книги.
+        max_plies (int): Сколько первых полуходов каждой партии записывать.
+
+    Возвращает:
+        dict: Число партий, отвергнутых ходов и записей.
+    """
+    entries = {}
+    stats = {'games': 0, 'rejected': 0, 'records': 0}
+    for variant_name, winner, known, moves in games:
+        variant = Dvizhok.VARIANTS[variant_name]
+        board = variant.module.Board()
+        color = 'W'
+        stats['games'] += 1
+        for move in moves[:max_plies]:
+            key = position_hash(variant, board, color)
+            piece = board.grid[move[0][0]][move[0][1]] if move is not None else None
+            if piece is None or piece.color != color or not board.move_piece(move[0], move[1]):
+                stats['rejected'] += 1
+                break
+            points = 1 if not known or winner is None else (2 if winner == color else 0)
+            entry = entries.setdefault((key, encode_move(move)), [0, 0])
+            entry[0] += points
+            entry[1] += 1
+            color = Dvizhok.opponent(color)
+    records = sorted(((key, move, min(weight, 0xFFFFFFFF), count)
+                      for (key, move), (weight, count) in entries.items()),
+                     key=lambda record: (record[0], -record[2], -record[3], record[1]))
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as book:
+        book.write(HEADER.pack(MAGIC, len(records)))
+        for record in records:
+            book.write(RECORD.pack(*record))
+        book.flush()
+        os.fsync(book.fileno())
+    os.replace(temporary, path)
+    stats['records'] = len(records)
+    return stats
+
+
+class _Keys:
+    """
+    Последовательность ключей записей книги для bisect (чтение прямо из отображения в память).
+
+    Атрибуты:
+        words (memoryview): Записи книги как 64-битные слова (WORDS на запись).
+        count (int): Число записей.
+    """
+    def __init__(self, words, count):
+        """
+        Конструктор для инициализации последовательности ключей.
+
+        Аргументы:
+            words (memoryview): Записи книги как 64-битные слова.
+            count (int): Число записей.
+        """
+        self.words = words
+        self.count = count
+
+    def __len__(self):
+        """
+        Возвращает число записей.
+        """
+        return self.count
+
+    def __getitem__(self, index):
+        """
+        Возвращает ключ записи с номером index.
+        """
+        return self.words[index * WORDS]
+
+
+class Book:
+    """
+    Класс книги дебютов: поиск делением пополам прямо в файле, отображённом в память,
+    без загрузки записей.
+
+    Атрибуты:
+        path (str): Путь к файлу книги.
+        count (int): Число записей.
+    """
+    def __init__(self, path):
+        """
+        Конструктор: открывает книгу.
+
+        Аргументы:
+            path (str): Путь к файлу книги.
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if sys.byteorder != 'little':
+            self._map.close()
+            self._file.close()
+            raise ValueError("Книга дебютов читается только на little-endian платформах")
+        magic, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or len(self._map) != HEADER.size + self.count * RECORD.size:
+            self.close()
+            raise ValueError(f"Файл '{path}' не является книгой дебютов")
+        # Запись - WORDS 64-битных слов: ключ, затем ход, вес и число партий; порядок байт файла - little-endian
+        self._words = memoryview(self._map)[HEADER.size:].cast('Q')
+        self._keys = _Keys(self._words, self.count)
+
+    def probe_key(self, key):
+        """
+        Находит записи позиции по ключу.
+
+        Аргументы:
+            key (int): Ключ позиции (position_hash).
+
+        Возвращает:
+            list: Кортежи (упакованный ход, вес, число партий) по убыванию веса.
+        """
+        index = bisect.bisect_left(self._keys, key)
+        found = []
+        while index < self.count and self._words[index * WORDS] == key:
+            _, move, weight, count = RECORD.unpack_from(self._map, HEADER.size + index * RECORD.size)
+            found.append((move, weight, count))
+            index += 1
+        return found
+
+    def probe(self, variant_name, board, color):
+        """
+        Находит ходы книги для позиции (ходы, не допустимые на доске, отбрасываются).
+
+        Аргументы:
+            variant_name (str): Название варианта.
+            board (Board): Доска.
+            color (str): Сторона, которой принадлежит ход.
+
+        Возвращает:
+            list: Кортежи (ход, вес, число партий) по убыванию веса.
+        """
+        variant = Dvizhok.VARIANTS[variant_name]
+        moves = []
+        for code, weight, count in self.probe_key(position_hash(variant, board, color)):
+            start, end = decode_move(code)
+            piece = board.grid[start[0]][start[1]]
+            if piece is not None and piece.color == color and piece.is_valid_move(start, end, board.grid):
+                moves.append(((start, end), weight, count))
+        return moves
+
+    def hint(self, variant_name, board, color, limit=5):
+        """
+        Формирует строку подсказки с ходами книги.
+
+        Аргументы:
+            variant_name (str): Название варианта.
+            board (Board): Доска.
+            color (str): Сторона, которой принадлежит ход.
+            limit (int): Наибольшее число ходов в подсказке.
+
+        Возвращает:
+            str: Подсказка или пустая строка, если позиции нет в книге.
+        """
+        moves = self.probe(variant_name, board, color)
+        if not moves:
+            return ''
+        variant = Dvizhok.VARIANTS[variant_name]
+        return "Книга: " + ", ".join(f"{variant.format_move(move)} (вес {weight}, партий {count})"
+                                     for move, weight, count in moves[:limit])
+
+    def close(self):
+        """
+        Закрывает книгу.
+        """
+        if getattr(self, '_words', None) is not None:
+            self._keys = None
+            self._words.release()
+            self._words = None
+        self._map.close()
+        self._file.close()
+
+
+def book_from_argv(argv):
+    """
+    Обрабатывает флаг --book=ФАЙЛ: открывает книгу дебютов.
+
+    Флаг удаляется из argv.
+
+    Аргументы:
+        argv (list): Аргументы командной строки (обычно sys.argv).
+
+    Возвращает:
+        Book: Книга или None, если флаг не указан.
+    """
+    flags = [arg for arg in argv if arg.startswith('--book=')]
+    if not flags:
+        return None
+    for flag in flags:
+        argv.remove(flag)
+    return Book(flags[-1].partition('=')[2])
+
+
+def main():
+    """
+    Точка входа: собирает книгу из партий или проверяет позицию по книге.
+    """
+    parser = argparse.ArgumentParser(description="Книга дебютов")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('compile', help="собрать книгу из файлов партий")
+    build.add_argument('games', nargs='+')
+    build.add_argument('--out', required=True)
+    build.add_argument('--plies', type=int, default=20, help="сколько первых полуходов записывать")
+    build.add_argument('--variant', default='chess', choices=sorted(Dvizhok.VARIANTS),
+                       help="вариант для строк, содержащих только ходы")
+    probe = commands.add_parser('probe', help="ходы книги после заданных ходов")
+    probe.add_argument('book')
+    probe.add_argument('variant', choices=sorted(Dvizhok.VARIANTS))
+    probe.add_argument('moves', nargs='*')
+    args = parser.parse_args()
+
+    if args.command == 'compile':
+        started = time.perf_counter()
+        stats = compile_book(read_corpus(args.games, args.variant), args.out, args.plies)
+        print(f"Партий: {stats['games']}, отвергнуто: {stats['rejected']}, записей: {stats['records']}, "
+              f"время: {time.perf_counter() - started:.2f} с")
+        return
+    book = Book(args.book)
+    variant = Dvizhok.VARIANTS[args.variant]
+    board = variant.new_board()
+    color = 'W'
+    for move in args.moves:
+        start, end = variant.parse_move(move)
+        if start is None or not board.move_piece(start, end):
+            print(f"Недопустимый ход: {move}")
+            return
+        color = Dvizhok.opponent(color)
+    started = time.perf_counter_ns()
+    hint = book.hint(args.variant, board, color, limit=20)
+    elapsed = time.perf_counter_ns() - started
+    print(hint or "Позиции нет в книге")
+    print(f"Записей в книге: {book.count}, поиск: {elapsed / 1000:.1f} мкс")
+    book.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,411 @@
+import os
+import struct
+import sys
+import time
+
+import Dvizhok
+import Pozicii
+
+# Коды клеток: 0 - пустая клетка, далее белые и чёрные фигуры в порядке Pozicii.LETTERS
+CODES = '.' + Pozicii.LETTERS + Pozicii.LETTERS.lower()
+PIECE_CODES = {(letter.upper(), 'W' if letter.isupper() else 'B'): code
+               for code, letter in enumerate(CODES) if code}
+
+# Ячейка кольца: 64 клетки строка за строкой, сторона (0 - белые, 1 - чёрные),
+# состояние, 2 байта резерва и результат обработки (int32)
+SLOT_SIZE = 72
+COLOR_OFFSET = 64
+STATE_OFFSET = 65
+RESULT = struct.Struct('<i')
+RESULT_OFFSET = 68
+
+EMPTY, READY, DONE, FAILED = 0, 1, 2, 3
+
+_decode_tables = {}
+_piece_codes = {None: 0}
+
+
+def encode(grid):
+    """
+    Переводит клетки доски в коды.
+
+    Коды запоминаются по объекту фигуры, поэтому повторная упаковка фигур
+    той же доски (или общих фигур Pozicii.piece_set) не разбирает их заново.
+
+    Аргументы:
+        grid (list): Клетки доски (8 горизонталей по 8 клеток).
+
+    Возвращает:
+        bytes: 64 кода клеток строка за строкой.
+    """
+    try:
+        return bytes([_piece_codes[piece] for row in grid for piece in row])
+    except KeyError:
+        if len(_piece_codes) > 100000:
+            _piece_codes.clear()
+            _piece_codes[None] = 0
+        for row in grid:
+            for piece in row:
+                if piece not in _piece_codes:
+                    _piece_codes[piece] = PIECE_CODES[piece.name, piece.color]
+        return bytes([_piece_codes[piece] for row in grid for piece in row])
+
+
+def decode_table(module):
+    """
+    Возвращает фигуры модуля по кодам клеток.
+
+    Аргументы:
+        module (module): Модуль игры.
+
+    Возвращает:
+        tuple: Фигура (общий объект из Pozicii.piece_set) или None по коду.
+    """
+    table = _decode_tables.get(module)
+    if table is None:
+        pieces = Pozicii.piece_set(module).pieces
+        table = _decode_tables[module] = tuple(pieces.get(letter) if code else None
+                                               for code, letter in enumerate(CODES))
+    return table
+
+
+class Row:
+    """
+    Класс горизонтали доски, хранящейся в общей памяти.
+
+    Ведёт себя как список из 8 фигур: индексы (в том числе отрицательные), срезы,
+    присваивание и перебор читают и пишут коды клеток прямо в буфер.
+
+    Атрибуты:
+        cells (memoryview): 8 байт горизонтали в буфере.
+        pieces (tuple): Фигуры по кодам клеток (decode_table).
+    """
+    __slots__ = ('cells', 'pieces')
+
+    def __init__(self, cells, pieces):
+        """
+        Конструктор для инициализации горизонтали.
+
+        Аргументы:
+            cells (memoryview): 8 байт горизонтали в буфере.
+            pieces (tuple): Фигуры по кодам клеток.
+        """
+        self.cells = cells
+        self.pieces = pieces
+
+    def __len__(self):
+        """
+        Возвращает число клеток горизонтали.
+        """
+        return 8
+
+    def __getitem__(self, col):
+        """
+        Возвращает фигуру на клетке (или список фигур для среза).
+        """
+        if isinstance(col, slice):
+            return [self.pieces[code] for code in self.cells[col]]
+        return self.pieces[self.cells[col]]
+
+    def __setitem__(self, col, piece):
+        """
+        Ставит фигуру на клетку (или фигуры на срез той же длины).
+        """
+        if isinstance(col, slice):
+            self.cells[col] = bytes(0 if item is None else PIECE_CODES[item.name, item.color] for item in piece)
+        else:
+            self.cells[col] = 0 if piece is None else PIECE_CODES[piece.name, piece.color]
+
+    def __iter__(self):
+        """
+        Перебирает фигуры горизонтали.
+        """
+        return map(self.pieces.__getitem__, self.cells)
+
+
+class PositionRing:
+    """
+    Класс кольца упакованных позиций в общей памяти (multiprocessing.shared_memory).
+
+    Каждая позиция занимает SLOT_SIZE байт, поэтому процессам передаются только номера
+    ячеек: рабочий процесс строит доску-представление поверх своей ячейки без копирования
+    и записывает результат в ту же ячейку.
+
+    Представления (view) держат ссылки на буфер: их нужно отпустить до close.
+
+    Атрибуты:
+        name (str): Имя блока общей памяти (для подключения из других процессов).
+        slots (int): Число ячеек.
+        cells (memoryview): Буфер кольца.
+    """
+    def __init__(self, slots=4096, name=None):
+        """
+        Конструктор: создаёт новый блок общей памяти или подключается к существующему.
+
+        Аргументы:
+            slots (int): Число ячеек.
+            name (str): Имя существующего блока (None - создать новый).
+        """
+        from multiprocessing import shared_memory
+        self._owner = name is None
+        if self._owner:
+            self._memory = shared_memory.SharedMemory(create=True, size=slots * SLOT_SIZE)
+        else:
+            self._memory = shared_memory.SharedMemory(name=name)
+        self.name = self._memory.name
+        self.slots = slots
+        self.cells = self._memory.buf
+
+    def write(self, index, board, color='W'):
+        """
+        Упаковывает позицию в ячейку.
+
+        Аргументы:
+            index (int): Номер ячейки.
+            board (Board): Доска.
+            color (str): Сторона, которой принадлежит ход.
+        """
+        offset = index * SLOT_SIZE
+        self.cells[offset:offset + 64] = encode(board.grid)
+        self.cells[offset + COLOR_OFFSET] = 0 if color == 'W' else 1
+        self.cells[offset + STATE_OFFSET] = READY
+        RESULT.pack_into(self.cells, offset + RESULT_OFFSET, 0)
+
+    def view(self, index, module, board=None):
+        """
+        Строит доску, клетки которой хранятся в ячейке кольца (без копирования).
+
+        Ходы на такой доске меняют саму ячейку.
+
+        Аргументы:
+            index (int): Номер ячейки.
+            module (module): Модуль игры.
+            board (Board): Доска для повторного использования (по умолчанию создаётся новая).
+
+        Возвращает:
+            Board: Доска-представление.
+        """
+        if board is None:
+            board = module.Board(setup=False)
+        pieces = decode_table(module)
+        offset = index * SLOT_SIZE
+        board.grid = [Row(self.cells[start:start + 8], pieces) for start in range(offset, offset + 64, 8)]
+        board.move_history.clear()
+        if board.evaluation is not None:
+            board.evaluation.refresh()
+        if getattr(board, 'move_cache', None) is not None:
+            board.move_cache.reset()
+        return board
+
+    def color(self, index):
+        """
+        Возвращает сторону, которой принадлежит ход в позиции ячейки.
+        """
+        return 'B' if self.cells[index * SLOT_SIZE + COLOR_OFFSET] else 'W'
+
+    def state(self, index):
+        """
+        Возвращает состояние ячейки (EMPTY, READY, DONE или FAILED).
+        """
+        return self.cells[index * SLOT_SIZE + STATE_OFFSET]
+
+    def result(self, index):
+        """
+        Возвращает результат обработки позиции ячейки.
+        """
+        return RESULT.unpack_from(self.cells, index * SLOT_SIZE + RESULT_OFFSET)[0]
+
+    def set_result(self, index, value, state=DONE):
+        """
+        Записывает результат обработки позиции ячейки.
+
+        Аргументы:
+            index (int): Номер ячейки.
+            value (int): Результат.
+            state (int): Новое состояние ячейки.
+        """
+        offset = index * SLOT_SIZE
+        RESULT.pack_into(self.cells, offset + RESULT_OFFSET, value)
+        self.cells[offset + STATE_OFFSET] = state
+
+    def close(self):
+        """
+        Отключается от блока общей памяти; создавший кольцо процесс также удаляет блок.
+        """
+        self.cells = None
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+
+
+_ring = None
+_variant = None
+_board = None
+
+
+def _attach(name, slots, variant_name):
+    """
+    Подключает рабочий процесс к кольцу.
+
+    Аргументы:
+        name (str): Имя блока общей памяти.
+        slots (int): Число ячеек.
+        variant_name (str): Название варианта.
+    """
+    global _ring, _variant, _board
+    _ring = PositionRing(slots, name)
+    _variant = Dvizhok.VARIANTS[variant_name]
+    _board = None
+
+
+def _analyze_span(span):
+    """
+    Тело процесса: считает ходы в позициях ячеек [start, stop) и пишет их число в ячейки.
+
+    Аргументы:
+        span (tuple): Первая ячейка и ячейка после последней.
+
+    Возвращает:
+        int: Число обработанных ячеек.
+    """
+    global _board
+    start, stop = span
+    for index in range(start, stop):
+        _board = _ring.view(index, _variant.module, _board)
+        try:
+            _ring.set_result(index, len(_variant.generate_moves(_board, _ring.color(index))))
+        except Exception:
+            _ring.set_result(index, -1, FAILED)
+    return stop - start
+
+
+def _analyze_board(task):
+    """
+    Тело процесса для сравнения: считает ходы в позиции, переданной целиком через pickle.
+
+    Аргументы:
+        task (tuple): Вариант, доска и сторона.
+
+    Возвращает:
+        int: Число ходов.
+    """
+    variant_name, board, color = task
+    return len(Dvizhok.VARIANTS[variant_name].generate_moves(board, color))
+
+
+def analyze(positions, variant_name, workers=None, slots=4096, chunk=256):
+    """
+    Считает ходы в позициях в нескольких процессах через кольцо в общей памяти.
+
+    Позиции пишутся в кольцо порциями по slots штук; процессам передаются только
+    диапазоны номеров ячеек, результаты читаются из тех же ячеек.
+
+    Аргументы:
+        positions (iterable): Пары (доска, сторона); доска может переиспользоваться
+            между позициями (Pozicii.iter_positions).
+        variant_name (str): Название варианта.
+        workers (int): Число процессов (по умолчанию - число ядер).
+        slots (int): Число ячеек кольца.
+        chunk (int): Число ячеек в одном задании.
+
+    Возвращает:
+        generator: Число ходов в каждой позиции (-1, если обработка не удалась) в исходном порядке.
+    """
+    global _ring, _board
+    workers = workers or os.cpu_count()
+    ring = PositionRing(slots)
+    pool = None
+    try:
+        if workers == 1:
+            _attach(ring.name, slots, variant_name)
+        else:
+            import multiprocessing
+            pool = multiprocessing.Pool(workers, _attach, (ring.name, slots, variant_name))
+        iterator = iter(positions)
+        while True:
+            count = 0
+            for board, color in iterator:
+                ring.write(count, board, color)
+                count += 1
+                if count == slots:
+                    break
+            if not count:
+                break
+            spans = [(start, min(start + chunk, count)) for start in range(0, count, chunk)]
+            if pool is None:
+                for span in spans:
+                    _analyze_span(span)
+            else:
+                pool.map(_analyze_span, spans)
+            for index in range(count):
+                yield ring.result(index)
+            if count < slots:
+                break
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        elif _ring is not None:
+            if _board is not None:
+                _board.grid = None
+                _board = None
+            _ring.close()
+            _ring = None
+        ring.close()
+
+
+def analyze_pickled(positions, variant_name, workers=None, chunk=256):
+    """
+    То же, что analyze, но доски передаются процессам целиком через pickle (для сравнения).
+
+    Аргументы:
+        positions (iterable): Пары (доска, сторона); доски не должны переиспользоваться.
+        variant_name (str): Название варианта.
+        workers (int): Число процессов.
+        chunk (int): Число позиций в одном задании.
+
+    Возвращает:
+        generator: Число ходов в каждой позиции.
+    """
+    import multiprocessing
+    with multiprocessing.Pool(workers or os.cpu_count()) as pool:
+        yield from pool.imap(_analyze_board, ((variant_name, board, color) for board, color in positions), chunk)
+
+
+def main():
+    """
+    Точка входа: считает ходы во всех позициях файла в нескольких процессах.
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description="Разбор позиций в нескольких процессах через общую память")
+    parser.add_argument('variant', choices=sorted(Dvizhok.VARIANTS))
+    parser.add_argument('positions', help="файл позиций (Pozicii.py)")
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--slots', type=int, default=4096)
+    parser.add_argument('--chunk', type=int, default=256)
+    parser.add_argument('--pickle', action='store_true', help="передавать доски через pickle (для сравнения)")
+    args = parser.parse_args()
+
+    module = Dvizhok.VARIANTS[args.variant].module
+    errors = []
+    started = time.perf_counter()
+    if args.pickle:
+        positions = ((board, color) for board, color, _ in
+                     Pozicii.load_file(args.positions, module, reuse=False, errors=errors))
+        results = analyze_pickled(positions, args.variant, args.workers, args.chunk)
+    else:
+        positions = ((board, color) for board, color, _ in Pozicii.load_file(args.positions, module, errors=errors))
+        results = analyze(positions, args.variant, args.workers, args.slots, args.chunk)
+    count = moves = failed = 0
+    for result in results:
+        count += 1
+        if result < 0:
+            failed += 1
+        else:
+            moves += result
+    elapsed = time.perf_counter() - started
+    print(f"Позиций: {count}, ходов: {moves}, сбоев: {failed}, ошибок разбора: {len(errors)}, "
+          f"время: {elapsed:.2f} с, позиций/с: {count / max(elapsed, 1e-9):.0f}")
+
+if __name__ == "__main__":
+    sys.exit(main())
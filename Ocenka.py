@@ -0,0 +1,262 @@
+import importlib
+import random
+import sys
+
+# Стоимость фигур по умолчанию (в сотых долях пешки); D - дамка в шашках
+DEFAULT_VALUES = {'P': 100, 'N': 300, 'B': 300, 'R': 500, 'Q': 900, 'K': 0,
+                  'S': 350, 'W': 400, 'M': 700, 'C': 100, 'D': 300}
+
+# Названия классов фигур, которые можно использовать в настройках вместо букв
+CLASS_LETTERS = {'Pawn': 'P', 'Knight': 'N', 'Bishop': 'B', 'Rook': 'R', 'Queen': 'Q', 'King': 'K',
+                 'Spider': 'S', 'Wizard': 'W', 'Minotaur': 'M', 'Checker': 'C', 'CheckerKing': 'D'}
+
+
+def _center(scale):
+    """
+    Строит таблицу клеток с бонусом за близость к центру.
+
+    Аргументы:
+        scale (int): Бонус за одну клетку приближения к центру.
+
+    Возвращает:
+        list: 64 значения (строка 0 - восьмая горизонталь).
+    """
+    return [scale * (6 - int(abs(row - 3.5) + abs(col - 3.5))) for row in range(8) for col in range(8)]
+
+
+def _advance(step, start_row):
+    """
+    Строит таблицу клеток с бонусом за продвижение вперёд (для белых).
+
+    Аргументы:
+        step (int): Бонус за одну горизонталь.
+        start_row (int): Строка, с которой бонус отсчитывается.
+
+    Возвращает:
+        list: 64 значения.
+    """
+    return [step * max(0, start_row - row) for row in range(8) for col in range(8)]
+
+
+# Таблицы клеток по умолчанию с точки зрения белых; для чёрных отражаются по горизонтали
+DEFAULT_TABLES = {
+    'P': _advance(5, 6),
+    'N': _center(2),
+    'B': _center(1),
+    'Q': _center(1),
+    'S': _center(2),
+    'W': _center(1),
+    'M': _center(1),
+    'C': _advance(4, 7),
+    'D': _center(2),
+}
+
+
+def letter(key):
+    """
+    Переводит название класса фигуры в её букву.
+
+    Аргументы:
+        key (str): Буква ('S') или название класса ('Spider').
+
+    Возвращает:
+        str: Буква фигуры.
+    """
+    if key in DEFAULT_VALUES:
+        return key
+    if key in CLASS_LETTERS:
+        return CLASS_LETTERS[key]
+    raise ValueError(f"Неизвестная фигура '{key}'")
+
+
+class Weights:
+    """
+    Класс, хранящий настраиваемые веса оценки позиции.
+
+    Атрибуты:
+        values (dict): Стоимость фигуры по букве.
+        tables (dict): Таблицы клеток по цвету ('W', 'B') и букве фигуры (64 значения, строка за строкой).
+    """
+    def __init__(self, values=None, tables=None, defaults=True):
+        """
+        Конструктор: объединяет веса по умолчанию с заданными.
+
+        Аргументы:
+            values (dict): Стоимость фигур по букве или названию класса.
+            tables (dict): Таблицы клеток для белых (64 значения) по букве или названию класса.
+            defaults (bool): Начинать с DEFAULT_VALUES и DEFAULT_TABLES (иначе - только заданные веса).
+        """
+        merged_values = dict(DEFAULT_VALUES) if defaults else {}
+        merged_tables = dict(DEFAULT_TABLES) if defaults else {}
+        for key, value in (values or {}).items():
+            merged_values[letter(key)] = value
+        for key, table in (tables or {}).items():
+            if len(table) != 64:
+                raise ValueError(f"В таблице клеток '{key}' не 64 значения")
+            merged_tables[letter(key)] = list(table)
+        self.values = merged_values
+        self.tables = {
+            'W': merged_tables,
+            'B': {name: [table[(7 - index // 8) * 8 + index % 8] for index in range(64)]
+                  for name, table in merged_tables.items()},
+        }
+
+
+class Evaluation:
+    """
+    Класс, хранящий материал и сумму таблиц клеток каждой стороны.
+
+    Доска вызывает moved, unmoved и promoted из move_piece, undo_move и превращения шашки,
+    поэтому оценка обновляется за O(1) на ход без просмотра всей доски.
+
+    Атрибуты:
+        board (Board): Доска, к которой подключена оценка.
+        weights (Weights): Веса оценки.
+        material (dict): Материал по цвету стороны.
+        positional (dict): Сумма таблиц клеток по цвету стороны.
+    """
+    def __init__(self, board, weights=None):
+        """
+        Конструктор: подключает оценку к доске и считает её по текущей позиции.
+
+        Аргументы:
+            board (Board): Доска ChessOsnova, Dop156 или Shashechki.
+            weights (Weights): Веса оценки (по умолчанию Weights()).
+        """
+        self.board = board
+        self.weights = weights or Weights()
+        self._values = self.weights.values
+        self._tables = self.weights.tables
+        self.material = {'W': 0, 'B': 0}
+        self.positional = {'W': 0, 'B': 0}
+        board.evaluation = self
+        self.refresh()
+
+    def refresh(self):
+        """
+        Пересчитывает оценку просмотром всей доски (после расстановки позиции в обход move_piece).
+        """
+        values = self.weights.values
+        tables = self.weights.tables
+        material = {'W': 0, 'B': 0}
+        positional = {'W': 0, 'B': 0}
+        for row, line in enumerate(self.board.grid):
+            for col, piece in enumerate(line):
+                if piece is None:
+                    continue
+                material[piece.color] += values.get(piece.name, 0)
+                table = tables[piece.color].get(piece.name)
+                if table is not None:
+                    positional[piece.color] += table[row * 8 + col]
+        self.material = material
+        self.positional = positional
+
+    def moved(self, piece, start, end, captured, captured_at):
+        """
+        Учитывает ход фигуры.
+
+        Аргументы:
+            piece (Unit): Фигура, сделавшая ход.
+            start (tuple): Начальная клетка.
+            end (tuple): Конечная клетка.
+            captured (Unit): Побитая фигура или None.
+            captured_at (tuple): Клетка побитой фигуры (в шашках - клетка между start и end).
+        """
+        table = self._tables[piece.color].get(piece.name)
+        if table is not None:
+            self.positional[piece.color] += table[end[0] * 8 + end[1]] - table[start[0] * 8 + start[1]]
+        if captured is not None:
+            self.material[captured.color] -= self._values.get(captured.name, 0)
+            table = self._tables[captured.color].get(captured.name)
+            if table is not None:
+                self.positional[captured.color] -= table[captured_at[0] * 8 + captured_at[1]]
+
+    def unmoved(self, piece, start, end, captured, captured_at):
+        """
+        Учитывает отмену хода (аргументы те же, что у moved).
+
+        Аргументы:
+            piece (Unit): Фигура, сделавшая ход.
+            start (tuple): Начальная клетка.
+            end (tuple): Конечная клетка.
+            captured (Unit): Побитая фигура или None.
+            captured_at (tuple): Клетка побитой фигуры.
+        """
+        table = self._tables[piece.color].get(piece.name)
+        if table is not None:
+            self.positional[piece.color] -= table[end[0] * 8 + end[1]] - table[start[0] * 8 + start[1]]
+        if captured is not None:
+            self.material[captured.color] += self._values.get(captured.name, 0)
+            table = self._tables[captured.color].get(captured.name)
+            if table is not None:
+                self.positional[captured.color] += table[captured_at[0] * 8 + captured_at[1]]
+
+    def promoted(self, square, old, new):
+        """
+        Учитывает замену фигуры на клетке (превращение шашки в дамку или его отмену).
+
+        Аргументы:
+            square (tuple): Клетка.
+            old (Unit): Прежняя фигура.
+            new (Unit): Новая фигура.
+        """
+        values = self.weights.values
+        self.material[old.color] -= values.get(old.name, 0)
+        self.material[new.color] += values.get(new.name, 0)
+        index = square[0] * 8 + square[1]
+        table = self.weights.tables[old.color].get(old.name)
+        if table is not None:
+            self.positional[old.color] -= table[index]
+        table = self.weights.tables[new.color].get(new.name)
+        if table is not None:
+            self.positional[new.color] += table[index]
+
+    def score(self, color):
+        """
+        Возвращает оценку позиции с точки зрения стороны.
+
+        Аргументы:
+            color (str): Цвет стороны ('W' или 'B').
+
+        Возвращает:
+            int: Оценка в сотых долях пешки.
+        """
+        other = 'B' if color == 'W' else 'W'
+        return (self.material[color] + self.positional[color]) - (self.material[other] + self.positional[other])
+
+
+def attach(board, weights=None):
+    """
+    Подключает к доске оценку, обновляемую на каждом ходу.
+
+    Аргументы:
+        board (Board): Доска.
+        weights (Weights): Веса оценки.
+
+    Возвращает:
+        Evaluation: Оценка доски.
+    """
+    return Evaluation(board, weights)
+
+
+def main():
+    """
+    Точка входа: выводит оценку начальной позиции модуля и проверяет её после случайных ходов.
+    """
+    module = importlib.import_module(sys.argv[1] if len(sys.argv) > 1 else 'Dop156')
+    board = module.Board()
+    evaluation = attach(board)
+    print(f"Материал: {evaluation.material}, таблицы клеток: {evaluation.positional}, оценка белых: {evaluation.score('W')}")
+    rng = random.Random(156)
+    squares = [(r, c) for r in range(8) for c in range(8)]
+    made = 0
+    for _ in range(20000):
+        if board.move_piece(rng.choice(squares), rng.choice(squares)):
+            made += 1
+    incremental = (dict(evaluation.material), dict(evaluation.positional))
+    evaluation.refresh()
+    print(f"Ходов: {made}, оценка после ходов: {evaluation.score('W')}, "
+          f"совпадает с пересчётом: {incremental == (evaluation.material, evaluation.positional)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import importlib
+import sys
+import time
+
+import Yadro
+
+# Буквы фигур: заглавные - белые, строчные - чёрные.
+# S - паук, W - волшебник, M - минотавр (Dop156), C - шашка, D - дамка (Shashechki).
+LETTERS = 'PNBRQKSWMCD'
+
+
+class PieceSet:
+    """
+    Класс, хранящий по одному объекту фигуры на каждую букву позиции.
+
+    Фигуры не хранят своих координат, поэтому один объект может стоять
+    на любом числе клеток и досок, и загрузка позиции не создаёт новых объектов.
+
+    Атрибуты:
+        module (module): Модуль игры (ChessOsnova, Dop156 или Shashechki).
+        pieces (dict): Фигура по букве.
+    """
+    def __init__(self, module):
+        """
+        Конструктор: создаёт фигуры всех классов модуля.
+
+        Аргументы:
+            module (module): Модуль игры.
+        """
+        self.module = module
+        classes = {cls('W').name: cls for cls in vars(module).values()
+                   if isinstance(cls, type) and issubclass(cls, Yadro.Unit) and cls is not module.Unit}
+        self.pieces = {}
+        for name in LETTERS:
+            if name not in module.Unit.SYMBOLS:
+                continue
+            for color, letter in (('W', name), ('B', name.lower())):
+                cls = classes.get(name)
+                self.pieces[letter] = cls(color) if cls else module.Unit(color, name)
+        self._ranks = {}
+
+    def rank(self, text):
+        """
+        Разбирает одну горизонталь позиции (результат кэшируется).
+
+        Аргументы:
+            text (str): Горизонталь (например, 'pppp1ppp').
+
+        Возвращает:
+            list: 8 фигур или None.
+        """
+        row = self._ranks.get(text)
+        if row is not None:
+            return row
+        row = []
+        for char in text:
+            if char.isdigit():
+                row.extend([None] * int(char))
+            elif char in self.pieces:
+                row.append(self.pieces[char])
+            else:
+                raise ValueError(f"Неизвестная фигура '{char}' в горизонтали '{text}'")
+        if len(row) != 8:
+            raise ValueError(f"В горизонтали '{text}' не 8 клеток")
+        if len(self._ranks) < 100000:
+            self._ranks[text] = row
+        return row
+
+
+_piece_sets = {}
+
+
+def piece_set(module):
+    """
+    Возвращает общий набор фигур модуля.
+
+    Аргументы:
+        module (module): Модуль игры.
+
+    Возвращает:
+        PieceSet: Набор фигур.
+    """
+    pieces = _piece_sets.get(module)
+    if pieces is None:
+        pieces = _piece_sets[module] = PieceSet(module)
+    return pieces
+
+
+def dump(board, color='W', move_count=0):
+    """
+    Записывает позицию в текстовом виде.
+
+    Аргументы:
+        board (Board): Доска.
+        color (str): Сторона, которой принадлежит ход ('W' или 'B').
+        move_count (int): Номер хода.
+
+    Возвращает:
+        str: Позиция (например, 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w 0').
+    """
+    ranks = []
+    for row in board.grid:
+        text = ''
+        empty = 0
+        for piece in row:
+            if piece is None:
+                empty += 1
+                continue
+            if empty:
+                text += str(empty)
+                empty = 0
+            text += piece.name if piece.color == 'W' else piece.name.lower()
+        if empty:
+            text += str(empty)
+        ranks.append(text)
+    return f"{'/'.join(ranks)} {'w' if color == 'W' else 'b'} {move_count}"
+
+
+def load(text, module, board=None):
+    """
+    Расставляет позицию на доске.
+
+    Аргументы:
+        text (str): Позиция (доска, сторона 'w'/'b', необязательный номер хода).
+        module (module): Модуль игры.
+        board (Board): Доска для повторного использования (по умолчанию создаётся новая).
+
+    Возвращает:
+        tuple: Доска, сторона ('W' или 'B') и номер хода.
+    """
+    fields = text.split()
+    if not fields:
+        raise ValueError("Пустая позиция")
+    ranks = fields[0].split('/')
+    if len(ranks) != 8:
+        raise ValueError(f"В позиции не 8 горизонталей: '{fields[0]}'")
+    side = fields[1] if len(fields) > 1 else 'w'
+    if side not in ('w', 'b'):
+        raise ValueError(f"Неизвестная сторона '{side}'")
+    move_count = int(fields[2]) if len(fields) > 2 else 0
+    pieces = piece_set(module)
+    rows = [pieces.rank(rank) for rank in ranks]  # Доска меняется только после разбора всей позиции
+    if board is None:
+        board = module.Board()
+    grid = board.grid
+    for index, row in enumerate(rows):
+        grid[index][:] = row
+    if hasattr(board, 'move_history'):
+        board.move_history.clear()
+    if getattr(board, 'evaluation', None) is not None:
+        board.evaluation.refresh()
+    if getattr(board, 'move_cache', None) is not None:
+        board.move_cache.reset()
+    return board, 'W' if side == 'w' else 'B', move_count
+
+
+def iter_positions(lines, module, reuse=True, errors=None):
+    """
+    Загружает позиции построчно (строки, начинающиеся с '#', пропускаются).
+
+    При reuse=True все позиции расставляются на одной доске: доска действительна
+    только до получения следующей позиции.
+
+    Аргументы:
+        lines (iterable): Строки позиций (например, открытый файл).
+        module (module): Модуль игры.
+        reuse (bool): Использовать одну доску для всех позиций.
+        errors (list): Список для записи (номер строки, сообщение) ошибочных строк;
+            если не задан, ошибка прерывает загрузку.
+
+    Возвращает:
+        generator: Кортежи (доска, сторона, номер хода).
+    """
+    board = module.Board() if reuse else None
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            yield load(line, module, board)
+        except ValueError as error:
+            if errors is None:
+                raise
+            errors.append((number, str(error)))
+
+
+def load_file(path, module, reuse=True, errors=None):
+    """
+    Загружает позиции из файла (по одной на строку).
+
+    Аргументы:
+        path (str): Путь к файлу.
+        module (module): Модуль игры.
+        reuse (bool): Использовать одну доску для всех позиций.
+        errors (list): Список для записи ошибочных строк.
+
+    Возвращает:
+        generator: Кортежи (доска, сторона, номер хода).
+    """
+    with open(path, encoding='utf-8') as positions:
+        yield from iter_positions(positions, module, reuse, errors)
+
+
+def main():
+    """
+    Точка входа: проверяет файл позиций и выводит число загруженных позиций.
+    """
+    if len(sys.argv) < 3:
+        print("Использование: python Pozicii.py ChessOsnova|Dop156|Shashechki файл_позиций")
+        return
+    module = importlib.import_module(sys.argv[1])
+    errors = []
+    started = time.perf_counter()
+    count = sum(1 for _ in load_file(sys.argv[2], module, errors=errors))
+    elapsed = time.perf_counter() - started
+    print(f"Позиций: {count}, ошибок: {len(errors)}, позиций/с: {count / max(elapsed, 1e-9):.0f}")
+    for number, message in errors[:10]:
+        print(f"  строка {number}: {message}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+import atexit
+import functools
+import json
+import os
+import sys
+import time
+
+# Методы, которые подсчитываются у классов модулей игр
+UNIT_METHODS = ('is_valid_move', 'is_path_clear', 'get_possible_moves')
+BOARD_METHODS = ('move_piece', 'undo_move', 'get_valid_moves')
+
+_stats = {}      # (модуль, класс, метод) -> [вызовы, наносекунды, максимум наносекунд]
+_originals = []  # (класс, имя метода, исходная функция)
+
+
+def _wrap(name, func):
+    """
+    Оборачивает метод счётчиком вызовов и таймером.
+
+    Статистика ведётся по классу объекта, у которого вызван метод, и модулю этого класса,
+    поэтому унаследованный Unit.is_path_clear учитывается отдельно для Rook, Bishop и т.д.,
+    а Yadro.Board.move_piece - отдельно для досок Dop156, Shashechki и шахматной доски ядра.
+    Время вложенных вызовов входит во время внешнего метода.
+
+    Аргументы:
+        name (str): Название метода.
+        func (function): Исходный метод.
+
+    Возвращает:
+        function: Обёртка метода.
+    """
+    clock = time.perf_counter_ns
+    stats = _stats
+    modules = {}  # Класс объекта -> название его модуля
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        started = clock()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            elapsed = clock() - started
+            cls = type(self)
+            module_name = modules.get(cls)
+            if module_name is None:
+                module_name = modules[cls] = _module_name(cls)
+            key = (module_name, cls.__name__, name)
+            entry = stats.get(key)
+            if entry is None:
+                entry = stats[key] = [0, 0, 0]
+            entry[0] += 1
+            entry[1] += elapsed
+            if elapsed > entry[2]:
+                entry[2] = elapsed
+    return wrapper
+
+
+def default_modules():
+    """
+    Возвращает модули игр, которые инструментируются по умолчанию.
+
+    Возвращает:
+        list: Модули ChessOsnova, Dop156 и Shashechki.
+    """
+    import ChessOsnova
+    import Dop156
+    import Shashechki
+    return [ChessOsnova, Dop156, Shashechki]
+
+
+def is_enabled():
+    """
+    Проверяет, установлены ли счётчики.
+
+    Возвращает:
+        bool: True, если инструментирование включено.
+    """
+    return bool(_originals)
+
+
+def enable(modules=None):
+    """
+    Включает подсчёт вызовов: заменяет методы классов Unit и Board обёртками.
+
+    Пока инструментирование выключено, методы не изменены и накладных расходов нет.
+
+    Аргументы:
+        modules (list): Модули игр (по умолчанию ChessOsnova, Dop156 и Shashechki).
+    """
+    if is_enabled():
+        return
+    import Yadro
+    wrapped = set()
+    for module in modules or default_modules():
+        for cls in vars(module).values():
+            if not isinstance(cls, type):
+                continue
+            if issubclass(cls, Yadro.Unit):
+                names = UNIT_METHODS
+            elif cls.__name__ == 'Board':
+                names = BOARD_METHODS
+            else:
+                continue
+            # Общие классы ядра (Yadro) и унаследованные методы оборачиваются один раз,
+            # в классе, где метод определён; модуль в статистике - модуль класса объекта
+            for owner in cls.__mro__[:-1]:
+                for name in names:
+                    func = owner.__dict__.get(name)
+                    if func is None or (owner, name) in wrapped:
+                        continue
+                    wrapped.add((owner, name))
+                    _originals.append((owner, name, func))
+                    setattr(owner, name, _wrap(name, func))
+
+
+def _module_name(cls):
+    """
+    Возвращает название модуля, в котором определён класс (для запущенного скрипта - по имени файла).
+
+    Аргументы:
+        cls (type): Класс.
+
+    Возвращает:
+        str: Название модуля.
+    """
+    module = sys.modules[cls.__module__]
+    if module.__name__ == '__main__':
+        return os.path.splitext(os.path.basename(module.__file__))[0]
+    return module.__name__
+
+
+def disable():
+    """
+    Выключает подсчёт вызовов и возвращает исходные методы (статистика сохраняется).
+    """
+    while _originals:
+        cls, name, func = _originals.pop()
+        setattr(cls, name, func)
+
+
+def reset():
+    """
+    Очищает накопленную статистику.
+    """
+    _stats.clear()
+
+
+def snapshot():
+    """
+    Возвращает накопленную статистику.
+
+    Возвращает:
+        list: Словари с полями module, cls, method, calls, seconds, mean_us, max_us.
+    """
+    rows = []
+    for (module_name, cls_name, name), (calls, total, longest) in sorted(_stats.items()):
+        rows.append({
+            'module': module_name,
+            'cls': cls_name,
+            'method': name,
+            'calls': calls,
+            'seconds': total / 1e9,
+            'mean_us': total / calls / 1e3 if calls else 0.0,
+            'max_us': longest / 1e3,
+        })
+    return rows
+
+
+def to_json():
+    """
+    Возвращает статистику в формате JSON.
+
+    Возвращает:
+        str: Строка JSON.
+    """
+    return json.dumps(snapshot(), ensure_ascii=False, indent=1)
+
+
+def to_prometheus(prefix='chesskir'):
+    """
+    Возвращает статистику в текстовом формате Prometheus.
+
+    Аргументы:
+        prefix (str): Префикс имён метрик.
+
+    Возвращает:
+        str: Текст метрик.
+    """
+    metrics = [
+        ('calls_total', 'counter', 'Число вызовов метода.', lambda row: row['calls']),
+        ('seconds_total', 'counter', 'Суммарное время вызовов метода в секундах.', lambda row: row['seconds']),
+        ('max_seconds', 'gauge', 'Самый долгий вызов метода в секундах.', lambda row: row['max_us'] / 1e6),
+    ]
+    rows = snapshot()
+    lines = []
+    for suffix, kind, help_text, value in metrics:
+        lines.append(f"# HELP {prefix}_{suffix} {help_text}")
+        lines.append(f"# TYPE {prefix}_{suffix} {kind}")
+        for row in rows:
+            labels = f'module="{row["module"]}",cls="{row["cls"]}",method="{row["method"]}"'
+            lines.append(f"{prefix}_{suffix}{{{labels}}} {value(row)}")
+    return "\n".join(lines) + "\n"
+
+
+def summary(limit=30):
+    """
+    Формирует таблицу самых затратных методов.
+
+    Аргументы:
+        limit (int): Число строк таблицы.
+
+    Возвращает:
+        str: Текст таблицы.
+    """
+    rows = sorted(snapshot(), key=lambda row: row['seconds'], reverse=True)[:limit]
+    lines = [f"{'Модуль':<12}{'Класс':<10}{'Метод':<20}{'Вызовы':>12}{'Всего, с':>12}{'Среднее, мкс':>14}{'Макс, мкс':>12}"]
+    for row in rows:
+        lines.append(f"{row['module']:<12}{row['cls']:<10}{row['method']:<20}{row['calls']:>12}"
+                     f"{row['seconds']:>12.4f}{row['mean_us']:>14.2f}{row['max_us']:>12.1f}")
+    return "\n".join(lines)
+
+
+def write(path):
+    """
+    Записывает статистику в файл: '.prom' - формат Prometheus, иначе JSON.
+
+    Аргументы:
+        path (str): Путь к файлу.
+    """
+    with open(path, 'w', encoding='utf-8') as output:
+        output.write(to_prometheus() if path.endswith('.prom') else to_json())
+
+
+def profile_from_argv(argv, modules=None):
+    """
+    Обрабатывает флаг --profile[=ФАЙЛ]: включает подсчёт и выводит итоги при выходе.
+
+    Флаг удаляется из argv, чтобы не мешать разбору остальных аргументов.
+
+    Аргументы:
+        argv (list): Аргументы командной строки (обычно sys.argv).
+        modules (list): Модули игр для инструментирования.
+
+    Возвращает:
+        bool: True, если режим профилирования включён.
+    """
+    flags = [arg for arg in argv if arg == '--profile' or arg.startswith('--profile=')]
+    if not flags:
+        return False
+    for flag in flags:
+        argv.remove(flag)
+    path = flags[-1].partition('=')[2]
+    enable(modules)
+
+    def report():
+        print(summary(), file=sys.stderr)
+        if path:
+            write(path)
+    atexit.register(report)
+    return True
@@ -0,0 +1,361 @@
+import os
+import random
+import time
+from collections import Counter
+
+import Dvizhok
+
+MAX_MOVES = 512  # Размер заранее выделенного буфера ходов
+
+
+def _candidate_targets(name, color, row, col):
+    """
+    Возвращает клетки, на которые фигура может пойти без учёта других фигур.
+
+    Список - надмножество ходов фигуры: окончательную проверку выполняет is_valid_move.
+    Для неизвестных фигур возвращаются все клетки доски.
+
+    Аргументы:
+        name (str): Название фигуры.
+        color (str): Цвет фигуры ('W' или 'B').
+        row (int): Строка фигуры.
+        col (int): Столбец фигуры.
+
+    Возвращает:
+        tuple: Клетки (строка, столбец).
+    """
+    squares = [(r, c) for r in range(8) for c in range(8) if (r, c) != (row, col)]
+    forward = -1 if color == 'W' else 1
+    if name == 'P':
+        targets = [(row + forward, col + dc) for dc in (-1, 0, 1)] + [(row + 2 * forward, col)]
+    elif name == 'N':
+        targets = [(r, c) for r, c in squares if {abs(r - row), abs(c - col)} == {1, 2}]
+    elif name == 'K':
+        targets = [(r, c) for r, c in squares if max(abs(r - row), abs(c - col)) == 1]
+    elif name in ('R',):
+        targets = [(r, c) for r, c in squares if r == row or c == col]
+    elif name in ('B',):
+        targets = [(r, c) for r, c in squares if abs(r - row) == abs(c - col)]
+    elif name in ('Q', 'M'):
+        targets = [(r, c) for r, c in squares if r == row or c == col or abs(r - row) == abs(c - col)]
+    elif name == 'S':
+        targets = [(r, c) for r, c in squares if abs(r - row) <= 2 and abs(c - col) <= 2]
+    elif name == 'W':
+        targets = [(r, c) for r, c in squares if (r + c) % 2 == (row + col) % 2]
+    elif name in ('C', 'D'):
+        targets = [(row + dr, col + dc) for dr in (-2, -1, 1, 2) for dc in (-abs(dr), abs(dr))]
+    else:
+        targets = squares
+    return tuple((r, c) for r, c in targets if 0 <= r < 8 and 0 <= c < 8)
+
+
+class TargetTable:
+    """
+    Класс, хранящий заранее вычисленные клетки-кандидаты для ходов фигур.
+
+    Атрибуты:
+        table (dict): Кандидаты по ключу (название, цвет, строка, столбец).
+    """
+    def __init__(self):
+        """
+        Конструктор для инициализации пустой таблицы.
+        """
+        self.table = {}
+
+    def get(self, name, color, row, col):
+        """
+        Возвращает клетки-кандидаты, вычисляя их при первом обращении.
+
+        Аргументы:
+            name (str): Название фигуры.
+            color (str): Цвет фигуры.
+            row (int): Строка фигуры.
+            col (int): Столбец фигуры.
+
+        Возвращает:
+            tuple: Клетки (строка, столбец).
+        """
+        key = (name, color, row, col)
+        targets = self.table.get(key)
+        if targets is None:
+            targets = self.table[key] = _candidate_targets(name, color, row, col)
+        return targets
+
+
+TARGETS = TargetTable()
+
+
+class PlayoutStats:
+    """
+    Класс, накапливающий итоги случайных партий.
+
+    Атрибуты:
+        outcomes (Counter): Число исходов ('1-0', '0-1', '1/2').
+        plies (int): Суммарное число полуходов.
+        captures (Counter): Число взятий фигур соперника по названию бьющей фигуры.
+        playouts (int): Число партий.
+        seconds (float): Время работы в секундах.
+    """
+    def __init__(self):
+        """
+        Конструктор для инициализации пустой статистики.
+        """
+        self.outcomes = Counter()
+        self.plies = 0
+        self.captures = Counter()
+        self.playouts = 0
+        self.seconds = 0.0
+
+    def merge(self, other):
+        """
+        Добавляет статистику другого процесса.
+
+        Аргументы:
+            other (PlayoutStats): Статистика для добавления.
+        """
+        self.outcomes.update(other.outcomes)
+        self.captures.update(other.captures)
+        self.plies += other.plies
+        self.playouts += other.playouts
+        self.seconds = max(self.seconds, other.seconds)
+
+    def report(self):
+        """
+        Формирует текстовый отчёт.
+
+        Возвращает:
+            str: Отчёт.
+        """
+        games = max(self.playouts, 1)
+        lines = [
+            f"Партий: {self.playouts}, партий/с: {self.playouts / max(self.seconds, 1e-9):.1f}, "
+            f"средняя длина: {self.plies / games:.1f}",
+            "Исходы: " + ", ".join(f"{result} {count} ({count * 100 / games:.1f}%)"
+                                   for result, count in sorted(self.outcomes.items())),
+            "Взятия: " + ", ".join(f"{name} {count}" for name, count in self.captures.most_common()),
+        ]
+        return "\n".join(lines)
+
+
+class Playout:
+    """
+    Класс, разыгрывающий случайные партии до конца из заданной позиции.
+
+    Ходы выполняются на одной доске и отменяются через undo_move, списки ходов
+    пишутся в заранее выделенные буферы.
+
+    Атрибуты:
+        variant (Variant): Вариант игры.
+        board (Board): Доска с исходной позицией.
+        color (str): Сторона, которой принадлежит ход в исходной позиции.
+        max_plies (int): Лимит полуходов (после него - ничья).
+        policy (callable): Вес хода policy(piece, start, end, board) или None для равновероятного выбора.
+        rng (random.Random): Генератор случайных чисел.
+    """
+    def __init__(self, variant_name, opening=(), max_plies=300, policy=None, seed=0):
+        """
+        Конструктор для инициализации розыгрыша.
+
+        Аргументы:
+            variant_name (str): Название варианта ('chess', 'fairy' или 'checkers').
+            opening (list): Ходы, ведущие к исходной позиции ('e2e4').
+            max_plies (int): Лимит полуходов.
+            policy (callable): Функция веса хода или None.
+            seed (int): Зерно генератора.
+        """
+        self.variant = Dvizhok.VARIANTS[variant_name]
+        self.board = self.variant.new_board()
+        if policy is None:
+            self.board.evaluation = None  # Без политики позиции не оцениваются: ходы без обновления оценки
+        self.color = 'W'
+        for move in opening:
+            start, end = self.variant.parse_move(move)
+            if start is None or not self.board.move_piece(start, end):
+                raise ValueError(f"Недопустимый ход в дебюте: {move}")
+            self.color = Dvizhok.opponent(self.color)
+        self.root_depth = len(self.board.move_history)
+        self.max_plies = max_plies
+        self.policy = policy
+        self.rng = random.Random(seed)
+        self.starts = [None] * MAX_MOVES
+        self.ends = [None] * MAX_MOVES
+        self.weights = [0.0] * MAX_MOVES
+
+    def generate(self, color):
+        """
+        Записывает ходы стороны в буферы starts/ends.
+
+        Аргументы:
+            color (str): Цвет стороны.
+
+        Возвращает:
+            int: Число ходов в буфере.
+        """
+        grid = self.board.grid
+        starts, ends = self.starts, self.ends
+        targets = TARGETS.get
+        count = 0
+        for r in range(8):
+            row = grid[r]
+            for c in range(8):
+                piece = row[c]
+                if piece is None or piece.color != color:
+                    continue
+                start = (r, c)
+                for end in targets(piece.name, color, r, c):
+                    if piece.is_valid_move(start, end, grid):
+                        starts[count] = start
+                        ends[count] = end
+                        count += 1
+        return count
+
+    def pick(self, count):
+        """
+        Выбирает номер хода из буфера (равновероятно или по весам policy).
+
+        Аргументы:
+            count (int): Число ходов в буфере.
+
+        Возвращает:
+            int: Номер выбранного хода.
+        """
+        if self.policy is None:
+            return int(self.rng.random() * count)
+        grid = self.board.grid
+        weights, starts, ends = self.weights, self.starts, self.ends
+        total = 0.0
+        for index in range(count):
+            start = starts[index]
+            total += self.policy(grid[start[0]][start[1]], start, ends[index], self.board)
+            weights[index] = total
+        threshold = self.rng.random() * total
+        for index in range(count):
+            if weights[index] > threshold:
+                return index
+        return count - 1
+
+    def play_one(self, stats):
+        """
+        Разыгрывает одну партию до конца и возвращает доску в исходную позицию.
+
+        Аргументы:
+            stats (PlayoutStats): Статистика для записи итогов.
+
+        Возвращает:
+            str: Результат ('1-0', '0-1', '1/2').
+        """
+        variant = self.variant
+        board = self.board
+        grid = board.grid
+        color = self.color
+        result = '1/2'
+        plies = 0
+        while plies < self.max_plies:
+            count = self.generate(color)
+            if count == 0:
+                if variant.no_moves_score(0) < 0:
+                    result = '0-1' if color == 'W' else '1-0'
+                break
+            index = self.pick(count)
+            start, end = self.starts[index], self.ends[index]
+            captured = variant.captured_piece(board, (start, end))
+            if captured is not None and captured.color != color:
+                stats.captures[grid[start[0]][start[1]].name] += 1
+            board.move_piece(start, end)
+            plies += 1
+            # Фигуры Dop156 могут бить свои фигуры, в том числе своего короля: проигрывает сторона без короля
+            if captured is not None and captured.name == 'K' and variant.is_lost(board, captured.color):
+                result = '0-1' if captured.color == 'W' else '1-0'
+                break
+            color = Dvizhok.opponent(color)
+        for _ in range(plies):
+            board.undo_move()
+        stats.outcomes[result] += 1
+        stats.plies += plies
+        stats.playouts += 1
+        return result
+
+    def run(self, count):
+        """
+        Разыгрывает заданное число партий.
+
+        Аргументы:
+            count (int): Число партий.
+
+        Возвращает:
+            PlayoutStats: Статистика партий.
+        """
+        stats = PlayoutStats()
+        start = time.perf_counter()
+        for _ in range(count):
+            self.play_one(stats)
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+
+def _worker(task):
+    """
+    Тело процесса: разыгрывает свою долю партий с собственным зерном.
+
+    Аргументы:
+        task (tuple): Вариант, дебют, лимит полуходов, зерно, число партий.
+
+    Возвращает:
+        PlayoutStats: Статистика процесса.
+    """
+    variant_name, opening, max_plies, seed, count = task
+    return Playout(variant_name, opening, max_plies, seed=seed).run(count)
+
+
+def run_parallel(variant_name, count, opening=(), max_plies=300, seed=0, workers=None):
+    """
+    Разыгрывает партии в нескольких процессах с детерминированными зёрнами.
+
+    Процесс номер i использует зерно seed * 1000003 + i, поэтому результат
+    зависит только от seed и числа процессов.
+
+    Аргументы:
+        variant_name (str): Название варианта.
+        count (int): Общее число партий.
+        opening (list): Ходы, ведущие к исходной позиции.
+        max_plies (int): Лимит полуходов.
+        seed (int): Базовое зерно.
+        workers (int): Число процессов (по умолчанию - число ядер).
+
+    Возвращает:
+        PlayoutStats: Общая статистика.
+    """
+    workers = workers or os.cpu_count()
+    tasks = [(variant_name, list(opening), max_plies, seed * 1000003 + worker,
+              count // workers + (1 if worker < count % workers else 0)) for worker in range(workers)]
+    stats = PlayoutStats()
+    start = time.perf_counter()
+    if workers == 1:
+        stats.merge(_worker(tasks[0]))
+    else:
+        import multiprocessing
+        with multiprocessing.Pool(workers) as pool:
+            for part in pool.imap_unordered(_worker, tasks):
+                stats.merge(part)
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def main():
+    """
+    Точка входа: разбирает аргументы командной строки и выводит статистику розыгрышей.
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description="Случайные партии до конца из заданной позиции")
+    parser.add_argument('variant', choices=sorted(Dvizhok.VARIANTS))
+    parser.add_argument('--playouts', type=int, default=1000)
+    parser.add_argument('--moves', nargs='*', default=[], help="ходы до исходной позиции (e2e4 e7e5 ...)")
+    parser.add_argument('--max-plies', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args()
+    stats = run_parallel(args.variant, args.playouts, args.moves, args.max_plies, args.seed, args.workers)
+    print(stats.report())
+
+if __name__ == "__main__":
+    main()
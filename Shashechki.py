@@ -1,41 +1,21 @@
-import string
-class Unit:
-    """
-    Базовый класс для шашек.
+import sys
 
-    Атрибуты:
-        SYMBOLS (dict): Словарь, сопоставляющий символы шашек с их Unicode-представлениями.
-        color (str): Цвет шашки ('W' для белых, 'B' для чёрных).
-        name (str): Тип шашки ('C' для обычной шашки, 'D' для дамки).
-        symbol (str): Символ шашки, зависящий от её цвета.
-    """
-    SYMBOLS = {'C': '⛀', 'D': '⛁'}  # C - обычная шашка, D - дамка
+import Yadro
+from Yadro import FILES
 
-    def __init__(self, color, name):
-        """
-        Конструктор для инициализации шашки.
+DRAUGHTS_FILES = 'abcdefghijklmnopqrstuvwxyz'  # Буквы вертикалей досок DraughtsBoard
 
-        Аргументы:
-            color (str): Цвет шашки ('W' или 'B').
-            name (str): Тип шашки ('C' или 'D').
-        """
-        self.color = color
-        self.name = name
-        self.symbol = self.SYMBOLS[name] if color == 'W' else self.SYMBOLS[name].lower()
 
-    def is_valid_move(self, start, end, board):
-        """
-        Проверяет, является ли ход корректным для шашки.
+class Unit(Yadro.Unit):
+    """
+    Базовый класс для шашек (дамка - сама Unit с именем 'D', ходов у неё нет).
 
-        Аргументы:
-            start (tuple): Начальная позиция шашки (строка, столбец).
-            end (tuple): Конечная позиция шашки (строка, столбец).
-            board (list): Игровая доска (двумерный список).
+    Наследует атрибуты и методы от класса Yadro.Unit.
 
-        Возвращает:
-            bool: True, если ход корректен, иначе False.
-        """
-        return False
+    Атрибуты:
+        SYMBOLS (dict): Словарь, сопоставляющий символы шашек с их Unicode-представлениями.
+    """
+    SYMBOLS = {'C': '⛀', 'D': '⛁'}  # C - обычная шашка, D - дамка
 
     def get_possible_moves(self, start, board):
         """
@@ -89,7 +69,7 @@ class Checker(Unit):
         if abs(start_col - end_col) == 2 and abs(start_row - end_row) == 2:
             mid_row = (start_row + end_row) // 2
             mid_col = (start_col + end_col) // 2
-            if board[mid_row][mid_col] and board[mid_row][mid_col].color != self.color:
+            if board[end_row][end_col] is None and board[mid_row][mid_col] and board[mid_row][mid_col].color != self.color:
                 return True
 
         return False
@@ -112,20 +92,13 @@ class Checker(Unit):
                 moves.append(end)
         return moves
 
-class Board:
+class Board(Yadro.Board):
     """
-    Класс, представляющий игровую доску.
+    Класс, представляющий игровую доску для шашек.
 
-    Атрибуты:
-        grid (list): Двумерный список, представляющий игровую доску.
+    Наследует атрибуты и методы от класса Yadro.Board: расстановка, вывод, ход и отмена
+    хода переопределены (взятие прыжком, превращение в дамку).
     """
-    def __init__(self):
-        """
-        Конструктор для инициализации доски и расстановки шашек.
-        """
-        self.grid = [[None] * 8 for _ in range(8)]
-        self.setup_pieces()
-
     def setup_pieces(self):
         """
         Расставляет шашки на доске в начальной позиции.
@@ -176,50 +149,392 @@ class Board:
         if piece and piece.is_valid_move(start, end, self.grid):
             mid_row = (start[0] + end[0]) // 2
             mid_col = (start[1] + end[1]) // 2
+            captured = None
             if abs(start[0] - end[0]) == 2:
+                captured = self.grid[mid_row][mid_col]
                 self.grid[mid_row][mid_col] = None  # Убираем побитую шашку
+            self.move_history.append((start, end, piece, captured))
             self.grid[end[0]][end[1]] = piece
             self.grid[start[0]][start[1]] = None
+            if self.evaluation is not None:
+                self.evaluation.moved(piece, start, end, captured, (mid_row, mid_col))
             if (piece.color == 'W' and end[0] == 0) or (piece.color == 'B' and end[0] == 7):
                 self.grid[end[0]][end[1]] = Unit(piece.color, 'D')  # Превращение в дамку
+                if self.evaluation is not None:
+                    self.evaluation.promoted(end, piece, self.grid[end[0]][end[1]])
             return True
         return False
 
-class Game:
+    def undo_move(self):
+        """
+        Отменяет последний ход, возвращая побитую шашку и снимая превращение в дамку.
+
+        Возвращает:
+            bool: True, если отмена выполнена успешно, иначе False.
+        """
+        if self.move_history:
+            start, end, piece, captured = self.move_history.pop()
+            if self.evaluation is not None:
+                current = self.grid[end[0]][end[1]]
+                if current is not piece:
+                    self.evaluation.promoted(end, current, piece)
+                self.evaluation.unmoved(piece, start, end, captured, ((start[0] + end[0]) // 2, (start[1] + end[1]) // 2))
+            self.grid[end[0]][end[1]] = None
+            self.grid[start[0]][start[1]] = piece
+            if captured is not None:
+                self.grid[(start[0] + end[0]) // 2][(start[1] + end[1]) // 2] = captured
+            return True
+        return False
+
+# Международные шашки: коды клеток доски DraughtsBoard
+EMPTY, WHITE_MAN, WHITE_KING, BLACK_MAN, BLACK_KING = range(5)
+CODE_SYMBOLS = {EMPTY: '.', WHITE_MAN: '⛀', WHITE_KING: '⛁', BLACK_MAN: '⛂', BLACK_KING: '⛃'}
+# Для каждого кода - кортеж, отмечающий фигуры противника (индекс - код клетки)
+ENEMIES = {WHITE_MAN: (False, False, False, True, True), WHITE_KING: (False, False, False, True, True),
+           BLACK_MAN: (False, True, True, False, False), BLACK_KING: (False, True, True, False, False)}
+DIRECTIONS = ((-1, -1), (-1, 1), (1, -1), (1, 1))  # Первые два - вперёд для белых, последние два - для чёрных
+
+
+class DraughtsBoard:
     """
-    Класс, управляющий игрой в шашки.
+    Класс доски международных шашек произвольного размера (10×10 - 20 шашек у каждой стороны).
+
+    Клетки - тёмные поля, пронумерованные по строкам от 0 (номер в нотации на 1 больше: поле 1 - b10).
+    Для каждого поля заранее построены диагонали во всех четырёх направлениях, поэтому генерация
+    ходов не проверяет границы. Взятие обязательно, из взятий выбираются взятия наибольшего числа
+    шашек; дамка дальнобойная; побитые шашки снимаются после хода и не могут быть побиты дважды.
 
     Атрибуты:
-        board (Board): Объект доски.
-        current_turn (str): Текущий ход ('W' для белых, 'B' для чёрных).
-        move_count (int): Счётчик ходов.
+        size (int): Размер доски.
+        count (int): Число тёмных полей.
+        coords (list): Координаты (строка, столбец) каждого поля.
+        rays (list): Для каждого поля - кортеж из четырёх диагоналей (кортежи полей по удалению).
+        promotion (dict): Для кода простой шашки - множество полей превращения в дамку.
+        cells (list): Коды фигур на полях.
+        move_history (list): История ходов (ход, код фигуры, коды побитых фигур).
     """
-    def __init__(self):
+    def __init__(self, size=10, setup=True):
         """
-        Конструктор для инициализации игры.
+        Конструктор для инициализации доски.
+
+        Аргументы:
+            size (int): Размер доски (чётный, от 4 до 26).
+            setup (bool): Расставить начальную позицию (иначе доска пуста).
         """
-        self.board = Board()
-        self.current_turn = 'W'
-        self.move_count = 0
+        if size < 4 or size % 2 or size > len(DRAUGHTS_FILES):
+            raise ValueError(f"Размер доски должен быть чётным, от 4 до {len(DRAUGHTS_FILES)}: {size}")
+        self.size = size
+        self.coords = [(row, col) for row in range(size) for col in range(size) if (row + col) % 2 == 1]
+        self.count = len(self.coords)
+        index = {square: number for number, square in enumerate(self.coords)}
+        self.rays = []
+        for row, col in self.coords:
+            rays = []
+            for drow, dcol in DIRECTIONS:
+                ray = []
+                r, c = row + drow, col + dcol
+                while 0 <= r < size and 0 <= c < size:
+                    ray.append(index[(r, c)])
+                    r, c = r + drow, c + dcol
+                rays.append(tuple(ray))
+            self.rays.append(tuple(rays))
+        self.promotion = {WHITE_MAN: {n for n, (row, _) in enumerate(self.coords) if row == 0},
+                          BLACK_MAN: {n for n, (row, _) in enumerate(self.coords) if row == size - 1}}
+        self.cells = [EMPTY] * self.count
+        self.move_history = []
+        if setup:
+            self.setup_pieces()
+
+    def setup_pieces(self):
+        """
+        Расставляет шашки в начальной позиции: по (size - 2) / 2 ряда у каждой стороны.
+        """
+        rows = (self.size - 2) // 2
+        for number, (row, _) in enumerate(self.coords):
+            if row < rows:
+                self.cells[number] = BLACK_MAN
+            elif row >= self.size - rows:
+                self.cells[number] = WHITE_MAN
+
+    def _can_capture(self, start, code):
+        """
+        Быстро проверяет, может ли фигура с поля start что-нибудь побить (без перебора цепочек).
+
+        Аргументы:
+            start (int): Поле фигуры.
+            code (int): Код фигуры.
+
+        Возвращает:
+            bool: True, если взятие есть.
+        """
+        cells = self.cells
+        enemy = ENEMIES[code]
+        king = code == WHITE_KING or code == BLACK_KING
+        for ray in self.rays[start]:
+            length = len(ray)
+            i = 0
+            if king:
+                while i < length and cells[ray[i]] == EMPTY:
+                    i += 1
+            if i < length - 1 and enemy[cells[ray[i]]] and cells[ray[i + 1]] == EMPTY:
+                return True
+        return False
 
-    def parse_input(self, move):
+    def _captures(self, start, code):
         """
-        Парсит ввод пользователя в координаты на доске.
+        Перечисляет взятия фигуры с поля start.
+
+        Обход в глубину по состояниям (поле, маска побитых): в одно и то же состояние можно прийти
+        разными путями, но продолжения у них одинаковые, поэтому каждое состояние разбирается один раз.
+        Это держит перебор дальнобойных дамок в плотных позициях в пределах числа состояний, а не путей.
 
         Аргументы:
-            move (str): Ввод пользователя (например, 'e3d4').
+            start (int): Поле фигуры.
+            code (int): Код фигуры.
 
         Возвращает:
-            tuple: Начальная и конечная позиции в виде кортежей (строка, столбец).
+            tuple: Наибольшее число побитых шашек и список ходов (путь, побитые поля) с этим числом.
+        """
+        cells = self.cells
+        rays = self.rays
+        enemy = ENEMIES[code]
+        king = code == WHITE_KING or code == BLACK_KING
+        best = 0
+        found = {}
+        seen = set()
+        cells[start] = EMPTY  # Фигура ушла с поля: через него можно пройти
+        stack = [(start, 0, (start,), ())]
+        while stack:
+            square, mask, path, captured = stack.pop()
+            if (square, mask) in seen:
+                continue
+            seen.add((square, mask))
+            extended = False
+            for ray in rays[square]:
+                if king:
+                    length = len(ray)
+                    i = 0
+                    while i < length and cells[ray[i]] == EMPTY:
+                        i += 1
+                    if i >= length - 1:
+                        continue
+                    victim = ray[i]
+                    if not enemy[cells[victim]] or mask >> victim & 1:
+                        continue
+                    i += 1
+                    while i < length and cells[ray[i]] == EMPTY:
+                        landing = ray[i]
+                        stack.append((landing, mask | 1 << victim, path + (landing,), captured + (victim,)))
+                        extended = True
+                        i += 1
+                elif len(ray) > 1:
+                    victim = ray[0]
+                    if enemy[cells[victim]] and not mask >> victim & 1 and cells[ray[1]] == EMPTY:
+                        landing = ray[1]
+                        stack.append((landing, mask | 1 << victim, path + (landing,), captured + (victim,)))
+                        extended = True
+            if not extended and captured:
+                if len(captured) > best:
+                    best = len(captured)
+                    found = {}
+                if len(captured) == best:
+                    # Ходы с теми же полями начала, конца и побитыми шашками совпадают
+                    found.setdefault((square, mask), (path, captured))
+        cells[start] = code
+        return best, list(found.values())
+
+    def generate_moves(self, color):
+        """
+        Возвращает допустимые ходы стороны.
+
+        Аргументы:
+            color (str): Сторона ('W' или 'B').
+
+        Возвращает:
+            list: Ходы (путь, побитые поля); путь - кортеж полей от начального до конечного.
+        """
+        cells = self.cells
+        rays = self.rays
+        man, king = (WHITE_MAN, WHITE_KING) if color == 'W' else (BLACK_MAN, BLACK_KING)
+        forward = slice(0, 2) if color == 'W' else slice(2, 4)
+        best = 0
+        captures = []
+        quiet = []
+        for start, code in enumerate(cells):
+            if code != man and code != king:
+                continue
+            if self._can_capture(start, code):
+                count, moves = self._captures(start, code)
+                if count > best:
+                    best = count
+                    captures = moves
+                elif count == best:
+                    captures.extend(moves)
+            elif best:
+                continue
+            elif code == man:
+                for ray in rays[start][forward]:
+                    if ray and cells[ray[0]] == EMPTY:
+                        quiet.append(((start, ray[0]), ()))
+            else:
+                for ray in rays[start]:
+                    for square in ray:
+                        if cells[square] != EMPTY:
+                            break
+                        quiet.append(((start, square), ()))
+        return captures if best else quiet
+
+    def make_move(self, move):
+        """
+        Выполняет ход без проверки (ход должен быть получен из generate_moves).
+
+        Аргументы:
+            move (tuple): Ход (путь, побитые поля).
+        """
+        path, captured = move
+        cells = self.cells
+        code = cells[path[0]]
+        self.move_history.append((move, code, [cells[square] for square in captured]))
+        cells[path[0]] = EMPTY
+        for square in captured:
+            cells[square] = EMPTY
+        end = path[-1]
+        if code in self.promotion and end in self.promotion[code]:
+            cells[end] = code + 1  # Превращение в дамку
+        else:
+            cells[end] = code
+
+    def undo_move(self):
         """
-        if len(move) != 4 or move[0] not in string.ascii_lowercase[:8] or move[2] not in string.ascii_lowercase[:8]:
-            return None, None
-        try:
-            start = (8 - int(move[1]), string.ascii_lowercase.index(move[0]))
-            end = (8 - int(move[3]), string.ascii_lowercase.index(move[2]))
-            return start, end
-        except ValueError:
-            return None, None
+        Отменяет последний ход, возвращая побитые шашки.
+
+        Возвращает:
+            bool: True, если отмена выполнена успешно, иначе False.
+        """
+        if not self.move_history:
+            return False
+        (path, captured), code, victims = self.move_history.pop()
+        cells = self.cells
+        cells[path[-1]] = EMPTY
+        for square, victim in zip(captured, victims):
+            cells[square] = victim
+        cells[path[0]] = code
+        return True
+
+    def square_name(self, square):
+        """
+        Возвращает название поля в координатах доски.
+
+        Аргументы:
+            square (int): Поле.
+
+        Возвращает:
+            str: Название (например, 'c3').
+        """
+        row, col = self.coords[square]
+        return f"{DRAUGHTS_FILES[col]}{self.size - row}"
+
+    def format_move(self, move):
+        """
+        Записывает ход в нотации номеров полей ('32-28', взятие - '28x19x10').
+
+        Аргументы:
+            move (tuple): Ход (путь, побитые поля).
+
+        Возвращает:
+            str: Запись хода.
+        """
+        path, captured = move
+        return ('x' if captured else '-').join(str(square + 1) for square in path)
+
+    def parse_square(self, text):
+        """
+        Разбирает поле: номер в нотации ('28') или координаты ('c3').
+
+        Аргументы:
+            text (str): Запись поля.
+
+        Возвращает:
+            int: Поле или None, если запись некорректна.
+        """
+        if text.isdigit():
+            number = int(text) - 1
+            return number if 0 <= number < self.count else None
+        if len(text) < 2 or text[0] not in DRAUGHTS_FILES[:self.size] or not text[1:].isdigit():
+            return None
+        square = (self.size - int(text[1:]), DRAUGHTS_FILES.index(text[0]))
+        return self.coords.index(square) if square in self.coords else None
+
+    def find_move(self, text, color):
+        """
+        Находит допустимый ход по записи: поля через '-' или 'x' (промежуточные поля взятия необязательны).
+
+        Аргументы:
+            text (str): Запись хода ('32-28', '28x10', 'c3-d4').
+            color (str): Сторона, которой принадлежит ход.
+
+        Возвращает:
+            tuple: Ход (путь, побитые поля) или None, если ход недопустим или неоднозначен.
+        """
+        squares = [self.parse_square(part) for part in text.replace('x', '-').split('-')]
+        if len(squares) < 2 or None in squares:
+            return None
+        matches = []
+        for move in self.generate_moves(color):
+            path = move[0]
+            if path[0] != squares[0] or path[-1] != squares[-1]:
+                continue
+            position = 1
+            for square in squares[1:-1]:
+                if square not in path[position:-1]:
+                    break
+                position = path.index(square, position) + 1
+            else:
+                matches.append(move)
+        return matches[0] if len(matches) == 1 else None
+
+    def display(self, move_count):
+        """
+        Отображает текущее состояние доски.
+
+        Аргументы:
+            move_count (int): Номер текущего хода.
+        """
+        files = ' '.join(DRAUGHTS_FILES[:self.size])
+        grid = [['.'] * self.size for _ in range(self.size)]
+        for (row, col), code in zip(self.coords, self.cells):
+            grid[row][col] = CODE_SYMBOLS[code]
+        print(f"Ход: {move_count}")
+        print(f"    {files}")
+        print("   " + "-" * (self.size * 2))
+        for row in range(self.size):
+            print(f"{self.size - row:2}| {' '.join(grid[row])} | {self.size - row}")
+        print("   " + "-" * (self.size * 2))
+        print(f"    {files}")
+
+class Game(Yadro.Game):
+    """
+    Класс, управляющий игрой в шашки.
+
+    Наследует атрибуты и методы от класса Yadro.Game.
+    """
+    board_class = Board
+
+    def analyze(self, movetime=1000):
+        """
+        Анализирует текущую позицию (Analiz.CheckersSearch) и выводит лучший ход.
+
+        Аргументы:
+            movetime (int): Время на анализ в миллисекундах.
+        """
+        import Analiz
+        search = Analiz.CheckersSearch(self.board, self.current_turn, info=print)
+        move, score = search.run(movetime=movetime)
+        if move is None:
+            print("Ходов нет")
+            return
+        (sr, sc), (er, ec) = move
+        print(f"Лучший ход: {FILES[sc]}{8 - sr}-{FILES[ec]}{8 - er}, оценка: {Analiz.format_score(score)}")
 
     def play(self):
         """
@@ -227,15 +542,77 @@ class Game:
         """
         while True:
             self.board.display(self.move_count)
-            move = input(f"Ход {'белых' if self.current_turn == 'W' else 'чёрных'} (например, e3-d4): ")
-            move = move.replace("-", "")
+            move = input(f"Ход {'белых' if self.current_turn == 'W' else 'чёрных'} "
+                         f"(например, e3-d4 или 'analyze [мс]'): ")
+            command = move.split()
+            if command and command[0] == 'analyze':
+                self.analyze(int(command[1]) if len(command) > 1 and command[1].isdigit() else 1000)
+                continue
             start, end = self.parse_input(move)
             if start and end and self.board.move_piece(start, end):
                 self.move_count += 1
                 self.current_turn = 'B' if self.current_turn == 'W' else 'W'
+                if self.journal:
+                    self.journal.record_move(self.game_id, move)
             else:
                 print("Неверный ход, попробуйте снова.")
 
+class DraughtsGame:
+    """
+    Класс, управляющий игрой в международные шашки.
+
+    Атрибуты:
+        board (DraughtsBoard): Объект доски.
+        current_turn (str): Текущий ход ('W' для белых, 'B' для чёрных).
+        move_count (int): Счётчик ходов.
+    """
+    def __init__(self, size=10):
+        """
+        Конструктор для инициализации игры.
+
+        Аргументы:
+            size (int): Размер доски.
+        """
+        self.board = DraughtsBoard(size)
+        self.current_turn = 'W'
+        self.move_count = 0
+
+    def play(self):
+        """
+        Основной цикл игры: партия заканчивается, когда у стороны нет ходов.
+        """
+        while True:
+            self.board.display(self.move_count)
+            moves = self.board.generate_moves(self.current_turn)
+            if not moves:
+                print(f"Ходов нет, победили {'чёрные' if self.current_turn == 'W' else 'белые'}")
+                return
+            text = input(f"Ход {'белых' if self.current_turn == 'W' else 'чёрных'} "
+                         f"(например, 32-28, 28x19 или c3-d4; 'undo' - отмена): ").strip()
+            if text == 'undo':
+                if self.board.undo_move():
+                    self.move_count -= 1
+                    self.current_turn = 'B' if self.current_turn == 'W' else 'W'
+                continue
+            move = self.board.find_move(text, self.current_turn)
+            if move is None:
+                print("Неверный ход, попробуйте снова. Допустимые: "
+                      + ", ".join(self.board.format_move(move) for move in moves))
+                continue
+            self.board.make_move(move)
+            self.move_count += 1
+            self.current_turn = 'B' if self.current_turn == 'W' else 'W'
+
 if __name__ == "__main__":
-    game = Game()
+    import Profiler
+    import Zhurnal
+    sizes = [arg for arg in sys.argv if arg.startswith('--size=')]
+    if sizes and any(arg.startswith(('--journal', '--profile')) for arg in sys.argv):
+        # DraughtsGame не пишет журнал, а Profiler оборачивает только классы Unit и Board
+        sys.exit("Флаги --journal и --profile не поддерживаются вместе с --size")
+    Profiler.profile_from_argv(sys.argv, [sys.modules[__name__]])
+    if sizes:
+        game = DraughtsGame(int(sizes[-1].partition('=')[2]))
+    else:
+        game = Zhurnal.game_from_argv(sys.argv, Game)
     game.play()
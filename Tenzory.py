@@ -0,0 +1,266 @@
+import numpy as np
+
+import Yadro
+
+# Коды фигур: белые - положительные, чёрные - отрицательные, 0 - пустая клетка
+CODES = {'P': 1, 'N': 2, 'B': 3, 'R': 4, 'Q': 5, 'K': 6, 'S': 7, 'W': 8, 'M': 9, 'C': 10, 'D': 11}
+NAMES = {code: name for name, code in CODES.items()}
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, SPIDER, WIZARD, MINOTAUR, CHECKER, DAMKA = range(1, 12)
+
+_rows, _cols = np.divmod(np.arange(64), 8)
+_DR = _rows[None, :] - _rows[:, None]  # [откуда, куда] -> разница строк
+_DC = _cols[None, :] - _cols[:, None]
+_ADR, _ADC = np.abs(_DR), np.abs(_DC)
+_NOT_SELF = (_ADR + _ADC) > 0
+
+ORTHOGONAL = _NOT_SELF & ((_DR == 0) | (_DC == 0))
+DIAGONAL = _NOT_SELF & (_ADR == _ADC)
+LINES = ORTHOGONAL | DIAGONAL
+KNIGHT_JUMPS = ((_ADR == 2) & (_ADC == 1)) | ((_ADR == 1) & (_ADC == 2))
+KING_STEPS = _NOT_SELF & (np.maximum(_ADR, _ADC) == 1)
+SPIDER_JUMPS = _NOT_SELF & (_ADR <= 2) & (_ADC <= 2)
+WIZARD_JUMPS = _NOT_SELF & ((_rows[:, None] + _cols[:, None]) % 2 == (_rows[None, :] + _cols[None, :]) % 2)
+CHECKER_JUMPS = (_ADR == 2) & (_ADC == 2)
+
+# Ходы и взятия, зависящие от цвета: индекс 0 - белые (вверх), 1 - чёрные (вниз)
+PAWN_PUSH = np.stack([(_DC == 0) & (_DR == -1), (_DC == 0) & (_DR == 1)])
+PAWN_DOUBLE = np.stack([(_DC == 0) & (_DR == -2) & (_rows[:, None] == 6),
+                        (_DC == 0) & (_DR == 2) & (_rows[:, None] == 1)])
+PAWN_CAPTURE = np.stack([(_ADC == 1) & (_DR == -1), (_ADC == 1) & (_DR == 1)])
+CHECKER_STEPS = PAWN_CAPTURE
+
+
+def _between():
+    """
+    Строит таблицу клеток, лежащих строго между двумя клетками одной линии.
+
+    Возвращает:
+        numpy.ndarray: Массив 4096×64 float32 (строка - пара (откуда, куда)).
+    """
+    table = np.zeros((64, 64, 64), dtype=np.float32)
+    for start in range(64):
+        for end in range(64):
+            if not (LINES[start, end] or CHECKER_JUMPS[start, end]):
+                continue
+            row_step = np.sign(_DR[start, end])
+            col_step = np.sign(_DC[start, end])
+            row, col = _rows[start] + row_step, _cols[start] + col_step
+            while row * 8 + col != end:
+                table[start, end, row * 8 + col] = 1
+                row += row_step
+                col += col_step
+    return table.reshape(4096, 64)
+
+
+_between_table = None
+
+
+def between_table():
+    """
+    Возвращает таблицу клеток между двумя клетками, строя её при первом вызове
+    (построение занимает заметную часть времени импорта модуля).
+
+    Возвращает:
+        numpy.ndarray: Массив 4096×64 float32.
+    """
+    global _between_table
+    if _between_table is None:
+        _between_table = _between()
+    return _between_table
+
+
+def encode_boards(boards, out=None):
+    """
+    Переводит доски (ChessOsnova, Dop156 или Shashechki) в массив кодов фигур.
+
+    Аргументы:
+        boards (list): Список объектов Board.
+        out (numpy.ndarray): Готовый массив N×8×8 int8 для записи (необязательно).
+
+    Возвращает:
+        numpy.ndarray: Массив N×8×8 int8.
+    """
+    if out is None:
+        out = np.zeros((len(boards), 8, 8), dtype=np.int8)
+    for index, board in enumerate(boards):
+        out[index] = [[(CODES[piece.name] if piece.color == 'W' else -CODES[piece.name]) if piece else 0
+                       for piece in row] for row in board.grid]
+    return out
+
+
+def decode_board(codes, module):
+    """
+    Создаёт доску модуля по массиву кодов фигур 8×8.
+
+    Аргументы:
+        codes (numpy.ndarray): Массив 8×8 кодов фигур.
+        module (module): Модуль с классом Board (ChessOsnova, Dop156 или Shashechki).
+
+    Возвращает:
+        Board: Доска с расставленными фигурами.
+    """
+    classes = {cls('W').name: cls for cls in vars(module).values()
+               if isinstance(cls, type) and issubclass(cls, Yadro.Unit) and cls is not module.Unit}
+    board = module.Board()
+    for row in range(8):
+        for col in range(8):
+            code = int(codes[row][col])
+            if code == 0:
+                board.grid[row][col] = None
+                continue
+            color = 'W' if code > 0 else 'B'
+            name = NAMES[abs(code)]
+            board.grid[row][col] = classes[name](color) if name in classes else module.Unit(color, name)
+    return board
+
+
+def occupancy(batch):
+    """
+    Возвращает маски занятости клеток белыми и чёрными фигурами.
+
+    Аргументы:
+        batch (numpy.ndarray): Массив N×8×8 int8 кодов фигур.
+
+    Возвращает:
+        numpy.ndarray: Массив N×2×64 bool (0 - белые, 1 - чёрные).
+    """
+    flat = batch.reshape(len(batch), 64)
+    return np.stack([flat > 0, flat < 0], axis=1)
+
+
+def _blocked(occupied):
+    """
+    Для каждой пары клеток определяет, есть ли фигуры строго между ними.
+
+    Аргументы:
+        occupied (numpy.ndarray): Маска N×64 занятых клеток.
+
+    Возвращает:
+        numpy.ndarray: Массив N×64×64 bool.
+    """
+    return (occupied.astype(np.float32) @ between_table().T).reshape(len(occupied), 64, 64) > 0
+
+
+def _kernels(batch):
+    """
+    Вычисляет общие для всех масок величины пакета.
+
+    Аргументы:
+        batch (numpy.ndarray): Массив N×8×8 int8 кодов фигур.
+
+    Возвращает:
+        tuple: Плоские коды, виды фигур, знак цвета, маска занятости и маска перекрытых линий.
+    """
+    flat = batch.reshape(len(batch), 64)
+    kinds = np.abs(flat)
+    signs = np.sign(flat)
+    occupied = flat != 0
+    return flat, kinds, signs, occupied, _blocked(occupied)
+
+
+def _by_color(table, signs):
+    """
+    Выбирает для каждой клетки таблицу ходов по цвету стоящей на ней фигуры.
+
+    Аргументы:
+        table (numpy.ndarray): Таблица 2×64×64 (белые, чёрные).
+        signs (numpy.ndarray): Знаки цвета N×64.
+
+    Возвращает:
+        numpy.ndarray: Массив N×64×64 bool.
+    """
+    return np.where((signs > 0)[:, :, None], table[0][None], table[1][None])
+
+
+def _jumped(jumps):
+    """
+    Для набора прыжков шашек возвращает число прыжков через каждую клетку.
+
+    Аргументы:
+        jumps (numpy.ndarray): Маска прыжков N×64×64.
+
+    Возвращает:
+        numpy.ndarray: Массив N×64 float32.
+    """
+    return jumps.reshape(len(jumps), 4096).astype(np.float32) @ between_table()
+
+
+def attack_masks(batch):
+    """
+    Возвращает клетки, которые каждая сторона может побить.
+
+    Аргументы:
+        batch (numpy.ndarray): Массив N×8×8 int8 кодов фигур.
+
+    Возвращает:
+        numpy.ndarray: Массив N×2×64 bool (0 - белые, 1 - чёрные).
+    """
+    _, kinds, signs, occupied, blocked = _kernels(batch)
+    clear = ~blocked
+    attacks = np.zeros((len(batch), 64, 64), dtype=bool)
+    attacks |= (kinds == PAWN)[:, :, None] & _by_color(PAWN_CAPTURE, signs)
+    attacks |= (kinds == KNIGHT)[:, :, None] & KNIGHT_JUMPS
+    attacks |= (kinds == BISHOP)[:, :, None] & DIAGONAL & clear
+    attacks |= (kinds == ROOK)[:, :, None] & ORTHOGONAL & clear
+    attacks |= (kinds == QUEEN)[:, :, None] & LINES & clear
+    attacks |= (kinds == KING)[:, :, None] & KING_STEPS
+    attacks |= (kinds == SPIDER)[:, :, None] & SPIDER_JUMPS
+    attacks |= (kinds == WIZARD)[:, :, None] & WIZARD_JUMPS
+    attacks |= (kinds == MINOTAUR)[:, :, None] & LINES
+    # Шашка бьёт соседнюю по диагонали клетку, если за ней свободно
+    jumps = (kinds == CHECKER)[:, :, None] & CHECKER_JUMPS & ~occupied[:, None, :]
+    white = (signs > 0)[:, :, None]
+    black = (signs < 0)[:, :, None]
+    result = np.empty((len(batch), 2, 64), dtype=bool)
+    result[:, 0] = (attacks & white).any(axis=1) | (_jumped(jumps & white) > 0)
+    result[:, 1] = (attacks & black).any(axis=1) | (_jumped(jumps & black) > 0)
+    return result
+
+
+def legal_masks(batch, color=None, packed=False):
+    """
+    Возвращает маски допустимых ходов (откуда, куда) по правилам is_valid_move.
+
+    Ходы на месте (откуда == куда) не включаются.
+
+    Аргументы:
+        batch (numpy.ndarray): Массив N×8×8 int8 кодов фигур.
+        color (str): Оставить только ходы фигур этого цвета ('W' или 'B'), None - обе стороны.
+        packed (bool): Упаковать последнюю ось в биты (N×64×8 uint8).
+
+    Возвращает:
+        numpy.ndarray: Массив N×64×64 bool или N×64×8 uint8.
+    """
+    flat, kinds, signs, occupied, blocked = _kernels(batch)
+    clear = ~blocked
+    empty = ~occupied[:, None, :]
+    enemy = (signs[:, :, None] * signs[:, None, :]) < 0
+    free_or_enemy = empty | enemy
+    legal = np.zeros((len(batch), 64, 64), dtype=bool)
+
+    pawns = (kinds == PAWN)[:, :, None]
+    legal |= pawns & _by_color(PAWN_PUSH, signs) & empty
+    legal |= pawns & _by_color(PAWN_DOUBLE, signs) & empty & clear
+    legal |= pawns & _by_color(PAWN_CAPTURE, signs) & enemy
+    legal |= (kinds == KNIGHT)[:, :, None] & KNIGHT_JUMPS & free_or_enemy
+    legal |= (kinds == BISHOP)[:, :, None] & DIAGONAL & clear & free_or_enemy
+    legal |= (kinds == ROOK)[:, :, None] & ORTHOGONAL & clear & free_or_enemy
+    legal |= (kinds == QUEEN)[:, :, None] & LINES & clear & free_or_enemy
+    legal |= (kinds == KING)[:, :, None] & KING_STEPS & free_or_enemy
+    # Новые фигуры Dop156 не проверяют ни путь, ни цвет фигуры на целевой клетке
+    legal |= (kinds == SPIDER)[:, :, None] & SPIDER_JUMPS
+    legal |= (kinds == WIZARD)[:, :, None] & WIZARD_JUMPS
+    legal |= (kinds == MINOTAUR)[:, :, None] & LINES
+
+    checkers = (kinds == CHECKER)[:, :, None]
+    legal |= checkers & _by_color(CHECKER_STEPS, signs) & empty
+    jumps = checkers & CHECKER_JUMPS & empty
+    if jumps.any():
+        # Прыжок допустим, если между клетками стоит фигура соперника
+        white_between = _blocked(flat > 0)
+        black_between = _blocked(flat < 0)
+        legal |= jumps & np.where((signs > 0)[:, :, None], black_between, white_between)
+
+    if color is not None:
+        legal &= ((signs > 0) if color == 'W' else (signs < 0))[:, :, None]
+    return np.packbits(legal, axis=-1) if packed else legal
@@ -0,0 +1,500 @@
+import math
+import os
+import random
+import time
+
+import Dvizhok
+
+
+class EngineConfig:
+    """
+    Класс, описывающий настройки движка-участника турнира.
+
+    Атрибуты:
+        name (str): Имя участника.
+        depth (int): Глубина поиска (0 - случайный ход).
+        nodes (int): Лимит узлов на ход.
+        movetime (int): Лимит времени на ход в миллисекундах.
+    """
+    def __init__(self, name, depth=1, nodes=None, movetime=None):
+        """
+        Конструктор для инициализации настроек движка.
+
+        Аргументы:
+            name (str): Имя участника.
+            depth (int): Глубина поиска (0 - случайный ход).
+            nodes (int): Лимит узлов на ход.
+            movetime (int): Лимит времени на ход в миллисекундах.
+        """
+        self.name = name
+        self.depth = depth
+        self.nodes = nodes
+        self.movetime = movetime
+
+    @classmethod
+    def parse(cls, name, text):
+        """
+        Создаёт настройки из строки вида 'depth=2,nodes=500'.
+
+        Аргументы:
+            name (str): Имя участника.
+            text (str): Строка настроек.
+
+        Возвращает:
+            EngineConfig: Настройки движка.
+        """
+        options = {}
+        for item in filter(None, text.split(',')):
+            key, _, value = item.partition('=')
+            if key not in ('depth', 'nodes', 'movetime'):
+                raise ValueError(f"Неизвестный параметр движка: {key}")
+            options[key] = int(value)
+        return cls(name, **options)
+
+    def choose_move(self, variant, board, color, rng):
+        """
+        Выбирает ход для стороны.
+
+        Аргументы:
+            variant (Variant): Вариант игры.
+            board (Board): Доска.
+            color (str): Сторона, которой принадлежит ход.
+            rng (random.Random): Генератор случайных чисел.
+
+        Возвращает:
+            tuple: Выбранный ход или None, если ходов нет.
+        """
+        if self.depth == 0 and not self.nodes and not self.movetime:
+            moves = variant.generate_moves(board, color)
+            return rng.choice(moves) if moves else None
+        search = variant.new_search(board, color)
+        move, _ = search.run(depth=self.depth or None, movetime=self.movetime, nodes=self.nodes)
+        return move
+
+    def __str__(self):
+        """
+        Возвращает настройки в виде строки.
+
+        Возвращает:
+            str: Строка вида 'depth=2,nodes=500'.
+        """
+        return ','.join(f"{key}={getattr(self, key)}" for key in ('depth', 'nodes', 'movetime') if getattr(self, key))
+
+
+def random_opening(variant, seed, plies):
+    """
+    Строит случайный дебют из заданного зерна.
+
+    Аргументы:
+        variant (Variant): Вариант игры.
+        seed (int): Зерно генератора.
+        plies (int): Число полуходов дебюта.
+
+    Возвращает:
+        list: Ходы дебюта в виде строк ('e2e4').
+    """
+    rng = random.Random(seed)
+    board = variant.new_board()
+    color = 'W'
+    opening = []
+    for _ in range(plies):
+        grid = board.grid
+        moves = [move for move in variant.generate_moves(board, color)
+                 if grid[move[1][0]][move[1][1]] is None or grid[move[1][0]][move[1][1]].name != 'K']
+        if not moves:
+            break
+        move = rng.choice(moves)
+        board.move_piece(move[0], move[1])
+        opening.append(variant.format_move(move))
+        color = Dvizhok.opponent(color)
+    return opening
+
+
+def play_game(task):
+    """
+    Играет одну партию между двумя движками.
+
+    Аргументы:
+        task (tuple): Номер партии, вариант, дебют, настройки белых и чёрных, лимит полуходов.
+
+    Возвращает:
+        tuple: Номер партии, вариант, имя белых, результат ('1-0', '0-1', '1/2'), число полуходов, дебют
+            и все ходы партии.
+    """
+    index, variant_name, opening, white, black, max_plies = task
+    variant = Dvizhok.VARIANTS[variant_name]
+    board = variant.new_board()
+    rng = random.Random(index)
+    color = 'W'
+    for move in opening:
+        start, end = variant.parse_move(move)
+        board.move_piece(start, end)
+        color = Dvizhok.opponent(color)
+    players = {'W': white, 'B': black}
+    moves = list(opening)
+    result = '1/2'
+    plies = len(opening)
+    while plies < max_plies:
+        if variant.is_lost(board, color):
+            result = '0-1' if color == 'W' else '1-0'
+            break
+        move = players[color].choose_move(variant, board, color, rng)
+        if move is None:
+            if variant.no_moves_score(0) < 0:
+                result = '0-1' if color == 'W' else '1-0'
+            break
+        board.move_piece(move[0], move[1])
+        moves.append(variant.format_move(move))
+        plies += 1
+        color = Dvizhok.opponent(color)
+    else:
+        if variant.is_lost(board, color):
+            result = '0-1' if color == 'W' else '1-0'
+    return index, variant_name, white.name, result, plies, ' '.join(opening), ' '.join(moves)
+
+
+class Statistics:
+    """
+    Класс, накапливающий результаты турнира с точки зрения движка A.
+
+    Атрибуты:
+        wins (int): Победы движка A.
+        draws (int): Ничьи.
+        losses (int): Поражения движка A.
+    """
+    def __init__(self):
+        """
+        Конструктор для инициализации статистики.
+        """
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+
+    def add(self, white, result):
+        """
+        Добавляет результат партии.
+
+        Аргументы:
+            white (str): Имя движка, игравшего белыми ('A' или 'B').
+            result (str): Результат партии ('1-0', '0-1', '1/2').
+        """
+        if result == '1/2':
+            self.draws += 1
+        elif (result == '1-0') == (white == 'A'):
+            self.wins += 1
+        else:
+            self.losses += 1
+
+    @property
+    def games(self):
+        """
+        Возвращает число сыгранных партий.
+
+        Возвращает:
+            int: Число партий.
+        """
+        return self.wins + self.draws + self.losses
+
+    def score_and_variance(self):
+        """
+        Возвращает средний счёт движка A и дисперсию результата одной партии.
+
+        Возвращает:
+            tuple: Средний счёт и дисперсия.
+        """
+        games = self.games
+        if not games:
+            return 0.5, 0.0
+        score = (self.wins + self.draws / 2) / games
+        variance = (self.wins * (1 - score) ** 2 + self.draws * (0.5 - score) ** 2 + self.losses * score ** 2) / games
+        return score, variance
+
+    @staticmethod
+    def score_to_elo(score):
+        """
+        Переводит средний счёт в разницу Эло.
+
+        Аргументы:
+            score (float): Средний счёт.
+
+        Возвращает:
+            float: Разница Эло.
+        """
+        score = min(max(score, 1e-6), 1 - 1e-6)
+        return -400 * math.log10(1 / score - 1)
+
+    def elo(self, z=1.96):
+        """
+        Возвращает разницу Эло и границы доверительного интервала.
+
+        Аргументы:
+            z (float): Квантиль нормального распределения (1.96 - 95%).
+
+        Возвращает:
+            tuple: Разница Эло, нижняя и верхняя границы.
+        """
+        score, variance = self.score_and_variance()
+        margin = z * math.sqrt(variance / self.games) if self.games else 0.0
+        return self.score_to_elo(score), self.score_to_elo(score - margin), self.score_to_elo(score + margin)
+
+    def llr(self, elo0, elo1):
+        """
+        Возвращает логарифм отношения правдоподобия для SPRT.
+
+        Аргументы:
+            elo0 (float): Разница Эло нулевой гипотезы.
+            elo1 (float): Разница Эло альтернативной гипотезы.
+
+        Возвращает:
+            float: Логарифм отношения правдоподобия.
+        """
+        score, variance = self.score_and_variance()
+        if variance <= 0:
+            return 0.0
+        score0 = 1 / (1 + 10 ** (-elo0 / 400))
+        score1 = 1 / (1 + 10 ** (-elo1 / 400))
+        return self.games * (score1 - score0) * (2 * score - score0 - score1) / (2 * variance)
+
+
+class Tournament:
+    """
+    Класс, проводящий турнир двух движков в пуле процессов.
+
+    Атрибуты:
+        engines (dict): Настройки движков 'A' и 'B'.
+        variants (list): Названия вариантов игры.
+        openings (list): Пары (вариант, дебют).
+        games (int): Число партий.
+        output (str): Путь к файлу результатов.
+        statistics (Statistics): Накопленная статистика.
+    """
+    def __init__(self, engine_a, engine_b, variants, seeds, games, output, opening_plies=4,
+                 max_plies=200, workers=None, sprt=None):
+        """
+        Конструктор для инициализации турнира.
+
+        Аргументы:
+            engine_a (EngineConfig): Настройки движка A.
+            engine_b (EngineConfig): Настройки движка B.
+            variants (list): Названия вариантов игры.
+            seeds (list): Зёрна случайных дебютов.
+            games (int): Число партий.
+            output (str): Путь к файлу результатов.
+            opening_plies (int): Длина дебюта в полуходах.
+            max_plies (int): Лимит полуходов в партии (после него - ничья).
+            workers (int): Число процессов (по умолчанию - число ядер).
+            sprt (tuple): Параметры SPRT (elo0, elo1, alpha, beta) или None.
+        """
+        self.engines = {'A': engine_a, 'B': engine_b}
+        self.variants = variants
+        self.seeds = seeds
+        self.games = games
+        self.output = output
+        self.opening_plies = opening_plies
+        self.max_plies = max_plies
+        self.workers = workers or os.cpu_count()
+        self.sprt = sprt
+        self.statistics = Statistics()
+        self._openings = {}
+
+    def header(self):
+        """
+        Возвращает первую строку файла результатов - настройки, от которых зависят партии.
+
+        Число партий и параметры SPRT в неё не входят: их можно менять при продолжении турнира.
+
+        Возвращает:
+            str: Строка вида '# engine-a=depth=2\tengine-b=depth=1\t...' без перевода строки.
+        """
+        fields = (('engine-a', self.engines['A']), ('engine-b', self.engines['B']),
+                  ('variants', ' '.join(self.variants)), ('seeds', ' '.join(map(str, self.seeds))),
+                  ('opening-plies', self.opening_plies), ('max-plies', self.max_plies))
+        return '# ' + '\t'.join(f"{key}={value}" for key, value in fields)
+
+    def opening(self, pair):
+        """
+        Возвращает вариант и дебют для пары партий.
+
+        Аргументы:
+            pair (int): Номер пары партий.
+
+        Возвращает:
+            tuple: Название варианта и список ходов дебюта.
+        """
+        variant_name = self.variants[pair % len(self.variants)]
+        seed = self.seeds[pair // len(self.variants) % len(self.seeds)]
+        key = (variant_name, seed)
+        if key not in self._openings:
+            self._openings[key] = random_opening(Dvizhok.VARIANTS[variant_name], seed, self.opening_plies)
+        return variant_name, self._openings[key]
+
+    def tasks(self, finished):
+        """
+        Генерирует задания на партии; в каждой паре движки меняются цветами.
+
+        Аргументы:
+            finished (set): Номера уже сыгранных партий.
+
+        Возвращает:
+            generator: Задания для play_game.
+        """
+        for index in range(self.games):
+            if index in finished:
+                continue
+            variant_name, opening = self.opening(index // 2)
+            first, second = ('A', 'B') if index % 2 == 0 else ('B', 'A')
+            yield index, variant_name, opening, self.engines[first], self.engines[second], self.max_plies
+
+    def load_finished(self):
+        """
+        Читает уже записанные результаты, чтобы продолжить прерванный турнир.
+
+        Строка, оборванная сбоем (без завершающего перевода строки), отрезается от файла:
+        иначе следующая запись была бы дописана к ней. Её партия будет сыграна заново.
+        В новый или пустой файл записывается заголовок header(); если заголовок файла другой
+        (или его нет), турнир не продолжается - бросается ValueError, чтобы не смешать статистику
+        партий с разными настройками.
+
+        Возвращает:
+            set: Номера сыгранных партий.
+        """
+        finished = set()
+        header = self.header()
+        data = b''
+        if os.path.exists(self.output):
+            with open(self.output, 'rb+') as results:
+                data = results.read()
+                complete = data.rfind(b'\n') + 1
+                if complete < len(data):
+                    results.truncate(complete)
+                    results.flush()
+                    os.fsync(results.fileno())
+                data = data[:complete]
+        lines = data.decode('utf-8').splitlines()
+        if not lines:
+            with open(self.output, 'w', encoding='utf-8') as results:
+                results.write(header + '\n')
+                results.flush()
+                os.fsync(results.fileno())
+        elif lines[0] != header:
+            found = lines[0] if lines[0].startswith('# ') else 'заголовка нет'
+            raise ValueError(f"Файл {self.output} записан с другими настройками турнира: "
+                             f"{found}; ожидается {header}. Укажите другой --output")
+        else:
+            for line in lines[1:]:
+                fields = line.split('\t')
+                if len(fields) < 5 or not fields[0].isdigit():
+                    continue
+                finished.add(int(fields[0]))
+                self.statistics.add(fields[2], fields[3])
+        return finished
+
+    def sprt_decision(self):
+        """
+        Проверяет, достигнута ли граница SPRT.
+
+        Возвращает:
+            str: 'H1', 'H0' или None, если решение не принято.
+        """
+        if not self.sprt:
+            return None
+        elo0, elo1, alpha, beta = self.sprt
+        llr = self.statistics.llr(elo0, elo1)
+        if llr >= math.log((1 - beta) / alpha):
+            return 'H1'
+        if llr <= math.log(beta / (1 - alpha)):
+            return 'H0'
+        return None
+
+    def report(self, played, elapsed):
+        """
+        Формирует строку отчёта.
+
+        Аргументы:
+            played (int): Число партий, сыгранных в этом запуске.
+            elapsed (float): Время работы в секундах.
+
+        Возвращает:
+            str: Строка отчёта.
+        """
+        stats = self.statistics
+        elo, low, high = stats.elo()
+        line = (f"Партий: {stats.games} (+{stats.wins} ={stats.draws} -{stats.losses}), "
+                f"партий/час: {played * 3600 / max(elapsed, 1e-9):.0f}, "
+                f"Эло A-B: {elo:+.1f} [{low:+.1f}, {high:+.1f}]")
+        if self.sprt:
+            elo0, elo1, alpha, beta = self.sprt
+            line += (f", LLR: {stats.llr(elo0, elo1):.2f} "
+                     f"[{math.log(beta / (1 - alpha)):.2f}, {math.log((1 - beta) / alpha):.2f}]")
+        return line
+
+    def run(self, progress=print):
+        """
+        Проводит турнир, записывая результат каждой партии сразу после её окончания.
+
+        Аргументы:
+            progress (callable): Функция вывода промежуточных отчётов.
+
+        Возвращает:
+            str: Решение SPRT ('H0', 'H1') или None.
+        """
+        finished = self.load_finished()
+        decision = self.sprt_decision()
+        start = time.perf_counter()
+        played = 0
+        if decision is None and len(finished) < self.games:
+            import multiprocessing
+            with open(self.output, 'a', encoding='utf-8') as results, \
+                    multiprocessing.Pool(self.workers) as pool:
+                for index, variant_name, white, result, plies, opening, moves in pool.imap_unordered(
+                        play_game, self.tasks(finished)):
+                    results.write(f"{index}\t{variant_name}\t{white}\t{result}\t{plies}\t{opening}\t{moves}\n")
+                    results.flush()
+                    os.fsync(results.fileno())
+                    self.statistics.add(white, result)
+                    played += 1
+                    if played % 10 == 0:
+                        progress(self.report(played, time.perf_counter() - start))
+                    decision = self.sprt_decision()
+                    if decision:
+                        pool.terminate()
+                        break
+        progress(self.report(played, time.perf_counter() - start))
+        if decision:
+            progress(f"SPRT: принята гипотеза {decision}")
+        return decision
+
+
+def main():
+    """
+    Точка входа: разбирает аргументы командной строки и запускает турнир.
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description="Турнир двух настроек движка")
+    parser.add_argument('--engine-a', default='depth=2', help="настройки движка A (depth=N,nodes=N,movetime=N)")
+    parser.add_argument('--engine-b', default='depth=1', help="настройки движка B")
+    parser.add_argument('--variants', nargs='+', default=['chess', 'fairy', 'checkers'], choices=sorted(Dvizhok.VARIANTS))
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--seeds', type=int, nargs='*', help="зёрна случайных дебютов")
+    parser.add_argument('--seed-file', help="файл с зёрнами дебютов (по одному на строку)")
+    parser.add_argument('--opening-plies', type=int, default=4)
+    parser.add_argument('--max-plies', type=int, default=200)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--output', default='tournament.tsv')
+    parser.add_argument('--sprt', type=float, nargs=4, metavar=('ELO0', 'ELO1', 'ALPHA', 'BETA'))
+    args = parser.parse_args()
+
+    seeds = args.seeds or list(range(1, 101))
+    if args.seed_file:
+        with open(args.seed_file, encoding='utf-8') as seed_file:
+            seeds = [int(line) for line in seed_file if line.strip()]
+    tournament = Tournament(EngineConfig.parse('A', args.engine_a), EngineConfig.parse('B', args.engine_b),
+                            args.variants, seeds, args.games, args.output, args.opening_plies,
+                            args.max_plies, args.workers, args.sprt)
+    try:
+        tournament.run()
+    except ValueError as error:
+        parser.error(str(error))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,445 @@
+import bisect
+import heapq
+import importlib
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import Pozicii
+
+# Вид фигуры в полубайте: 0 - пустая клетка, далее буквы Pozicii.LETTERS
+TYPES = '.' + Pozicii.LETTERS
+TYPE_CODES = {letter: code for code, letter in enumerate(TYPES) if code}
+
+# Запись доски ChessOsnova и Dop156: 32 байта видов фигур (по полубайту на клетку, строка за строкой,
+# чётная клетка в младшем полубайте), 8 байт маски белых фигур (бит row * 8 + col) и сторона (0 - белые)
+PACKED_SIZE = 41
+
+# Запись шашек: число белых шашек, чёрных шашек, белых дамок и чёрных дамок (по полубайту)
+# и 9 байт номера расстановки на 32 тёмных клетках (наибольший номер - 65 бит: по 6 шашек и 6 дамок
+# у каждой стороны); ход всегда за белыми (canonical_checkers)
+CHECKERS_SIZE = 11
+DARK = [(row, col) for row in range(8) for col in range(8) if (row + col) % 2 == 1]
+DARK_INDEX = {square: number for number, square in enumerate(DARK)}
+CHECKERS_GROUPS = (('C', 'W'), ('C', 'B'), ('D', 'W'), ('D', 'B'))
+COMB = [[math.comb(n, k) for k in range(33)] for n in range(33)]  # Биномиальные коэффициенты C(n, k)
+
+
+def pack(board, color='W'):
+    """
+    Упаковывает позицию в PACKED_SIZE байт (полубайт на клетку и маска цвета).
+
+    Аргументы:
+        board (Board): Доска ChessOsnova, Dop156 или Shashechki.
+        color (str): Сторона, которой принадлежит ход.
+
+    Возвращает:
+        bytes: Упакованная позиция.
+    """
+    nibbles = bytearray(32)
+    white = 0
+    square = 0
+    for row in board.grid:
+        for piece in row:
+            if piece is not None:
+                nibbles[square >> 1] |= TYPE_CODES[piece.name] << ((square & 1) * 4)
+                if piece.color == 'W':
+                    white |= 1 << square
+            square += 1
+    return bytes(nibbles) + white.to_bytes(8, 'little') + (b'\x00' if color == 'W' else b'\x01')
+
+
+def unpack(data, module, board=None):
+    """
+    Расставляет позицию, упакованную функцией pack (фигуры - общие объекты Pozicii.piece_set).
+
+    Аргументы:
+        data (bytes): Упакованная позиция.
+        module (module): Модуль игры.
+        board (Board): Доска для повторного использования (по умолчанию создаётся новая).
+
+    Возвращает:
+        tuple: Доска и сторона ('W' или 'B').
+    """
+    if len(data) != PACKED_SIZE:
+        raise ValueError(f"Длина записи {len(data)} байт вместо {PACKED_SIZE}")
+    pieces = Pozicii.piece_set(module).pieces
+    white = int.from_bytes(data[32:40], 'little')
+    rows = []
+    for row in range(8):
+        line = []
+        for col in range(8):
+            square = row * 8 + col
+            code = (data[square >> 1] >> ((square & 1) * 4)) & 15
+            if code == 0:
+                line.append(None)
+                continue
+            letter = TYPES[code]
+            line.append(pieces[letter if white >> square & 1 else letter.lower()])
+        rows.append(line)
+    return _place(rows, module, board), 'B' if data[40] else 'W'
+
+
+def _place(rows, module, board):
+    """
+    Расставляет горизонтали на доске в обход move_piece.
+
+    Аргументы:
+        rows (list): 8 горизонталей по 8 фигур.
+        module (module): Модуль игры.
+        board (Board): Доска или None.
+
+    Возвращает:
+        Board: Доска.
+    """
+    if board is None:
+        board = module.Board(setup=False)
+    for index, line in enumerate(rows):
+        board.grid[index][:] = line
+    board.move_history.clear()
+    if getattr(board, 'evaluation', None) is not None:
+        board.evaluation.refresh()
+    if getattr(board, 'move_cache', None) is not None:
+        board.move_cache.reset()
+    return board
+
+
+def canonical_checkers(board, color):
+    """
+    Приводит позицию шашек к виду с ходом белых: при ходе чёрных доска поворачивается
+    на 180 градусов и цвета шашек меняются местами (правила при этом не меняются).
+
+    Аргументы:
+        board (Board): Доска Shashechki.
+        color (str): Сторона, которой принадлежит ход.
+
+    Возвращает:
+        list: Четыре отсортированных списка номеров тёмных клеток (DARK) в порядке CHECKERS_GROUPS.
+    """
+    groups = {group: [] for group in CHECKERS_GROUPS}
+    flip = color == 'B'
+    for row, line in enumerate(board.grid):
+        for col, piece in enumerate(line):
+            if piece is None:
+                continue
+            if (row + col) % 2 == 0:
+                raise ValueError(f"Шашка на светлой клетке {'abcdefgh'[col]}{8 - row}")
+            if flip:
+                square = (7 - row, 7 - col)
+                piece_color = 'B' if piece.color == 'W' else 'W'
+            else:
+                square = (row, col)
+                piece_color = piece.color
+            groups[piece.name, piece_color].append(DARK_INDEX[square])
+    return [sorted(groups[group]) for group in CHECKERS_GROUPS]
+
+
+def pack_checkers(board, color='W'):
+    """
+    Упаковывает позицию шашек в CHECKERS_SIZE байт: номер расстановки в комбинаторной системе счисления.
+
+    Шашки каждой группы (CHECKERS_GROUPS) выбираются из тёмных клеток, не занятых
+    предыдущими группами; номер выбора k клеток из n - сумма C(p_i, i) по позициям p_i
+    среди свободных клеток, номера групп складываются в смешанной системе счисления.
+
+    Аргументы:
+        board (Board): Доска Shashechki.
+        color (str): Сторона, которой принадлежит ход.
+
+    Возвращает:
+        bytes: Упакованная позиция (позиция с ходом чёрных записывается повёрнутой).
+    """
+    used = []
+    index = 0
+    counts = 0
+    for shift, squares in zip((0, 4, 8, 12), canonical_checkers(board, color)):
+        if len(squares) > 15:
+            raise ValueError("В группе больше 15 шашек")
+        rank = 0
+        for number, square in enumerate(squares, 1):
+            # Позиция клетки среди свободных: номер клетки минус занятые клетки перед ней
+            rank += COMB[square - bisect.bisect_left(used, square)][number]
+        index = index * COMB[32 - len(used)][len(squares)] + rank
+        for square in squares:
+            bisect.insort(used, square)
+        counts |= len(squares) << shift
+    return counts.to_bytes(2, 'little') + index.to_bytes(CHECKERS_SIZE - 2, 'little')
+
+
+def unpack_checkers(data, module=None, board=None):
+    """
+    Расставляет позицию, упакованную функцией pack_checkers (ход всегда за белыми).
+
+    Аргументы:
+        data (bytes): Упакованная позиция.
+        module (module): Модуль шашек (по умолчанию Shashechki).
+        board (Board): Доска для повторного использования.
+
+    Возвращает:
+        tuple: Доска и сторона ('W').
+    """
+    if len(data) != CHECKERS_SIZE:
+        raise ValueError(f"Длина записи {len(data)} байт вместо {CHECKERS_SIZE}")
+    if module is None:
+        module = importlib.import_module('Shashechki')
+    counts = int.from_bytes(data[:2], 'little')
+    sizes = [(counts >> shift) & 15 for shift in (0, 4, 8, 12)]
+    index = int.from_bytes(data[2:], 'little')
+    # Номера групп снимаются с конца: последняя группа - младший разряд
+    free_sizes = []
+    free = 32
+    for size in sizes:
+        free_sizes.append(free)
+        free -= size
+    ranks = []
+    for size, available in reversed(list(zip(sizes, free_sizes))):
+        base = COMB[available][size]
+        index, rank = divmod(index, base)
+        ranks.append(rank)
+    ranks.reverse()
+    if index:
+        raise ValueError("Номер расстановки вне допустимого диапазона")
+    pieces = Pozicii.piece_set(module).pieces
+    rows = [[None] * 8 for _ in range(8)]
+    free_squares = list(range(32))
+    for (name, color), size, rank in zip(CHECKERS_GROUPS, sizes, ranks):
+        positions = []
+        for number in range(size, 0, -1):
+            position = number - 1
+            while COMB[position + 1][number] <= rank:
+                position += 1
+            rank -= COMB[position][number]
+            positions.append(position)
+        chosen = [free_squares[position] for position in positions]
+        for square in chosen:
+            row, col = DARK[square]
+            rows[row][col] = pieces[name if color == 'W' else name.lower()]
+        for square in chosen:
+            free_squares.remove(square)
+    return _place(rows, module, board), 'W'
+
+
+def encoder(variant_name):
+    """
+    Возвращает упаковку позиций варианта.
+
+    Аргументы:
+        variant_name (str): Название варианта.
+
+    Возвращает:
+        tuple: Размер записи в байтах и функция (доска, сторона) -> bytes.
+    """
+    if variant_name == 'checkers':
+        return CHECKERS_SIZE, pack_checkers
+    return PACKED_SIZE, pack
+
+
+class Deduplicator:
+    """
+    Класс потокового подсчёта различных позиций: записи копятся в памяти порциями
+    по run_size штук, каждая порция сортируется и пишется на диск, в конце
+    отсортированные порции сливаются (heapq.merge) с пропуском повторов.
+
+    Атрибуты:
+        record_size (int): Размер записи в байтах.
+        run_size (int): Число различных записей в одной порции.
+        directory (str): Каталог временных файлов порций.
+        runs (list): Пути к файлам записанных порций.
+        seen (int): Число добавленных записей (с повторами).
+    """
+    def __init__(self, record_size, run_size=1 << 20, directory=None):
+        """
+        Конструктор для инициализации подсчёта.
+
+        Аргументы:
+            record_size (int): Размер записи в байтах.
+            run_size (int): Число различных записей в одной порции.
+            directory (str): Каталог, в котором создаётся временный каталог порций.
+        """
+        self.record_size = record_size
+        self.run_size = run_size
+        self.directory = tempfile.mkdtemp(prefix='dedup-', dir=directory)
+        self.runs = []
+        self.seen = 0
+        self._run = set()
+
+    def add(self, record):
+        """
+        Добавляет запись.
+
+        Аргументы:
+            record (bytes): Запись длиной record_size.
+        """
+        if len(record) != self.record_size:
+            raise ValueError(f"Длина записи {len(record)} байт вместо {self.record_size}")
+        self.seen += 1
+        self._run.add(record)
+        if len(self._run) >= self.run_size:
+            self._spill()
+
+    def _spill(self):
+        """
+        Сортирует текущую порцию и записывает её на диск.
+        """
+        path = os.path.join(self.directory, f"run{len(self.runs):05d}.bin")
+        with open(path, 'wb') as run:
+            run.write(b''.join(sorted(self._run)))
+        self.runs.append(path)
+        self._run = set()
+
+    def _read(self, path):
+        """
+        Читает записи порции.
+
+        Аргументы:
+            path (str): Путь к файлу порции.
+
+        Возвращает:
+            generator: Записи по возрастанию.
+        """
+        size = self.record_size
+        with open(path, 'rb') as run:
+            while True:
+                chunk = run.read(size * 4096)
+                if not chunk:
+                    break
+                for offset in range(0, len(chunk), size):
+                    yield chunk[offset:offset + size]
+
+    def unique(self):
+        """
+        Перебирает различные записи по возрастанию.
+
+        Возвращает:
+            generator: Записи без повторов.
+        """
+        if not self.runs:
+            yield from sorted(self._run)
+            return
+        if self._run:
+            self._spill()
+        previous = None
+        for record in heapq.merge(*(self._read(path) for path in self.runs)):
+            if record != previous:
+                yield record
+                previous = record
+
+    def write(self, path):
+        """
+        Записывает различные записи в файл подряд.
+
+        Аргументы:
+            path (str): Путь к файлу.
+
+        Возвращает:
+            int: Число различных записей.
+        """
+        count = 0
+        with open(path, 'wb') as output:
+            for record in self.unique():
+                output.write(record)
+                count += 1
+        return count
+
+    def count(self):
+        """
+        Возвращает число различных записей.
+        """
+        return sum(1 for _ in self.unique())
+
+    def close(self):
+        """
+        Удаляет временные файлы порций.
+        """
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.runs = []
+        self._run = set()
+
+
+def game_positions(paths, default_variant='chess'):
+    """
+    Переигрывает партии и выдаёт все позиции (начальную и после каждого хода).
+
+    Аргументы:
+        paths (list): Файлы партий (форматы Kniga.read_corpus).
+        default_variant (str): Вариант для строк, содержащих только ходы.
+
+    Возвращает:
+        generator: Кортежи (вариант, доска, сторона); доска действительна до следующей позиции.
+    """
+    import Dvizhok
+    import Kniga
+    for variant_name, _, _, moves in Kniga.read_corpus(paths, default_variant):
+        variant = Dvizhok.VARIANTS[variant_name]
+        board = variant.module.Board()
+        color = 'W'
+        yield variant_name, board, color
+        for move in moves:
+            if move is None or not board.move_piece(move[0], move[1]):
+                break
+            color = 'B' if color == 'W' else 'W'
+            yield variant_name, board, color
+
+
+def main():
+    """
+    Точка входа: считает различные позиции в партиях и файлах позиций.
+    """
+    import argparse
+    import Dvizhok
+    parser = argparse.ArgumentParser(description="Подсчёт различных позиций в партиях")
+    parser.add_argument('games', nargs='*', help="файлы партий (Turnir.py, 'вариант результат ходы' или ходы)")
+    parser.add_argument('--variant', default='chess', choices=sorted(Dvizhok.VARIANTS),
+                        help="вариант для строк, содержащих только ходы, и для --positions")
+    parser.add_argument('--positions', nargs='*', default=[], help="файлы позиций (Pozicii.py)")
+    parser.add_argument('--run-size', type=int, default=1 << 20, help="различных записей в одной порции")
+    parser.add_argument('--tmp', help="каталог для временных файлов")
+    parser.add_argument('--out', help="каталог для файлов различных позиций (вариант.bin)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    deduplicators = {}
+    packers = {}
+
+    errors = []
+
+    def add(variant_name, board, color):
+        if variant_name not in deduplicators:
+            size, packers[variant_name] = encoder(variant_name)
+            deduplicators[variant_name] = Deduplicator(size, args.run_size, args.tmp)
+        try:
+            record = packers[variant_name](board, color)
+        except ValueError as error:  # Позиция, которую нельзя упаковать (например, шашка на светлой клетке)
+            errors.append(str(error))
+            return
+        deduplicators[variant_name].add(record)
+
+    for variant_name, board, color in game_positions(args.games, args.variant):
+        add(variant_name, board, color)
+    module = Dvizhok.VARIANTS[args.variant].module
+    for path in args.positions:
+        bad_lines = []
+        for board, color, _ in Pozicii.load_file(path, module, errors=bad_lines):
+            add(args.variant, board, color)
+        errors.extend(f"{path}:{number}: {message}" for number, message in bad_lines)
+    try:
+        for variant_name, deduplicator in sorted(deduplicators.items()):
+            if args.out:
+                os.makedirs(args.out, exist_ok=True)
+                distinct = deduplicator.write(os.path.join(args.out, f"{variant_name}.bin"))
+            else:
+                distinct = deduplicator.count()
+            print(f"{variant_name}: позиций {deduplicator.seen}, различных {distinct}, "
+                  f"запись {deduplicator.record_size} байт, порций на диске {len(deduplicator.runs)}")
+    finally:
+        for deduplicator in deduplicators.values():
+            deduplicator.close()
+    if errors:
+        print(f"Ошибочных позиций: {len(errors)} (первая: {errors[0]})")
+    print(f"Время: {time.perf_counter() - started:.2f} с")
+
+if __name__ == "__main__":
+    sys.exit(main())
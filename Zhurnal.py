@@ -0,0 +1,544 @@
+import argparse
+import glob
+import importlib
+import os
+import sys
+import threading
+import time
+import zlib
+
+import Pozicii
+
+FILES = 'abcdefgh'
+
+
+def _square(position):
+    """
+    Переводит координаты клетки в запись вида 'e2'.
+
+    Аргументы:
+        position (tuple): Клетка (строка, столбец).
+
+    Возвращает:
+        str: Запись клетки.
+    """
+    return f"{FILES[position[1]]}{8 - position[0]}"
+
+
+def encode_history(entry):
+    """
+    Записывает элемент move_history доски в текстовом виде.
+
+    Клетки записываются как 'e2', фигуры - буквами Pozicii, отсутствие фигуры - '-'.
+    Подходит для записей вида (откуда, куда, побитая) и (откуда, куда, фигура, побитая).
+
+    Аргументы:
+        entry (tuple): Элемент move_history.
+
+    Возвращает:
+        str: Запись через запятую (например, 'e2,e4,-').
+    """
+    items = []
+    for item in entry:
+        if item is None:
+            items.append('-')
+        elif isinstance(item, tuple):
+            items.append(_square(item))
+        else:
+            items.append(item.name if item.color == 'W' else item.name.lower())
+    return ','.join(items)
+
+
+def decode_history(text, pieces):
+    """
+    Восстанавливает элемент move_history из текстовой записи.
+
+    Аргументы:
+        text (str): Запись элемента.
+        pieces (PieceSet): Набор фигур модуля.
+
+    Возвращает:
+        tuple: Элемент move_history.
+    """
+    entry = []
+    for item in text.split(','):
+        if item == '-':
+            entry.append(None)
+        elif len(item) == 2:
+            entry.append((8 - int(item[1]), FILES.index(item[0])))
+        else:
+            entry.append(pieces.pieces[item])
+    return tuple(entry)
+
+
+def _line(payload):
+    """
+    Добавляет к записи контрольную сумму, чтобы распознать оборванную строку.
+
+    Аргументы:
+        payload (str): Запись.
+
+    Возвращает:
+        bytes: Строка журнала.
+    """
+    data = payload.encode('utf-8')
+    return b"%08x %s\n" % (zlib.crc32(data), data)
+
+
+def _read_lines(path):
+    """
+    Читает записи файла, останавливаясь на первой повреждённой строке.
+
+    Аргументы:
+        path (str): Путь к файлу журнала.
+
+    Возвращает:
+        generator: Записи без контрольных сумм.
+    """
+    with open(path, 'rb') as journal:
+        for raw in journal:
+            if not raw.endswith(b"\n") or len(raw) < 10:
+                return
+            checksum, data = raw[:8], raw[9:-1]
+            try:
+                if int(checksum, 16) != zlib.crc32(data):
+                    return
+            except ValueError:
+                return
+            yield data.decode('utf-8')
+
+
+def _game_record(game_id, game):
+    """
+    Формирует запись N: модуль игры, позиция и история ходов доски.
+
+    Аргументы:
+        game_id (str): Идентификатор партии.
+        game (Game): Партия.
+
+    Возвращает:
+        str: Запись журнала.
+    """
+    module = type(game).__module__
+    if module == '__main__':
+        module = os.path.splitext(os.path.basename(sys.modules['__main__'].__file__))[0]
+    board = game.board
+    history = ' '.join(encode_history(entry) for entry in getattr(board, 'move_history', []))
+    return f"{game_id} N {module} {Pozicii.dump(board, game.current_turn, game.move_count)} {history}"
+
+
+class Journal:
+    """
+    Класс, ведущий журнал ходов всех партий процесса (только дописывание).
+
+    Записи попадают в буфер, а отдельный поток сбрасывает их на диск одним fsync
+    на группу записей. Периодически состояние всех партий сохраняется в снимок,
+    после чего старые файлы журнала удаляются.
+
+    Атрибуты:
+        directory (str): Каталог журнала.
+        games (dict): Отслеживаемые партии (объекты Game) по идентификатору.
+        flush_interval (float): Наибольшая задержка сброса на диск в секундах.
+        snapshot_every (int): Число записей между снимками (0 - без автоматических снимков).
+    """
+    def __init__(self, directory, flush_interval=0.005, snapshot_every=100000):
+        """
+        Конструктор: открывает новый файл журнала в каталоге.
+
+        Аргументы:
+            directory (str): Каталог журнала.
+            flush_interval (float): Наибольшая задержка сброса на диск в секундах.
+            snapshot_every (int): Число записей между снимками.
+        """
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.snapshot_every = snapshot_every
+        self.games = {}
+        os.makedirs(directory, exist_ok=True)
+        segments = _segments(directory)
+        self.segment = (segments[-1][0] + 1) if segments else 1
+        self.file = open(self._segment_path(self.segment), 'ab')
+        self.lock = threading.Lock()
+        self.durable = threading.Condition(self.lock)
+        self.written = 0
+        self.synced = 0
+        self.since_snapshot = 0
+        self.closed = False
+        self.fsyncs = 0
+        self.thread = threading.Thread(target=self._flusher, daemon=True)
+        self.thread.start()
+
+    def _segment_path(self, number):
+        """
+        Возвращает путь к файлу журнала с номером number.
+
+        Аргументы:
+            number (int): Номер файла.
+
+        Возвращает:
+            str: Путь к файлу.
+        """
+        return os.path.join(self.directory, f"journal-{number:06d}.log")
+
+    def _flusher(self):
+        """
+        Тело потока сброса: одним fsync фиксирует все записи, накопленные за интервал.
+        """
+        while True:
+            with self.lock:
+                while self.written == self.synced and not self.closed:
+                    self.durable.wait()
+                if self.closed and self.written == self.synced:
+                    return
+            time.sleep(self.flush_interval)
+            with self.lock:
+                target = self.written
+                self.file.flush()
+                descriptor = os.dup(self.file.fileno())  # файл может смениться снимком во время fsync
+            try:
+                os.fsync(descriptor)
+            finally:
+                os.close(descriptor)
+            with self.lock:
+                self.fsyncs += 1
+                self.synced = max(self.synced, target)
+                self.durable.notify_all()
+
+    def _append(self, payload, wait):
+        """
+        Дописывает запись в журнал.
+
+        Аргументы:
+            payload (str): Запись.
+            wait (bool): Дождаться записи на диск.
+
+        Возвращает:
+            int: Номер записи.
+        """
+        with self.lock:
+            if self.closed:
+                raise ValueError("Журнал закрыт")
+            self.file.write(_line(payload))
+            self.written += 1
+            number = self.written
+            self.since_snapshot += 1
+            self.durable.notify_all()
+            if wait:
+                while self.synced < number:
+                    self.durable.wait()
+        if self.snapshot_every and self.since_snapshot >= self.snapshot_every:
+            self.snapshot()
+        return number
+
+    def sync(self):
+        """
+        Ждёт, пока все записи будут сброшены на диск.
+        """
+        with self.lock:
+            number = self.written
+            while self.synced < number:
+                self.durable.wait()
+
+    def start_game(self, game_id, game, wait=True):
+        """
+        Начинает вести журнал партии.
+
+        Аргументы:
+            game_id (str): Идентификатор партии (без пробелов).
+            game (Game): Объект партии ChessOsnova, Dop156 или Shashechki.
+            wait (bool): Дождаться записи на диск.
+        """
+        game.journal = self
+        game.game_id = game_id
+        self.games[game_id] = game
+        self._append(_game_record(game_id, game), wait)
+
+    def record_move(self, game_id, move, wait=True):
+        """
+        Записывает принятый ход.
+
+        Аргументы:
+            game_id (str): Идентификатор партии.
+            move (str): Ход (например, 'e2e4').
+            wait (bool): Дождаться записи на диск.
+        """
+        self._append(f"{game_id} M {move}", wait)
+
+    def record_undo(self, game_id, wait=True):
+        """
+        Записывает отмену хода.
+
+        Аргументы:
+            game_id (str): Идентификатор партии.
+            wait (bool): Дождаться записи на диск.
+        """
+        self._append(f"{game_id} U", wait)
+
+    def end_game(self, game_id, wait=True):
+        """
+        Прекращает вести журнал партии.
+
+        Аргументы:
+            game_id (str): Идентификатор партии.
+            wait (bool): Дождаться записи на диск.
+        """
+        game = self.games.pop(game_id, None)
+        if game is not None:
+            game.journal = None
+        self._append(f"{game_id} E", wait)
+
+    def snapshot(self):
+        """
+        Сохраняет снимок всех партий и удаляет журнал, который им покрыт.
+
+        Снимок должен делаться, когда ни одна партия не находится посреди хода
+        (например, из того же потока, что выполняет ходы).
+        """
+        with self.lock:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+            self.segment += 1
+            self.file = open(self._segment_path(self.segment), 'ab')
+            self.synced = self.written
+            self.since_snapshot = 0
+            self.durable.notify_all()
+            lines = [_line(_game_record(game_id, game)) for game_id, game in self.games.items()]
+            segment = self.segment
+        path = os.path.join(self.directory, f"snapshot-{segment:06d}.snap")
+        with open(path + '.tmp', 'wb') as snapshot:
+            snapshot.writelines(lines)
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(path + '.tmp', path)
+        _fsync_directory(self.directory)
+        for number, old in _segments(self.directory):
+            if number < segment:
+                os.remove(old)
+        for old in glob.glob(os.path.join(self.directory, 'snapshot-*.snap')):
+            if old != path:
+                os.remove(old)
+
+    def close(self):
+        """
+        Сбрасывает все записи на диск и закрывает журнал.
+        """
+        self.sync()
+        with self.lock:
+            self.closed = True
+            self.durable.notify_all()
+        self.thread.join()
+        self.file.close()
+
+
+def _fsync_directory(directory):
+    """
+    Фиксирует на диске изменения каталога (переименование файлов).
+
+    Аргументы:
+        directory (str): Каталог.
+    """
+    if hasattr(os, 'O_DIRECTORY'):
+        descriptor = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+
+def _segments(directory):
+    """
+    Возвращает файлы журнала каталога по возрастанию номера.
+
+    Аргументы:
+        directory (str): Каталог журнала.
+
+    Возвращает:
+        list: Пары (номер, путь).
+    """
+    result = []
+    for path in glob.glob(os.path.join(directory, 'journal-*.log')):
+        result.append((int(os.path.basename(path)[8:14]), path))
+    return sorted(result)
+
+
+def _restore_game(fields):
+    """
+    Создаёт партию по записи N (модуль, позиция, история ходов).
+
+    Аргументы:
+        fields (list): Поля записи после идентификатора и типа.
+
+    Возвращает:
+        Game: Восстановленная партия.
+    """
+    module = importlib.import_module(fields[0])
+    game = module.Game()
+    game.board, game.current_turn, game.move_count = Pozicii.load(' '.join(fields[1:4]), module, game.board)
+    if hasattr(game.board, 'move_history'):
+        pieces = Pozicii.piece_set(module)
+        game.board.move_history.extend(decode_history(item, pieces) for item in fields[4:] if item)
+    return game
+
+
+def recover(directory):
+    """
+    Восстанавливает все незавершённые партии: снимок плюс журнал после него.
+
+    Дерево вариантов (Dop156) восстанавливается только по текущему варианту.
+
+    Аргументы:
+        directory (str): Каталог журнала.
+
+    Возвращает:
+        dict: Объекты Game по идентификатору партии.
+    """
+    games = {}
+    snapshots = sorted(glob.glob(os.path.join(directory, 'snapshot-*.snap')))
+    first_segment = 0
+    if snapshots:
+        first_segment = int(os.path.basename(snapshots[-1])[9:15])
+        for line in _read_lines(snapshots[-1]):
+            fields = line.split(' ')
+            games[fields[0]] = _restore_game(fields[2:])
+    for number, path in _segments(directory):
+        if number < first_segment:
+            continue
+        for line in _read_lines(path):
+            fields = line.split(' ')
+            game_id, kind = fields[0], fields[1]
+            if kind == 'N':
+                games[game_id] = _restore_game(fields[2:])
+                continue
+            game = games.get(game_id)
+            if game is None:
+                continue
+            if kind == 'M':
+                start, end = game.parse_input(fields[2])
+                if game.board.move_piece(start, end):
+                    game.move_count += 1
+                    game.current_turn = 'B' if game.current_turn == 'W' else 'W'
+            elif kind == 'U':
+                if game.board.undo_move():
+                    game.move_count -= 1
+                    game.current_turn = 'B' if game.current_turn == 'W' else 'W'
+            elif kind == 'E':
+                del games[game_id]
+    for game in games.values():
+        if hasattr(game, 'tree'):
+            game.tree = type(game.tree)(game.board)
+    return games
+
+
+def open_journal(directory, **options):
+    """
+    Восстанавливает партии из журнала и продолжает вести их в новом файле журнала.
+
+    Аргументы:
+        directory (str): Каталог журнала.
+        options (dict): Параметры Journal.
+
+    Возвращает:
+        tuple: Журнал и словарь восстановленных партий.
+    """
+    games = recover(directory)
+    journal = Journal(directory, **options)
+    for game_id, game in games.items():
+        game.journal = journal
+        game.game_id = game_id
+        journal.games[game_id] = game
+    journal.snapshot()
+    return journal, games
+
+
+def game_from_argv(argv, game_class):
+    """
+    Обрабатывает флаг --journal=КАТАЛОГ: продолжает партию из журнала или начинает новую.
+
+    Флаг удаляется из argv.
+
+    Аргументы:
+        argv (list): Аргументы командной строки (обычно sys.argv).
+        game_class (type): Класс Game модуля игры.
+
+    Возвращает:
+        Game: Партия (с журналом, если флаг указан).
+    """
+    flags = [arg for arg in argv if arg.startswith('--journal=')]
+    if not flags:
+        return game_class()
+    for flag in flags:
+        argv.remove(flag)
+    journal, games = open_journal(flags[-1].partition('=')[2])
+    game = games.get('console')
+    if game is None:
+        game = game_class()
+        journal.start_game('console', game)
+    return game
+
+
+def benchmark(directory, count, module_name='ChessOsnova', moves_per_game=8):
+    """
+    Замеряет восстановление count живых партий после сбоя.
+
+    Аргументы:
+        directory (str): Пустой каталог для журнала.
+        count (int): Число партий.
+        module_name (str): Модуль игры.
+        moves_per_game (int): Число ходов в каждой партии.
+
+    Возвращает:
+        dict: Время записи, число fsync и время восстановления.
+    """
+    module = importlib.import_module(module_name)
+    line = ['e2e4', 'e7e5', 'g1f3', 'b8c6', 'f1c4', 'g8f6', 'd2d3', 'f8c5'] if module_name != 'Shashechki' \
+        else ['c3d4', 'f6e5', 'g3f4', 'e5g3', 'h2f4', 'b6a5', 'd4c5', 'd6b4']
+    journal = Journal(directory, snapshot_every=0)
+    started = time.perf_counter()
+    games = []
+    for number in range(count):
+        game = module.Game()
+        journal.start_game(f"g{number}", game, wait=False)
+        games.append(game)
+    half = moves_per_game // 2
+    for phase, moves in enumerate((line[:half], line[half:moves_per_game])):
+        if phase:
+            journal.snapshot()  # вторая половина ходов остаётся только в журнале
+        for move in moves:
+            for game in games:
+                start, end = game.parse_input(move)
+                game.board.move_piece(start, end)
+                game.move_count += 1
+                game.current_turn = 'B' if game.current_turn == 'W' else 'W'
+                journal.record_move(game.game_id, move, wait=False)
+    journal.sync()
+    written = time.perf_counter() - started
+    fsyncs = journal.fsyncs
+    journal.file.close()  # имитация сбоя: журнал не закрывается штатно
+    started = time.perf_counter()
+    restored = recover(directory)
+    elapsed = time.perf_counter() - started
+    return {'games': len(restored), 'write_seconds': written, 'fsyncs': fsyncs, 'recover_seconds': elapsed}
+
+
+def main():
+    """
+    Точка входа: восстанавливает журнал или замеряет восстановление.
+    """
+    parser = argparse.ArgumentParser(description="Журнал ходов партий")
+    parser.add_argument('directory')
+    parser.add_argument('--benchmark', type=int, metavar='N', help="замерить восстановление N партий")
+    parser.add_argument('--module', default='ChessOsnova')
+    args = parser.parse_args()
+    if args.benchmark:
+        result = benchmark(args.directory, args.benchmark, args.module)
+        print(f"Партий: {result['games']}, запись: {result['write_seconds']:.2f} с "
+              f"({result['fsyncs']} fsync), восстановление: {result['recover_seconds']:.2f} с")
+        return
+    games = recover(args.directory)
+    for game_id, game in sorted(games.items()):
+        print(f"{game_id}: {type(game).__module__} ход {game.move_count}, "
+              f"{Pozicii.dump(game.board, game.current_turn, game.move_count)}")
+
+if __name__ == "__main__":
+    main()